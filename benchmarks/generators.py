@@ -0,0 +1,100 @@
+"""Synthetic inputs for the benchmarks — reproducible from a seed.
+
+Dumps are built block by block: each 4KB block is a void (zeros),
+random bytes (high entropy) or repetitive text (low entropy), in the
+proportions asked for, with NOP sleds, INT3 runs and ELF/Mach-O
+headers sprinkled at a set density.  Trees get a fixed shape, file
+count per directory and share of duplicates, dot-files and
+timestomped files.  Both return what they made, so a benchmark can
+check the analyses found it.
+"""
+
+import os
+import random
+
+BLOCK_SIZE = 4096
+TEXT = b"The map precedes the territory; the simulacrum is true. " * 80
+SIGNATURES = (b"\x90" * 128, b"\xcc" * 96, b"\x7fELF", b"\xfe\xed\xfa\xce")
+ANCIENT_MTIME = 631152000  # 1990 — before the ancient-timestamp threshold
+
+
+def make_dump(path, size, void_fraction=0.1, random_fraction=0.5, signatures_per_mb=4.0, seed=0):
+    """Write a ``size``-byte synthetic dump to ``path``.
+
+    Blocks that are neither void nor random hold low-entropy text.
+    Returns the counts of each kind of block and of signatures planted.
+    """
+    rng = random.Random(seed)
+    counts = {"void_blocks": 0, "random_blocks": 0, "text_blocks": 0, "signatures": 0}
+    zero = bytes(BLOCK_SIZE)
+    per_block = signatures_per_mb * BLOCK_SIZE / (1 << 20)
+    with open(path, "wb") as f:
+        for offset in range(0, size, BLOCK_SIZE):
+            length = min(BLOCK_SIZE, size - offset)
+            roll = rng.random()
+            if roll < void_fraction:
+                f.write(zero[:length])
+                counts["void_blocks"] += 1
+                continue
+            if roll < void_fraction + random_fraction:
+                block = bytearray(_random_bytes(rng, length))
+                counts["random_blocks"] += 1
+            else:
+                start = rng.randrange(len(TEXT) - BLOCK_SIZE)
+                block = bytearray(TEXT[start:start + length])
+                counts["text_blocks"] += 1
+            planted = int(per_block) + (rng.random() < per_block % 1)
+            for _ in range(planted):
+                signature = rng.choice(SIGNATURES)
+                if len(signature) < length:
+                    at = rng.randrange(length - len(signature))
+                    block[at:at + len(signature)] = signature
+                    counts["signatures"] += 1
+            f.write(block)
+    return counts
+
+
+def make_tree(root, depth=3, fanout=4, files_per_dir=50, file_size=4096,
+              duplicate_fraction=0.1, hidden_fraction=0.02, anomaly_fraction=0.01, seed=0):
+    """Populate ``root`` with a synthetic tree ``depth`` directory levels deep.
+
+    Every directory holds ``files_per_dir`` files of ``file_size`` bytes
+    and ``fanout`` subdirectories.  The given shares of files copy an
+    earlier file, are dot-files or have an ancient mtime.  Returns the
+    counts of directories, files, bytes and each planted oddity.
+    """
+    rng = random.Random(seed)
+    counts = {"directories": 0, "files": 0, "bytes": 0, "duplicates": 0, "hidden": 0, "anomalies": 0}
+    originals = []
+    stack = [(root, 0)]
+    while stack:
+        dirpath, level = stack.pop()
+        os.makedirs(dirpath, exist_ok=True)
+        counts["directories"] += 1
+        for i in range(files_per_dir):
+            name = f"file{i:05d}.dat"
+            if rng.random() < hidden_fraction:
+                name = "." + name
+                counts["hidden"] += 1
+            if originals and rng.random() < duplicate_fraction:
+                data = rng.choice(originals)
+                counts["duplicates"] += 1
+            else:
+                data = _random_bytes(rng, file_size)
+                if len(originals) < 1024:
+                    originals.append(data)
+            path = os.path.join(dirpath, name)
+            with open(path, "wb") as f:
+                f.write(data)
+            if rng.random() < anomaly_fraction:
+                os.utime(path, (ANCIENT_MTIME, ANCIENT_MTIME))
+                counts["anomalies"] += 1
+            counts["files"] += 1
+            counts["bytes"] += len(data)
+        if level + 1 < depth:
+            stack.extend((os.path.join(dirpath, f"dir{j:03d}"), level + 1) for j in range(fanout))
+    return counts
+
+
+def _random_bytes(rng, n):
+    return rng.getrandbits(8 * n).to_bytes(n, "little") if n else b""
@@ -0,0 +1,279 @@
+"""Benchmark every dump, process and filesystem entry point.
+
+    python benchmarks/run.py                       # writes bench_results.json
+    python benchmarks/run.py --quick --only fs.     # a small, filtered run
+    python benchmarks/run.py --compare old.json    # then compare with an earlier run
+
+Inputs are generated into a temporary directory from fixed seeds (see
+``generators.py``).  Each case runs ``--repeat`` times on a warm page
+cache and its best time is kept; rates are MB/s for bytes analysed,
+files/s for files walked and items/s for anything else (regions,
+processes).  Results are JSON, stamped with the version, commit and
+platform they came from.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+import hyperreal  # noqa: E402
+from hyperreal import memory_forensics  # noqa: E402
+from hyperreal.entropy_map import EntropyMap  # noqa: E402
+from hyperreal.filesystem_forensics import FilesystemHyperreal  # noqa: E402
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer, ProcessMemoryForensics  # noqa: E402
+from hyperreal.scan_cache import ScanCache  # noqa: E402
+from generators import make_dump, make_tree  # noqa: E402
+
+PROC_CALLS = 50  # Calls per run of the cheap /proc readers
+
+
+def memory_cases(dump, snapshot, index_dir, size, workers):
+    """``(name, fn)`` pairs; each ``fn`` returns the amounts it processed."""
+    def dump_case(**kwargs):
+        entropy_map = kwargs.pop("entropy_map", False)
+
+        def run():
+            NegativeSpaceAnalyzer(**kwargs).analyze_memory_dump(
+                dump, entropy_map=EntropyMap() if entropy_map else None)
+            return {"bytes": size}
+        return run
+
+    def iterate():
+        for _ in NegativeSpaceAnalyzer().iter_memory_dump(dump):
+            pass
+        return {"bytes": size}
+
+    def carve():
+        NegativeSpaceAnalyzer().carve_executables(dump)
+        return {"bytes": size}
+
+    def compare():
+        shutil.rmtree(index_dir, ignore_errors=True)  # Time the indexing too
+        os.makedirs(index_dir)
+        NegativeSpaceAnalyzer().compare_memory_dumps(dump, snapshot, index_dir)
+        return {"bytes": 2 * size}
+
+    def process(iterate=False):
+        def run():
+            analyzer = NegativeSpaceAnalyzer()
+            if iterate:
+                summary = list(analyzer.iter_process(os.getpid()))[-1]
+            else:
+                summary = analyzer.analyze_process(os.getpid())["summary"]
+            return {"bytes": summary["scanned_bytes"]}
+        return run
+
+    def proc_reader(method, count):
+        def run():
+            pmf = ProcessMemoryForensics()
+            for _ in range(PROC_CALLS):
+                result = getattr(pmf, method)(os.getpid())
+            return {"items": PROC_CALLS * count(result)}
+        return run
+
+    def hollowing(deep):
+        def run():
+            ProcessMemoryForensics().detect_process_hollowing(os.getpid(), deep=deep)
+            return {"items": 1}
+        return run
+
+    def sweep():
+        ProcessMemoryForensics().sweep_host(workers=1, pids=[os.getpid()])
+        return {"items": 1}
+
+    cases = [("dump.analyze_memory_dump[python]", dump_case(backend="python"))]
+    if memory_forensics.np is not None:
+        cases.append(("dump.analyze_memory_dump[numpy]", dump_case(backend="numpy")))
+    cases += [
+        (f"dump.analyze_memory_dump[workers={workers}]",
+         dump_case(workers=workers, shard_size=max(size // (4 * workers), 1 << 20))),
+        ("dump.analyze_memory_dump[entropy_map]", dump_case(entropy_map=True)),
+        ("dump.analyze_memory_dump[carve=False]", dump_case(carve=False)),
+        ("dump.iter_memory_dump", iterate),
+        ("dump.carve_executables", carve),
+        ("dump.compare_memory_dumps", compare),
+    ]
+    if os.path.exists("/proc/self/maps"):
+        cases += [
+            ("process.read_proc_maps[self]", proc_reader("read_proc_maps", len)),
+            ("process.region_table[self]", proc_reader("region_table", len)),
+            ("process.detect_process_hollowing[self]", hollowing(False)),
+            ("process.detect_process_hollowing[self,deep]", hollowing(True)),
+            ("process.sweep_host[self]", sweep),
+        ]
+    if os.path.exists("/proc/self/mem"):
+        cases += [
+            ("process.analyze_process[self]", process()),
+            ("process.iter_process[self]", process(iterate=True)),
+        ]
+    return cases
+
+
+def filesystem_cases(root, tree, cache_path, workers):
+    amounts = {"files": tree["files"], "bytes": tree["bytes"]}
+
+    def fs_case(method, iterate=False, **kwargs):
+        def run():
+            result = getattr(FilesystemHyperreal(**kwargs), method)(root)
+            if iterate:
+                for _ in result:
+                    pass
+            return amounts
+        return run
+
+    def cached():
+        with ScanCache(cache_path) as cache:
+            FilesystemHyperreal(cache=cache).find_duplicate_simulacra(root)
+        return amounts
+
+    cases = []
+    for method in ("scan", "scan_temporal_anomalies", "detect_hidden_spaces", "find_duplicate_simulacra"):
+        cases.append((f"fs.{method}", fs_case(method)))
+    for method in ("iter_scan", "iter_temporal_anomalies", "iter_hidden_spaces", "iter_duplicate_simulacra"):
+        cases.append((f"fs.{method}", fs_case(method, iterate=True)))
+    cases += [
+        (f"fs.scan[workers={workers}]", fs_case("scan", workers=workers)),
+        ("fs.find_duplicate_simulacra[blake2b]", fs_case("find_duplicate_simulacra", hash_algorithm="blake2b")),
+        ("fs.find_duplicate_simulacra[cache]", cached),  # Warm after the first run
+    ]
+    return cases
+
+
+def measure(fn, repeat):
+    """Best of ``repeat`` timed runs, plus the rates it implies."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        amounts = fn()
+        runs.append(time.perf_counter() - start)
+    best = min(runs)
+    result = {"seconds": round(best, 6), "runs": [round(r, 6) for r in runs]}
+    if "bytes" in amounts:
+        result["mb_per_s"] = round(amounts["bytes"] / (1 << 20) / best, 2)
+    if "files" in amounts:
+        result["files_per_s"] = round(amounts["files"] / best, 1)
+    if "items" in amounts:
+        result["items_per_s"] = round(amounts["items"] / best, 1)
+    return dict(amounts, **result)
+
+
+def rate(result):
+    """The headline rate of a result: files/s, else MB/s, else items/s."""
+    for key in ("files_per_s", "mb_per_s", "items_per_s"):
+        if key in result:
+            return key, result[key]
+    return None, None
+
+
+def compare(old, new, tolerance):
+    """Print new rates against old ones; returns the names that slowed down."""
+    slower = []
+    print(f"{'case':48s} {'old':>10s} {'new':>10s} {'ratio':>7s}")
+    for name, result in new["results"].items():
+        key, now = rate(result)
+        before = old["results"].get(name, {}).get(key)
+        if not before:
+            print(f"{name:48s} {'-':>10s} {now:10.1f}")
+            continue
+        ratio = now / before
+        flag = "  SLOWER" if ratio < 1 - tolerance else ""
+        if flag:
+            slower.append(name)
+        print(f"{name:48s} {before:10.1f} {now:10.1f} {ratio:7.2f}{flag}")
+    return slower
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    np = memory_forensics.np
+    return {
+        "hyperreal": hyperreal.__version__,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__ if np is not None else None,
+        "time": datetime.utcnow().isoformat(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dump-mb", type=int, default=256, help="synthetic dump size")
+    parser.add_argument("--void", type=float, default=0.1, help="share of void blocks")
+    parser.add_argument("--random", type=float, default=0.5, help="share of high-entropy blocks")
+    parser.add_argument("--signatures-per-mb", type=float, default=4.0)
+    parser.add_argument("--depth", type=int, default=3, help="tree depth in directory levels")
+    parser.add_argument("--fanout", type=int, default=6, help="subdirectories per directory")
+    parser.add_argument("--files-per-dir", type=int, default=100)
+    parser.add_argument("--file-size", type=int, default=8192)
+    parser.add_argument("--duplicates", type=float, default=0.1, help="share of duplicate files")
+    parser.add_argument("--hidden", type=float, default=0.02, help="share of dot-files")
+    parser.add_argument("--anomalies", type=float, default=0.01, help="share of timestomped files")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", action="append", help="run cases whose name contains this (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="tiny inputs and one run, for smoke tests")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", metavar="OLD", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="slowdown flagged by --compare")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.dump_mb, args.fanout, args.files_per_dir, args.repeat = 4, 2, 20, 1
+
+    with tempfile.TemporaryDirectory(prefix="hyperreal-bench-") as tmp:
+        size = args.dump_mb << 20
+        dump = os.path.join(tmp, "dump.raw")
+        dump_counts = make_dump(dump, size, args.void, args.random, args.signatures_per_mb, args.seed)
+        snapshot = os.path.join(tmp, "snapshot.raw")
+        make_dump(snapshot, size, args.void, args.random, args.signatures_per_mb, args.seed)
+        with open(snapshot, "r+b") as f:  # Change one block in twenty
+            for offset in range(0, size, 20 * 4096):
+                f.seek(offset)
+                f.write(os.urandom(4096))
+        root = os.path.join(tmp, "tree")
+        tree_counts = make_tree(root, args.depth, args.fanout, args.files_per_dir, args.file_size,
+                                args.duplicates, args.hidden, args.anomalies, args.seed)
+
+        cases = memory_cases(dump, snapshot, os.path.join(tmp, "index"), size, args.workers)
+        cases += filesystem_cases(root, tree_counts, os.path.join(tmp, "cache.sqlite"), args.workers)
+        if args.only:
+            cases = [(name, fn) for name, fn in cases if any(part in name for part in args.only)]
+
+        results = {}
+        for name, fn in cases:
+            results[name] = measure(fn, args.repeat)
+            key, value = rate(results[name])
+            print(f"{name:48s} {value:10.1f} {key}", flush=True)
+
+    report = dict(environment(), params=vars(args),
+                  inputs={"dump": dump_counts, "tree": tree_counts}, results=results)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        return 1 if compare(old, report, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
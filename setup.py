@@ -1,2 +1,2 @@
 from setuptools import setup,find_packages
-setup(name="hyperreal",version="2.0.0",author="bad-antics",description="Baudrillard's hyperreality - simulation beyond reality",packages=find_packages(where="src"),package_dir={"":"src"},python_requires=">=3.8")
+setup(name="hyperreal",version="2.0.0",author="bad-antics",description="Baudrillard's hyperreality - simulation beyond reality",packages=find_packages(where="src"),package_dir={"":"src"},python_requires=">=3.8",extras_require={"fast":["numpy>=1.20"],"formats":["zstandard>=0.15","lz4>=3.0"]})
@@ -0,0 +1,235 @@
+"""Hyperreal Carving — executables hiding inside memory images.
+
+An injected binary leaves its header behind.  :class:`ExecutableCarver`
+finds candidate ELF, PE and Mach-O headers in the same single
+multi-pattern pass as every other signature, then keeps only those
+whose header fields parse into something a loader would accept, and
+estimates each image's size from its program, section or segment
+tables so it can be extracted.
+"""
+
+import os
+import struct
+
+from .dump_source import DumpSource, open_dump
+from .signatures import SignatureSet
+
+HEADER_READ = 4096  # Bytes of a candidate read to validate it
+MAX_ESTIMATE = 1 << 30  # Sizes beyond this are treated as a bogus header
+
+ELF_MACHINES = {
+    2: "sparc", 3: "x86", 8: "mips", 20: "ppc", 21: "ppc64", 22: "s390",
+    40: "arm", 43: "sparcv9", 50: "ia64", 62: "x86_64", 183: "aarch64", 243: "riscv",
+}
+ELF_TYPES = {1: "relocatable", 2: "executable", 3: "shared object", 4: "core"}
+PE_MACHINES = {
+    0x14C: "x86", 0x8664: "x86_64", 0x1C0: "arm", 0x1C4: "arm", 0xAA64: "aarch64", 0x200: "ia64",
+}
+MACHO_CPUS = {
+    7: "x86", 0x01000007: "x86_64", 12: "arm", 0x0100000C: "aarch64",
+    18: "ppc", 0x01000012: "ppc64",
+}
+MACHO_TYPES = {
+    1: "object", 2: "executable", 4: "core", 5: "preload", 6: "dylib",
+    7: "dylinker", 8: "bundle", 9: "dylib stub", 10: "dsym", 11: "kext bundle",
+}
+MACHO_MAGICS = (b"\xfe\xed\xfa\xce", b"\xce\xfa\xed\xfe", b"\xfe\xed\xfa\xcf", b"\xcf\xfa\xed\xfe")
+LC_SEGMENT = 0x1
+LC_SEGMENT_64 = 0x19
+
+
+class ExecutableCarver:
+    """Find, validate and extract executables embedded in an image.
+
+    ``signatures`` holds the header magics; feed a stream of it alongside
+    any other scan and pass each match to :meth:`validate`, or let
+    :meth:`carve` make a pass of its own.  Validated headers are reported
+    as dicts with ``offset``, ``format``, ``arch``, ``bits``, ``kind`` and
+    an estimated ``size`` (``truncated`` when the image ends first).
+    """
+
+    EXTENSIONS = {"ELF": "elf", "PE": "exe", "Mach-O": "macho"}
+
+    # (pattern, header bytes before it, format).  Each literal costs a
+    # pass over the data, so the four Mach-O magics share two patterns.
+    CANDIDATES = (
+        (b"\x7fELF", 0, "ELF"),
+        (b"MZ", 0, "PE"),
+        (b"\xfe\xed\xfa", 0, "Mach-O"),  # fe ed fa ce/cf — big-endian
+        (b"\xfa\xed\xfe", 1, "Mach-O"),  # ce/cf fa ed fe — little-endian
+    )
+
+    def __init__(self):
+        self.signatures = SignatureSet()
+        for pattern, _, _ in self.CANDIDATES:
+            self.signatures.add(pattern, "Executable header candidate")
+
+    def validate(self, source, match):
+        """Parse the candidate ``(offset, length, index)``; ``None`` if it is not one."""
+        offset, _, index = match
+        _, lead, format = self.CANDIDATES[index]
+        offset -= lead
+        if offset < 0:
+            return None
+        try:
+            found = _PARSERS[format](lambda at, n: bytes(source.view(offset + at, n)))
+        except (struct.error, ValueError):
+            return None
+        if found is None or not 0 < found["size"] <= MAX_ESTIMATE:
+            return None
+        found["truncated"] = offset + found["size"] > source.size
+        found["size"] = min(found["size"], source.size - offset)
+        return dict(offset=hex(offset), **found)
+
+    def carve(self, source, progress=None):
+        """Carve a whole :class:`DumpSource` (or dump path) in one pass."""
+        if not isinstance(source, DumpSource):
+            with open_dump(source) as opened:
+                return self.carve(opened, progress)
+        found = []
+        for start, end in source.spans():
+            stream = self.signatures.stream()
+            for base, chunk in source.chunks(start, end):
+                for match in stream.feed(chunk, base):
+                    executable = self.validate(source, match)
+                    if executable is not None:
+                        found.append(executable)
+                if progress is not None and progress(base + len(chunk), source.size) is False:
+                    return found
+            stream.close()
+        return found
+
+    def extract(self, source, executables, directory):
+        """Write each carved image to ``directory``; records gain ``extracted``."""
+        os.makedirs(directory, exist_ok=True)
+        for executable in executables:
+            offset = int(executable["offset"], 16)
+            name = f"{offset:016x}.{self.EXTENSIONS[executable['format']]}"
+            if executable["format"] == "PE" and executable["kind"] == "DLL":
+                name = name[:-3] + "dll"
+            path = os.path.join(directory, name)
+            with open(path, "wb") as f:
+                for base, chunk in source.chunks(offset, offset + executable["size"]):
+                    f.write(chunk)
+            executable["extracted"] = path
+        return executables
+
+
+def _parse_elf(read):
+    ident = read(0, 64)
+    if len(ident) < 52 or ident[4] not in (1, 2) or ident[5] not in (1, 2) or ident[6] != 1:
+        return None
+    wide = ident[4] == 2
+    order = "<" if ident[5] == 1 else ">"
+    if wide:
+        e_type, machine, version, _, phoff, shoff, _, ehsize, phentsize, phnum, shentsize, shnum = \
+            struct.unpack_from(order + "HHIQQQIHHHHH", ident, 16)
+    else:
+        e_type, machine, version, _, phoff, shoff, _, ehsize, phentsize, phnum, shentsize, shnum = \
+            struct.unpack_from(order + "HHIIIIIHHHHH", ident, 16)
+    if e_type not in ELF_TYPES or version != 1 or ehsize != (64 if wide else 52):
+        return None
+    if phnum and phentsize != (56 if wide else 32) or shnum and shentsize != (64 if wide else 40):
+        return None
+    if not phnum and not shnum:
+        return None
+
+    size = ehsize
+    if shnum:
+        size = max(size, shoff + shnum * shentsize)
+    if phnum:
+        size = max(size, phoff + phnum * phentsize)
+        table = read(phoff, phnum * phentsize)
+        layout = order + ("IIQQQQ" if wide else "IIIII")
+        for i in range(len(table) // phentsize):
+            fields = struct.unpack_from(layout, table, i * phentsize)
+            p_offset, p_filesz = (fields[2], fields[5]) if wide else (fields[1], fields[4])
+            size = max(size, p_offset + p_filesz)
+    return {
+        "format": "ELF",
+        "arch": ELF_MACHINES.get(machine, f"machine {machine}"),
+        "bits": 64 if wide else 32,
+        "kind": ELF_TYPES[e_type],
+        "size": size,
+    }
+
+
+def _parse_pe(read):
+    dos = read(0, 64)
+    if len(dos) < 64:
+        return None
+    lfanew, = struct.unpack_from("<I", dos, 0x3C)
+    if not 0x40 <= lfanew <= HEADER_READ - 24:
+        return None
+    coff = read(lfanew, 24)
+    if len(coff) < 24 or coff[:4] != b"PE\x00\x00":
+        return None
+    machine, sections, _, _, _, optional_size, characteristics = struct.unpack_from("<HHIIIHH", coff, 4)
+    if machine not in PE_MACHINES or not 0 < sections <= 96:
+        return None
+    optional = read(lfanew + 24, optional_size)
+    if len(optional) < 60:
+        return None
+    magic, = struct.unpack_from("<H", optional, 0)
+    if magic not in (0x10B, 0x20B):
+        return None
+    image_size, headers_size = struct.unpack_from("<II", optional, 56)
+
+    size = headers_size
+    table = read(lfanew + 24 + optional_size, sections * 40)
+    for i in range(len(table) // 40):
+        raw_size, raw_offset = struct.unpack_from("<II", table, i * 40 + 16)
+        size = max(size, raw_offset + raw_size)
+    return {
+        "format": "PE",
+        "arch": PE_MACHINES[machine],
+        "bits": 64 if magic == 0x20B else 32,
+        "kind": "DLL" if characteristics & 0x2000 else "executable",
+        "size": size,
+        "image_size": image_size,
+    }
+
+
+def _parse_macho(read):
+    header = read(0, 32)
+    if len(header) < 28:
+        return None
+    magic = header[:4]
+    if magic not in MACHO_MAGICS:
+        return None
+    order = ">" if magic[0] == 0xFE else "<"
+    wide = magic in (b"\xfe\xed\xfa\xcf", b"\xcf\xfa\xed\xfe")
+    cpu, _, filetype, ncmds, cmds_size, _ = struct.unpack_from(order + "iIIIII", header, 4)
+    cpu &= 0xFFFFFFFF
+    if cpu not in MACHO_CPUS or filetype not in MACHO_TYPES:
+        return None
+    if not 0 < ncmds <= 1024 or not ncmds * 8 <= cmds_size <= 1 << 20:
+        return None
+
+    start = 32 if wide else 28
+    commands = read(start, cmds_size)
+    size = start + cmds_size
+    pos = 0
+    for _ in range(ncmds):
+        if pos + 8 > len(commands):
+            break
+        cmd, cmd_size = struct.unpack_from(order + "II", commands, pos)
+        if cmd_size < 8:
+            return None  # A loader would reject the command list
+        if cmd == LC_SEGMENT_64 and pos + 56 <= len(commands):
+            fileoff, filesize = struct.unpack_from(order + "QQ", commands, pos + 40)
+            size = max(size, fileoff + filesize)
+        elif cmd == LC_SEGMENT and pos + 40 <= len(commands):
+            fileoff, filesize = struct.unpack_from(order + "II", commands, pos + 32)
+            size = max(size, fileoff + filesize)
+        pos += cmd_size
+    return {
+        "format": "Mach-O",
+        "arch": MACHO_CPUS[cpu],
+        "bits": 64 if wide else 32,
+        "kind": MACHO_TYPES[filetype],
+        "size": size,
+    }
+
+
+_PARSERS = {"ELF": _parse_elf, "PE": _parse_pe, "Mach-O": _parse_macho}
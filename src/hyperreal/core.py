@@ -1,5 +1,13 @@
 """Hyperreality Engine"""
 import json,random
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional — batches are scored in Python
+    np=None
 
 class HyperrealEngine:
     EXAMPLES={
@@ -17,17 +25,68 @@ class HyperrealEngine:
                      "order":4,"type":"Pure simulation"},
     }
     
+    INDICATORS={"mediated":10,"branded":15,"virtual":20,"ai_generated":25,
+                "no_original":30,"self_referential":20,"commercially_driven":15}
+    LEVELS=("REAL","REPRESENTATION","SIMULATION","HYPERREAL")
+    THRESHOLDS=(20,50,80)  # A depth above THRESHOLDS[i-1] reaches LEVELS[i]
+    BATCH_CHUNK=65536  # Records turned into columns at a time
+
+    def __init__(self,indicators=None):
+        """``indicators`` maps indicator name to weight (default ``INDICATORS``)."""
+        self.indicators=dict(self.INDICATORS if indicators is None else indicators)
+        if any(w<0 for w in self.indicators.values()): raise ValueError("Indicator weights must not be negative")
+
     def analyze_hyperreal(self,example_key):
         return self.EXAMPLES.get(example_key,{})
     
     def measure_simulation_depth(self,phenomena):
         depth=0
-        indicators={"mediated":10,"branded":15,"virtual":20,"ai_generated":25,
-                    "no_original":30,"self_referential":20,"commercially_driven":15}
-        for ind,weight in indicators.items():
+        for ind,weight in self.indicators.items():
             if phenomena.get(ind): depth+=weight
-        level="HYPERREAL" if depth>80 else "SIMULATION" if depth>50 else "REPRESENTATION" if depth>20 else "REAL"
-        return {"depth_score":min(depth,100),"level":level}
+        return {"depth_score":min(depth,100),"level":self.LEVELS[bisect_left(self.THRESHOLDS,depth)]}
+
+    def measure_simulation_depths(self,phenomena):
+        """Score many phenomena at once.
+
+        ``phenomena`` is columnar — a mapping of indicator name to a
+        boolean sequence or array, one entry per phenomenon (absent
+        indicators count as false) — or an iterable of records, which is
+        turned into columns ``BATCH_CHUNK`` records at a time.  Returns
+        ``depth_score`` and ``level`` as compact ``uint8`` arrays (NumPy
+        when installed, else ``array('B')``); ``level`` indexes ``LEVELS``.
+        Fractional depths are truncated in ``depth_score`` but not in ``level``.
+        """
+        if hasattr(phenomena,"keys"): return self._score_columns(phenomena)
+        records=iter(phenomena); scores,levels=[],[]
+        while True:
+            chunk=list(islice(records,self.BATCH_CHUNK))
+            if not chunk: break
+            r=self._score_columns({ind:[bool(p.get(ind)) for p in chunk] for ind in self.indicators})
+            scores.append(r["depth_score"]); levels.append(r["level"])
+        if np is not None:
+            return {"depth_score":np.concatenate(scores) if scores else np.zeros(0,np.uint8),
+                    "level":np.concatenate(levels) if levels else np.zeros(0,np.uint8),"levels":self.LEVELS}
+        depth_score,level=array("B"),array("B")
+        for s,l in zip(scores,levels): depth_score.extend(s); level.extend(l)
+        return {"depth_score":depth_score,"level":level,"levels":self.LEVELS}
+
+    def _score_columns(self,columns):
+        lengths={len(c) for c in columns.values()}
+        if len(lengths)>1: raise ValueError("Indicator columns differ in length")
+        n=lengths.pop() if lengths else 0
+        present=[(columns[ind],w) for ind,w in self.indicators.items() if ind in columns and w]
+        if np is not None:
+            exact=all(float(w).is_integer() for _,w in present)
+            depth=np.zeros(n,np.int64 if exact else np.float64)
+            for col,w in present: np.add(depth,w,out=depth,where=np.asarray(col,dtype=bool))
+            level=np.searchsorted(np.asarray(self.THRESHOLDS),depth,side="left").astype(np.uint8)
+            return {"depth_score":np.minimum(depth,100).astype(np.uint8),"level":level,"levels":self.LEVELS}
+        depth=[0]*n
+        for col,w in present:
+            for i,v in enumerate(col):
+                if v: depth[i]+=w
+        return {"depth_score":array("B",(int(min(d,100)) for d in depth)),
+                "level":array("B",(bisect_left(self.THRESHOLDS,d) for d in depth)),"levels":self.LEVELS}
     
     def precession_of_simulacra(self):
         return [
@@ -0,0 +1,862 @@
+"""Hyperreal Dump Sources — zero-copy access to memory images.
+
+A dump source is opened once and shared by every analysis that needs
+the image, so a multi-GB capture is mapped a single time instead of
+being re-read by each pass.
+
+:func:`open_dump` recognises compressed captures (gzip, zstd, lz4) and
+containers (LiME, ELF core) by their magic and streams them directly;
+more formats plug in with :func:`register_dump_format`.
+"""
+
+import os
+import gzip
+import mmap
+import zlib
+import errno
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .region_table import RegionTable, PERM_READ
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional — pagemap runs are found in Python
+    np = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional — only needed for .zst dumps
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # lz4 is optional — only needed for .lz4 dumps
+    lz4 = None
+
+CHUNK_SIZE = 1024 * 1024  # 1MB — 256 blocks of 4KB
+PAGEMAP_PRESENT = 1 << 63  # Page is resident in RAM
+PAGEMAP_BATCH = 65536  # Pagemap entries read per call (512KB)
+DECODE_WORKERS = min(8, os.cpu_count() or 1)  # Threads inflating compressed frames
+LIME_MAGIC = 0x4C694D45  # "EMiL"
+ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1  # Footer of the zstd seekable format's seek table
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A5E  # Skippable frame holding that seek table
+PT_LOAD = 1
+ET_CORE = 4
+
+
+class DumpSource:
+    """Read-only, random-access view over a memory image.
+
+    Subclasses set ``name`` and ``size`` and implement ``view`` and
+    ``chunks``.  ``path`` is set when the image can be reopened by file
+    name, which lets worker processes open their own handle on it.
+    Sources are context managers; closing one releases the mapping or
+    file descriptor behind it.
+    """
+
+    name = None
+    path = None
+    size = 0
+    _holes = ()
+
+    def view(self, offset, length):
+        """Return ``length`` bytes at ``offset`` as a memoryview."""
+        raise NotImplementedError
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        """Yield ``(offset, memoryview)`` chunks covering ``[start, end)``.
+
+        A chunk is only guaranteed valid until the next one is requested;
+        copy it if it has to outlive the iteration.
+        """
+        raise NotImplementedError
+
+    def spans(self):
+        """``(start, end)`` byte ranges holding data, in order.
+
+        Analyses scan only these; a plain image is one span covering all
+        of it, sparse sources such as live address spaces return many.
+        """
+        return [(0, self.size)] if self.size else []
+
+    def holes(self):
+        """``(start, end)`` ranges that read as zeros without being stored.
+
+        Sparse image files report their holes, found with ``SEEK_HOLE``,
+        so analyses can count them as void without reading them; other
+        sources have none.
+        """
+        return list(self._holes)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _bounds(self, start, end):
+        end = self.size if end is None else min(end, self.size)
+        return max(start, 0), end
+
+
+class MappedDumpSource(DumpSource):
+    """Dump source backed by a read-only ``mmap`` — slices are never copied.
+
+    The mapping is created with ``ACCESS_READ``, so images on read-only
+    media work, and pages are faulted in on demand so files larger than
+    RAM only ever occupy the page cache.
+    """
+
+    def __init__(self, path):
+        self.name = self.path = path
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            self.size = os.fstat(fd).st_size
+            self._map = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            self._holes = file_holes(fd, self.size)
+        finally:
+            os.close(fd)
+        if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+        self._view = memoryview(self._map)
+
+    def view(self, offset, length):
+        return self._view[offset:offset + length]
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        start, end = self._bounds(start, end)
+        for offset in range(start, end, chunk_size):
+            yield offset, self._view[offset:min(offset + chunk_size, end)]
+
+    def close(self):
+        if self._map is None:
+            return
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Views still alive — the mapping goes with the last one
+        self._map = None
+
+
+class FileDumpSource(DumpSource):
+    """Fallback source using ``pread`` into one reusable buffer.
+
+    Used for files that cannot be mapped: empty files, character devices,
+    or address spaces too small to map the whole image.
+    """
+
+    def __init__(self, path):
+        self.name = self.path = path
+        self._fd = os.open(path, os.O_RDONLY)
+        self.size = os.fstat(self._fd).st_size
+        if self.size == 0:
+            # Block devices report st_size 0 — ask the device instead
+            try:
+                self.size = os.lseek(self._fd, 0, os.SEEK_END)
+            except OSError:
+                self.size = 0
+        self._holes = file_holes(self._fd, self.size)
+        self._buf = None
+
+    def view(self, offset, length):
+        return memoryview(os.pread(self._fd, length, offset))
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        start, end = self._bounds(start, end)
+        if self._buf is None or len(self._buf) != chunk_size:
+            self._buf = bytearray(chunk_size)
+        buf = memoryview(self._buf)
+        offset = start
+        while offset < end:
+            want = min(chunk_size, end - offset)
+            n = os.preadv(self._fd, [buf[:want]], offset)
+            if n <= 0:
+                break
+            yield offset, buf[:n]
+            offset += n
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class SpanDumpSource(DumpSource):
+    """Another source restricted to selected ``(start, end)`` spans.
+
+    Reads go straight to the wrapped source, so matches near a span's
+    edge can still be completed; only the spans are scanned.  Closing
+    the view leaves the wrapped source open.
+    """
+
+    def __init__(self, source, spans):
+        self.source = source
+        self.name = source.name
+        self.size = source.size
+        clipped = sorted((max(s, 0), min(e, self.size)) for s, e in spans)
+        self._spans = []
+        for start, end in clipped:
+            if start >= end:
+                continue
+            if self._spans and start <= self._spans[-1][1]:
+                # Overlapping or adjacent — scan as one span
+                self._spans[-1] = (self._spans[-1][0], max(end, self._spans[-1][1]))
+            else:
+                self._spans.append((start, end))
+
+    def spans(self):
+        return list(self._spans)
+
+    def holes(self):
+        return self.source.holes()
+
+    def view(self, offset, length):
+        return self.source.view(offset, length)
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        return self.source.chunks(start, end, chunk_size)
+
+
+class ProcessMemorySource(FileDumpSource):
+    """Live address space of a process, read through ``/proc/<pid>/mem``.
+
+    Offsets are virtual addresses.  Only readable mappings are scanned,
+    and ``/proc/<pid>/pagemap`` is consulted so pages that are not
+    resident are skipped instead of being faulted in — untouched heap
+    reservations cost nothing.  When pagemap can't be read every page of
+    a readable mapping is scanned (``pagemap`` is then ``False``).
+    ``require`` is the permission bits a mapping needs to be included,
+    e.g. ``PERM_READ | PERM_EXEC`` for code only.  Reading another
+    process needs ptrace access to it.
+    """
+
+    def __init__(self, pid, require=PERM_READ):
+        self.pid = pid
+        self.require = require | PERM_READ
+        self.name = f"/proc/{pid}/mem"
+        self.table = RegionTable.from_proc(pid)
+        self._fd = os.open(self.name, os.O_RDONLY)
+        self._buf = None
+        try:
+            self._spans = self._present_spans()
+        except BaseException:
+            self.close()
+            raise
+        self._starts = [start for start, _ in self._spans]
+        self.size = self._spans[-1][1] if self._spans else 0
+        self.absent_bytes = sum(
+            self.table.size(i) for i in self._readable()
+        ) - sum(end - start for start, end in self._spans)
+
+    def spans(self):
+        return list(self._spans)
+
+    def view(self, offset, length):
+        span = self._span(offset)
+        if span is None:
+            return memoryview(b"")
+        try:
+            return memoryview(os.pread(self._fd, min(length, span[1] - offset), offset))
+        except OSError:
+            return memoryview(b"")
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        # Never read past the resident span ``start`` falls in
+        span = self._span(start)
+        if span is None:
+            return
+        end = span[1] if end is None else min(end, span[1])
+        try:
+            yield from super().chunks(start, end, chunk_size)
+        except OSError:
+            return  # Unmapped while we were reading
+
+    def _span(self, offset):
+        i = bisect_right(self._starts, offset) - 1
+        if i >= 0 and offset < self._spans[i][1]:
+            return self._spans[i]
+        return None
+
+    def _readable(self):
+        table = self.table
+        for i in range(len(table)):
+            # pread offsets are signed; [vsyscall] lives above 2**63
+            if table.perms[i] & self.require == self.require and table.ends[i] <= 1 << 63:
+                if table.pathnames[i] != "[vvar]":
+                    yield i
+
+    def _present_spans(self):
+        page = mmap.PAGESIZE
+        try:
+            pagemap = os.open(f"/proc/{self.pid}/pagemap", os.O_RDONLY)
+        except OSError:
+            pagemap = None
+        self.pagemap = pagemap is not None
+
+        spans = []
+        try:
+            for i in self._readable():
+                start, end = self.table.starts[i], self.table.ends[i]
+                if pagemap is None:
+                    runs = [(start, end)]
+                else:
+                    runs = _present_runs(pagemap, start // page, end // page, page)
+                for run in runs:
+                    if spans and spans[-1][1] == run[0]:
+                        spans[-1] = (spans[-1][0], run[1])  # Adjacent — one span
+                    else:
+                        spans.append(run)
+        finally:
+            if pagemap is not None:
+                os.close(pagemap)
+        return spans
+
+
+class AddressedDumpSource(DumpSource):
+    """Container whose captured ranges sit at known memory addresses.
+
+    ``ranges`` are ``(address, file_offset, length)`` tuples.  Offsets —
+    and so every finding — are the real addresses; bytes between ranges
+    were never captured and are not scanned.  Overlapping ranges keep
+    the first copy.
+    """
+
+    def __init__(self, path, ranges):
+        self.name = self.path = path
+        self.raw = _open_raw(path)
+        self._ranges = []
+        for address, file_offset, length in sorted(ranges):
+            if self._ranges:
+                skip = self._ranges[-1][0] + self._ranges[-1][2] - address
+                if skip > 0:
+                    address, file_offset, length = address + skip, file_offset + skip, length - skip
+            length = min(length, self.raw.size - file_offset)  # Truncated capture
+            if length > 0:
+                self._ranges.append((address, file_offset, length))
+        self._addresses = [address for address, _, _ in self._ranges]
+        self._spans = []
+        for address, _, length in self._ranges:
+            if self._spans and self._spans[-1][1] == address:
+                self._spans[-1] = (self._spans[-1][0], address + length)
+            else:
+                self._spans.append((address, address + length))
+        self._starts = [start for start, _ in self._spans]
+        self.size = self._spans[-1][1] if self._spans else 0
+
+    def spans(self):
+        return list(self._spans)
+
+    def view(self, offset, length):
+        i = bisect_right(self._addresses, offset) - 1
+        if i < 0 or offset >= self._addresses[i] + self._ranges[i][2]:
+            return memoryview(b"")
+        address, file_offset, size = self._ranges[i]
+        return self.raw.view(file_offset + offset - address, min(length, address + size - offset))
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        # Like a live address space: never read past the span ``start`` falls in
+        i = bisect_right(self._starts, start) - 1
+        if i < 0 or start >= self._spans[i][1]:
+            return
+        end = self._spans[i][1] if end is None else min(end, self._spans[i][1])
+        for address, file_offset, length in self._ranges[bisect_right(self._addresses, start) - 1:]:
+            if address >= end:
+                break
+            lo, hi = max(start, address), min(end, address + length)
+            delta = address - file_offset
+            for base, chunk in self.raw.chunks(lo - delta, hi - delta, chunk_size):
+                yield base + delta, chunk
+
+    def close(self):
+        self.raw.close()
+
+
+class LimeDumpSource(AddressedDumpSource):
+    """LiME capture: physical memory ranges, each behind a 32-byte header."""
+
+    def __init__(self, path):
+        ranges = []
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            pos = 0
+            while pos + 32 <= size:
+                f.seek(pos)
+                magic, version, start, end = struct.unpack("<IIQQ8x", f.read(32))
+                if magic != LIME_MAGIC or version != 1 or end < start:
+                    raise ValueError(f"Malformed LiME header at {pos:#x}: {path}")
+                ranges.append((start, pos + 32, end - start + 1))
+                pos += 32 + end - start + 1
+        super().__init__(path, ranges)
+
+
+class ElfCoreDumpSource(AddressedDumpSource):
+    """ELF core file (process core, ``/proc/vmcore``, VM guest dumps).
+
+    Each ``PT_LOAD`` segment is placed at its virtual address, or at its
+    physical address with ``address="physical"``.  Parts of segments not
+    stored in the file (``p_memsz`` beyond ``p_filesz``) are not scanned.
+    """
+
+    def __init__(self, path, address="virtual"):
+        if address not in ("virtual", "physical"):
+            raise ValueError(f"address must be 'virtual' or 'physical', not {address!r}")
+        try:
+            ranges = list(_elf_segments(path, address == "physical"))
+        except struct.error:
+            raise ValueError(f"Truncated ELF program headers: {path}") from None
+        super().__init__(path, ranges)
+
+
+class FrameDumpSource(DumpSource):
+    """Compressed image stored as independently decompressible frames.
+
+    ``frames`` are ``(offset, size, file_offset, file_size)`` tuples in
+    image order and ``decode(data, size)`` inflates one.  Frames ahead of
+    the reader are inflated by ``workers`` threads — zlib, zstd and lz4
+    release the GIL — so decompression keeps pace with the analysis.
+    Any frame can be reached without inflating those before it, so
+    sharded analyses work as on a raw image.
+    """
+
+    def __init__(self, raw, frames, decode, workers=None):
+        self.name = self.path = raw.path
+        self.raw = raw
+        self.frames = frames
+        self.size = frames[-1][0] + frames[-1][1] if frames else 0
+        self.workers = workers or DECODE_WORKERS
+        self._offsets = [frame[0] for frame in frames]
+        self._decode = decode
+        self._cached = (None, None)
+
+    def view(self, offset, length):
+        end = min(offset + length, self.size)
+        pieces = []
+        for i in self._frame_range(offset, end):
+            frame_offset = self.frames[i][0]
+            if self._cached[0] != i:
+                self._cached = (i, self._inflate(i))
+            pieces.append(memoryview(self._cached[1])[max(offset - frame_offset, 0):end - frame_offset])
+        if len(pieces) == 1:
+            return pieces[0]
+        return memoryview(b"".join(pieces))
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        start, end = self._bounds(start, end)
+        # Frames rarely line up with chunks — regroup so blocks stay aligned
+        pending = bytearray()
+        base = start
+        for frame_offset, data in self._inflated(start, end):
+            pending += memoryview(data)[max(start - frame_offset, 0):end - frame_offset]
+            while len(pending) >= chunk_size:
+                chunk = bytes(pending[:chunk_size])
+                del pending[:chunk_size]
+                yield base, memoryview(chunk)
+                base += chunk_size
+        if pending:
+            yield base, memoryview(bytes(pending))
+
+    def close(self):
+        self.raw.close()
+
+    def _frame_range(self, start, end):
+        first = max(bisect_right(self._offsets, start) - 1, 0)
+        last = bisect_right(self._offsets, max(end - 1, start))
+        return range(first, last) if start < end else range(0)
+
+    def _inflated(self, start, end):
+        """Yield ``(offset, data)`` for the frames overlapping ``[start, end)``."""
+        frames = self._frame_range(start, end)
+        if self.workers <= 1 or len(frames) <= 1:
+            for i in frames:
+                yield self.frames[i][0], self._inflate(i)
+            return
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        window = deque()
+        try:
+            for i in frames:
+                window.append((i, pool.submit(self._inflate, i)))
+                if len(window) >= 2 * self.workers:
+                    j, future = window.popleft()
+                    yield self.frames[j][0], future.result()
+            while window:
+                j, future = window.popleft()
+                yield self.frames[j][0], future.result()
+        finally:
+            for _, future in window:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def _inflate(self, i):
+        offset, size, file_offset, file_size = self.frames[i]
+        data = self._decode(self.raw.view(file_offset, file_size), size)
+        if len(data) != size:
+            raise ValueError(f"Frame at {offset:#x} of {self.name} inflated to {len(data)} bytes, not {size}")
+        return data
+
+
+class StreamDumpSource(DumpSource):
+    """Compressed image that can only be decompressed front to back.
+
+    ``opener(path)`` returns a binary file object of the decompressed
+    image.  The size is learned with one decompressing pass on open.
+    Chunks are read in order, and anything earlier restarts the stream.
+    ``view`` serves bytes of the latest chunk, or else from a second
+    stream of its own that keeps a chunk of lookahead, so a view never
+    moves a scan.  ``path`` stays unset so analyses never shard it —
+    each shard would inflate all before it.
+    """
+
+    def __init__(self, path, opener):
+        self.name = path
+        self._opener = opener
+        self._scan = None
+        self._viewer = None
+        self._last = (0, b"")
+        self._ahead = (0, b"")
+        self.size = 0
+        with opener(path) as f:
+            buf = bytearray(CHUNK_SIZE)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                self.size += n
+
+    def view(self, offset, length):
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return memoryview(b"")
+        for base, data in (self._last, self._ahead):
+            if base <= offset and end <= base + len(data):
+                return memoryview(data)[offset - base:end - base]
+        if self._viewer is None or offset < self._viewer.pos:
+            if self._viewer is not None:
+                self._viewer.close()
+            self._viewer = _Inflater(self._opener(self.name))
+        if not self._viewer.skip(offset, CHUNK_SIZE):
+            return memoryview(b"")
+        data = self._viewer.read(max(end - offset, CHUNK_SIZE))
+        self._ahead = (offset, data)
+        return memoryview(data)[:end - offset]
+
+    def chunks(self, start=0, end=None, chunk_size=CHUNK_SIZE):
+        start, end = self._bounds(start, end)
+        if self._scan is None or start < self._scan.pos:
+            if self._scan is not None:
+                self._scan.close()
+            self._scan = _Inflater(self._opener(self.name))
+        scan = self._scan
+        if not scan.skip(start, chunk_size):
+            return
+        while scan.pos < end:
+            base = scan.pos
+            data = scan.read(min(chunk_size, end - base))
+            if not data:
+                break
+            self._last = (base, data)
+            yield base, memoryview(data)
+
+    def close(self):
+        for inflater in (self._scan, self._viewer):
+            if inflater is not None:
+                inflater.close()
+        self._scan = self._viewer = None
+
+
+class _Inflater:
+    """A decompressing stream and how far into the image it has read."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.pos = 0
+
+    def read(self, n):
+        """Read exactly ``n`` bytes unless the stream ends first."""
+        data = bytearray(n)
+        view = memoryview(data)
+        got = 0
+        while got < n:
+            k = self.stream.readinto(view[got:])
+            if not k:
+                break
+            got += k
+        self.pos += got
+        return data if got == n else data[:got]
+
+    def skip(self, offset, step):
+        """Read forward to ``offset``; false if the stream ends first."""
+        while self.pos < offset:
+            if not self.read(min(step, offset - self.pos)):
+                return False
+        return True
+
+    def close(self):
+        self.stream.close()
+
+
+def file_holes(fd, size):
+    """``(start, end)`` holes of the sparse file open on ``fd``.
+
+    Extents are found with ``SEEK_DATA``/``SEEK_HOLE``; files on
+    filesystems without hole reporting, and devices, have none.  The
+    file position is left wherever the last seek put it.
+    """
+    if not hasattr(os, "SEEK_HOLE") or size <= 0:
+        return []
+    holes = []
+    pos = 0
+    try:
+        while pos < size:
+            try:
+                data = os.lseek(fd, pos, os.SEEK_DATA)
+            except OSError as e:
+                if e.errno != errno.ENXIO:
+                    raise
+                data = size  # Nothing but hole up to the end of the file
+            if data > pos:
+                holes.append((pos, min(data, size)))
+            if data >= size:
+                break
+            pos = os.lseek(fd, data, os.SEEK_HOLE)
+    except OSError:
+        return []  # SEEK_DATA unsupported here — treat the file as dense
+    return holes
+
+
+def _present_runs(pagemap, first, last, page):
+    """Yield ``(start, end)`` address runs of resident pages in ``[first, last)``."""
+    run = None
+    for batch in range(first, last, PAGEMAP_BATCH):
+        count = min(PAGEMAP_BATCH, last - batch)
+        data = os.pread(pagemap, count * 8, batch * 8)
+        count = len(data) // 8
+        if np is not None:
+            present = (np.frombuffer(data, dtype=np.uint64, count=count) >> np.uint64(63)).astype(np.int8)
+            edges = np.flatnonzero(np.diff(present, prepend=0, append=0)).tolist()
+            pairs = zip(edges[::2], edges[1::2])
+        else:
+            entries = array("Q")
+            entries.frombytes(data[:count * 8])
+            pairs = _python_runs(entries)
+        for lo, hi in pairs:
+            lo, hi = (batch + lo) * page, (batch + hi) * page
+            if run and run[1] == lo:
+                run[1] = hi
+                continue
+            if run:
+                yield tuple(run)
+            run = [lo, hi]
+        if count < min(PAGEMAP_BATCH, last - batch):
+            break
+    if run:
+        yield tuple(run)
+
+
+def _python_runs(entries):
+    start = None
+    for i, entry in enumerate(entries):
+        if entry & PAGEMAP_PRESENT:
+            if start is None:
+                start = i
+        elif start is not None:
+            yield start, i
+            start = None
+    if start is not None:
+        yield start, len(entries)
+
+
+def _elf_segments(path, physical):
+    """``(address, file_offset, length)`` of the stored ``PT_LOAD`` segments."""
+    with open(path, "rb") as f:
+        ident = f.read(64)
+        if ident[:4] != b"\x7fELF" or ident[4:5] not in (b"\x01", b"\x02") \
+                or ident[5:6] not in (b"\x01", b"\x02"):
+            raise ValueError(f"Not an ELF file: {path}")
+        wide = ident[4] == 2
+        order = "<" if ident[5] == 1 else ">"
+        if wide:
+            phoff, shoff = struct.unpack_from(order + "QQ", ident, 0x20)
+            phentsize, phnum = struct.unpack_from(order + "HH", ident, 0x36)
+        else:
+            phoff, shoff = struct.unpack_from(order + "II", ident, 0x1C)
+            phentsize, phnum = struct.unpack_from(order + "HH", ident, 0x2A)
+        if phnum == 0xFFFF:
+            # PN_XNUM — the real count is in section header 0's sh_info
+            f.seek(shoff)
+            phnum, = struct.unpack_from(order + "I", f.read(64), 0x2C if wide else 0x1C)
+        f.seek(phoff)
+        table = f.read(phentsize * phnum)
+
+    layout = order + ("IIQQQQ" if wide else "IIIII")
+    if phnum and phentsize < struct.calcsize(layout):
+        raise ValueError(f"Bad ELF program header size {phentsize}: {path}")
+    for i in range(phnum):
+        fields = struct.unpack_from(layout, table, i * phentsize)
+        if wide:
+            p_type, _, p_offset, p_vaddr, p_paddr, p_filesz = fields
+        else:
+            p_type, p_offset, p_vaddr, p_paddr, p_filesz = fields
+        if p_type == PT_LOAD and p_filesz:
+            yield (p_paddr if physical else p_vaddr), p_offset, p_filesz
+
+
+def _bgzf_frames(raw):
+    """Member table of a BGZF (``bgzip``) file, or ``None`` for other gzip files."""
+    frames = []
+    offset = pos = 0
+    while pos < raw.size:
+        head = bytes(raw.view(pos, 18))
+        # Standard BGZF header: FEXTRA with one 'BC' subfield holding BSIZE
+        if len(head) < 18 or head[:4] != b"\x1f\x8b\x08\x04" or head[10:16] != b"\x06\x00BC\x02\x00":
+            return None
+        block = struct.unpack_from("<H", head, 16)[0] + 1
+        if pos + block > raw.size:
+            return None
+        size, = struct.unpack("<I", bytes(raw.view(pos + block - 4, 4)))
+        if size:  # The EOF marker is an empty member
+            frames.append((offset, size, pos, block))
+        offset += size
+        pos += block
+    return frames
+
+
+def _zstd_frames(raw):
+    """Frame table from a zstd seekable-format seek table, or ``None``."""
+    footer = bytes(raw.view(raw.size - 9, 9)) if raw.size >= 9 else b""
+    if len(footer) < 9:
+        return None
+    count, descriptor, magic = struct.unpack("<IBI", footer)
+    if magic != ZSTD_SEEKABLE_MAGIC:
+        return None
+    entry = 12 if descriptor & 0x80 else 8  # Optional per-frame checksum
+    table_start = raw.size - 9 - count * entry
+    if table_start < 8:
+        return None
+    skippable, frame_size = struct.unpack("<II", bytes(raw.view(table_start - 8, 8)))
+    if skippable != ZSTD_SKIPPABLE_MAGIC or frame_size != count * entry + 9:
+        return None
+    table = bytes(raw.view(table_start, count * entry))
+    frames = []
+    offset = pos = 0
+    for i in range(count):
+        file_size, size = struct.unpack_from("<II", table, i * entry)
+        if size:
+            frames.append((offset, size, pos, file_size))
+        offset += size
+        pos += file_size
+    return frames
+
+
+def _frame_table(raw, builder):
+    """``builder(raw)``, remembered per file — shard workers reopen a dump many times."""
+    st = os.stat(raw.path)
+    key = (raw.path, st.st_size, st.st_mtime_ns, builder.__name__)
+    if key not in _frame_tables:
+        if len(_frame_tables) >= 8:
+            _frame_tables.clear()
+        _frame_tables[key] = builder(raw)
+    return _frame_tables[key]
+
+
+_frame_tables = {}
+_zstd_local = threading.local()
+
+
+def _zstd_decode(data, size):
+    dctx = getattr(_zstd_local, "dctx", None)
+    if dctx is None:  # Decompression contexts must not be shared between threads
+        dctx = _zstd_local.dctx = zstandard.ZstdDecompressor()
+    return dctx.decompress(data, max_output_size=size)
+
+
+def _open_gzip(path):
+    raw = _open_raw(path)
+    frames = _frame_table(raw, _bgzf_frames)
+    if frames is None:
+        raw.close()
+        return StreamDumpSource(path, gzip.open)
+    return FrameDumpSource(raw, frames, lambda data, size: zlib.decompress(data, 31))
+
+
+def _open_zstd(path):
+    if zstandard is None:
+        raise ValueError(f"Reading {path} requires the zstandard package")
+    raw = _open_raw(path)
+    frames = _frame_table(raw, _zstd_frames)
+    if frames is None:
+        raw.close()
+        return StreamDumpSource(path, lambda p: zstandard.ZstdDecompressor().stream_reader(
+            open(p, "rb"), read_across_frames=True, closefd=True,
+        ))
+    return FrameDumpSource(raw, frames, _zstd_decode)
+
+
+def _open_lz4(path):
+    if lz4 is None:
+        raise ValueError(f"Reading {path} requires the lz4 package")
+    return StreamDumpSource(path, lambda p: lz4.frame.open(p, "rb"))
+
+
+def _is_elf_core(head):
+    if head[:4] != b"\x7fELF" or len(head) < 18:
+        return False
+    return struct.unpack_from("<H" if head[5:6] == b"\x01" else ">H", head, 16)[0] == ET_CORE
+
+
+DUMP_FORMATS = [  # (name, sniff(first 64 bytes), opener(path)) — first match wins
+    ("gzip", lambda head: head[:2] == b"\x1f\x8b", _open_gzip),
+    ("zstd", lambda head: head[:4] == b"\x28\xb5\x2f\xfd", _open_zstd),
+    ("lz4", lambda head: head[:4] == b"\x04\x22\x4d\x18", _open_lz4),
+    ("lime", lambda head: head[:4] == struct.pack("<I", LIME_MAGIC), LimeDumpSource),
+    ("elf-core", _is_elf_core, ElfCoreDumpSource),
+]
+
+
+def register_dump_format(name, sniff, opener):
+    """Teach :func:`open_dump` a format.
+
+    ``sniff(head)`` gets the first 64 bytes of a file and says whether
+    it is in this format; ``opener(path)`` returns its
+    :class:`DumpSource`.  Formats registered later are tried first.
+    """
+    DUMP_FORMATS.insert(0, (name, sniff, opener))
+
+
+def open_dump(path, format=None):
+    """Open ``path`` as a :class:`DumpSource`.
+
+    The format is sniffed from the file's magic unless ``format`` names
+    one (``"raw"`` or a name in ``DUMP_FORMATS``).  Raw images are
+    memory-mapped when possible.  Malformed containers and missing
+    decompressors raise ``ValueError``.
+    """
+    if format is None:
+        try:
+            with open(path, "rb") as f:
+                head = f.read(64)
+        except OSError:
+            head = b""  # Let the raw opener report it
+        format = next((name for name, sniff, _ in DUMP_FORMATS if sniff(head)), "raw")
+    if format == "raw":
+        return _open_raw(path)
+    for name, _, opener in DUMP_FORMATS:
+        if name == format:
+            return opener(path)
+    raise ValueError(f"Unknown dump format: {format}")
+
+
+def _open_raw(path):
+    try:
+        return MappedDumpSource(path)
+    except (ValueError, OSError, OverflowError):
+        return FileDumpSource(path)
@@ -0,0 +1,296 @@
+"""Hyperreal Entropy Map — every block's entropy, one byte each.
+
+The analysis report samples entropy once per megabyte; an
+:class:`EntropyMap` keeps all of it.  Each block's Shannon entropy is
+quantized to one byte (1/32 bit resolution), so a 64GB dump of 4KB
+blocks costs 16MB.  A min/max/mean pyramid answers zoomed-out views
+without rescanning, and sliding-window detectors find *entropy
+deserts* — stretches that say almost nothing — and *high-entropy
+islands*, the encrypted or packed payloads hiding between them.
+"""
+
+import os
+import sys
+import ast
+import json
+import struct
+from array import array
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional — pyramids and windows fall back to Python
+    np = None
+
+QUANTUM = 32  # Codes per bit of entropy: code = round(entropy * QUANTUM)
+FANOUT = 16  # Blocks summarized by one entry of the next pyramid level
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_DESCR = {"B": "|u1", "Q": "<u8"}  # array typecodes .npy files are written from
+WINDOW_BATCH = 1 << 20  # Windows summed at a time with NumPy
+
+
+def quantize(entropies):
+    """Entropy values (bits per byte) as a ``bytes`` of codes."""
+    return bytes(min(255, int(e * QUANTUM + 0.5)) for e in entropies)
+
+
+class EntropyMap:
+    """Per-block entropy codes of one image, in offset order.
+
+    ``codes`` is an ``array('B')``; ``entropy(i)`` turns a code back into
+    bits per byte.  Blocks are normally contiguous from offset 0; sparse
+    sources (live address spaces) start a new segment at every gap, and
+    ``offset(i)`` maps a block index back to its offset either way.
+    """
+
+    DESERT_THRESHOLD = 1.0  # Mean bits per byte below which a window is a desert
+    ISLAND_THRESHOLD = 7.0  # Mean bits per byte above which a window is an island
+
+    def __init__(self, block_size=4096):
+        self.block_size = block_size
+        self.codes = array("B")
+        self.segments = []  # (offset, first block index) at each discontinuity
+        self._next = None
+        self._pyramid = None
+        self._starts = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def append(self, offset, codes):
+        """Add codes for consecutive blocks starting at ``offset``."""
+        if offset != self._next:
+            self.segments.append((offset, len(self.codes)))
+            self._starts = None
+        self.codes.frombytes(bytes(codes))
+        self._next = offset + len(codes) * self.block_size
+        self._pyramid = None
+
+    def entropy(self, index):
+        return self.codes[index] / QUANTUM
+
+    def offset(self, index):
+        """Byte offset of block ``index``."""
+        if self._starts is None:
+            self._starts = [first for _, first in self.segments]
+        base, first = self.segments[bisect_right(self._starts, index) - 1]
+        return base + (index - first) * self.block_size
+
+    def pyramid(self):
+        """``[(mins, maxs, means), ...]`` — level ``k`` summarizes ``FANOUT**k`` blocks.
+
+        Level 0 is the codes themselves; each further level is ``FANOUT``
+        times smaller, so the whole pyramid adds under 7% per array.
+        Built on first use and cached until the map changes.
+        """
+        if self._pyramid is None:
+            level = (self.codes, self.codes, self.codes)
+            levels = [level]
+            while len(level[0]) > 1:
+                level = _reduce(*level)
+                levels.append(level)
+            self._pyramid = levels
+        return self._pyramid
+
+    def zoom(self, start=0, end=None, buckets=1024):
+        """Summarize blocks ``[start, end)`` in roughly ``buckets`` rows.
+
+        Returns ``(first_block, block_count, min, max, mean)`` tuples in
+        bits per byte, read from the coarsest pyramid level that still
+        gives at least ``buckets`` rows (fewer than ``FANOUT`` times as
+        many) — no block is revisited.
+        """
+        end = len(self.codes) if end is None else min(end, len(self.codes))
+        levels = self.pyramid()
+        k = 0
+        while k + 1 < len(levels) and (end - start) // FANOUT ** (k + 1) >= buckets:
+            k += 1
+        span = FANOUT ** k
+        mins, maxs, means = levels[k]
+        rows = []
+        for i in range(start // span, -(-end // span)):
+            rows.append((
+                i * span,
+                min(span, len(self.codes) - i * span),
+                mins[i] / QUANTUM,
+                maxs[i] / QUANTUM,
+                means[i] / QUANTUM,
+            ))
+        return rows
+
+    def deserts(self, window=64, threshold=None):
+        """Block ranges whose ``window``-block mean entropy stays below ``threshold``."""
+        threshold = self.DESERT_THRESHOLD if threshold is None else threshold
+        return self._windows(window, threshold * QUANTUM, below=True)
+
+    def islands(self, window=16, threshold=None):
+        """Block ranges whose ``window``-block mean entropy exceeds ``threshold``."""
+        threshold = self.ISLAND_THRESHOLD if threshold is None else threshold
+        return self._windows(window, threshold * QUANTUM, below=False)
+
+    def save(self, path):
+        """Write the codes as a 1-D ``uint8`` ``.npy`` file.
+
+        The file loads with ``numpy.load`` too.  Block size and segments
+        go to ``<path>.json`` beside it.
+        """
+        write_npy(path, self.codes)
+        with open(path + ".json", "w") as f:
+            json.dump({"block_size": self.block_size, "segments": self.segments}, f)
+
+    @classmethod
+    def load(cls, path):
+        """Read a map written by :meth:`save`."""
+        codes = read_npy(path, "B")
+        meta = {"block_size": 4096, "segments": [[0, 0]] if len(codes) else []}
+        if os.path.exists(path + ".json"):
+            with open(path + ".json") as f:
+                meta = json.load(f)
+        emap = cls(meta["block_size"])
+        emap.codes = codes
+        emap.segments = [tuple(segment) for segment in meta["segments"]]
+        return emap
+
+    def _windows(self, window, limit, below):
+        """Ranges where the ``window``-block mean code is beyond ``limit``.
+
+        Windows stay within one segment.  Overlapping windows are merged
+        and trimmed to start and end on a block that is itself beyond
+        ``limit``.  Returns ``(first_block, end_block, mean_entropy)``
+        tuples.
+        """
+        codes = self.codes
+        if window < 1:
+            return []
+
+        def beyond(value, scale=1):
+            return value < limit * scale if below else value > limit * scale
+
+        ranges = []
+        for first, last in self._segment_blocks():
+            for start, end in _hit_runs(codes, first, last, window, beyond):
+                # Hits ``start..end-1`` cover blocks up to ``end - 1 + window``
+                if ranges and first <= ranges[-1][0] and start <= ranges[-1][1]:
+                    ranges[-1][1] = end - 1 + window
+                else:
+                    ranges.append([start, end - 1 + window])
+
+        found = []
+        view = memoryview(codes)
+        for start, end in ranges:
+            while not beyond(codes[start]):
+                start += 1
+            while not beyond(codes[end - 1]):
+                end -= 1
+            if np is not None:
+                total = int(np.frombuffer(codes, dtype=np.uint8)[start:end].sum(dtype=np.int64))
+            else:
+                total = sum(view[start:end])
+            found.append((start, end, round(total / (end - start) / QUANTUM, 3)))
+        return found
+
+    def _segment_blocks(self):
+        """``(first, end)`` block index range of each segment."""
+        firsts = [first for _, first in self.segments] or [0]
+        return zip(firsts, firsts[1:] + [len(self.codes)])
+
+
+def write_npy(path, values):
+    """Write an ``array('B')`` or ``array('Q')`` as a 1-D ``.npy`` file."""
+    descr = NPY_DESCR[values.typecode]
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, len(values))
+    pad = 64 - (len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = (header + " " * (pad % 64) + "\n").encode("latin1")
+    if values.itemsize > 1 and sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    with open(path, "wb") as f:
+        f.write(NPY_MAGIC + struct.pack("<H", len(header)) + header)
+        values.tofile(f)
+
+
+def read_npy(path, typecode):
+    """Read a 1-D ``.npy`` file written by :func:`write_npy` into an ``array``."""
+    with open(path, "rb") as f:
+        if f.read(len(NPY_MAGIC))[:6] != NPY_MAGIC[:6]:
+            raise ValueError(f"Not a .npy file: {path}")
+        length, = struct.unpack("<H", f.read(2))
+        header = ast.literal_eval(f.read(length).decode("latin1"))
+        if header.get("descr") != NPY_DESCR[typecode] or len(header.get("shape", ())) != 1:
+            raise ValueError(f"Expected a 1-D {NPY_DESCR[typecode]} array: {path}")
+        values = array(typecode)
+        values.frombytes(f.read(header["shape"][0] * values.itemsize))
+    if values.itemsize > 1 and sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _hit_runs(codes, first, last, window, beyond):
+    """Yield ``(start, end)`` runs of windows within ``codes[first:last]`` that are ``beyond``.
+
+    Window ``i`` covers blocks ``i..i+window-1``; NumPy sums windows
+    ``WINDOW_BATCH`` at a time, Python slides one running total.
+    """
+    count = last - first - window + 1
+    if count <= 0:
+        return
+    if np is None:
+        total = sum(memoryview(codes)[first:first + window])
+        run = None
+        for i in range(first, first + count):
+            if beyond(total, window):
+                if run is None:
+                    run = i
+            elif run is not None:
+                yield run, i
+                run = None
+            if i + window < last:
+                total += codes[i + window] - codes[i]
+        if run is not None:
+            yield run, first + count
+        return
+    values = np.frombuffer(codes, dtype=np.uint8)
+    run = None
+    for batch in range(first, first + count, WINDOW_BATCH):
+        n = min(WINDOW_BATCH, first + count - batch)
+        sums = np.cumsum(values[batch:batch + n + window - 1], dtype=np.int64)
+        sums = np.concatenate(([0], sums))
+        mask = beyond(sums[window:] - sums[:-window], window).astype(np.int8)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], mask, [0])))).tolist()
+        for k in range(0, len(edges), 2):
+            start, end = batch + edges[k], batch + edges[k + 1]
+            if run is not None:
+                if start == run[1]:
+                    run[1] = end
+                    continue
+                yield tuple(run)
+            run = [start, end]
+    if run is not None:
+        yield tuple(run)
+
+
+def _reduce(mins, maxs, means):
+    """Next pyramid level: min, max and mean over groups of ``FANOUT``."""
+    n = len(mins)
+    if np is not None:
+        groups = -(-n // FANOUT)
+        pad = groups * FANOUT - n
+        out = []
+        for values, op, fill in ((mins, np.min, 255), (maxs, np.max, 0)):
+            a = np.frombuffer(values, dtype=np.uint8)
+            if pad:
+                a = np.concatenate((a, np.full(pad, fill, dtype=np.uint8)))
+            out.append(array("B", op(a.reshape(groups, FANOUT), axis=1).tobytes()))
+        a = np.frombuffer(means, dtype=np.uint8).astype(np.float64)
+        sums = np.add.reduceat(a, np.arange(0, n, FANOUT))
+        counts = np.minimum(FANOUT, n - np.arange(0, n, FANOUT))
+        out.append(array("B", np.floor(sums / counts + 0.5).astype(np.uint8).tobytes()))
+        return tuple(out)
+
+    out_min, out_max, out_mean = array("B"), array("B"), array("B")
+    for i in range(0, n, FANOUT):
+        out_min.append(min(mins[i:i + FANOUT]))
+        out_max.append(max(maxs[i:i + FANOUT]))
+        group = means[i:i + FANOUT]
+        out_mean.append(int(sum(group) / len(group) + 0.5))
+    return out_min, out_max, out_mean
@@ -3,198 +3,864 @@
 Examines filesystems through Baudrillard's hyperreality framework:
 what has been deleted, overwritten, or hollowed out reveals more
 than what remains.
+
+All scans share one ``os.scandir`` traversal.  Each analysis is a
+:class:`Detector`; :meth:`FilesystemHyperreal.scan` runs every
+registered detector over a single walk, reusing each entry's cached
+stat result, and the individual scans are that walk with one detector.
+
+Every scan has an ``iter_*`` twin that yields findings as the tree is
+walked.  Scans accept ``progress(done, total)``, called after each
+directory with the number of files seen (``total`` is ``None`` — a
+tree's size isn't known up front); returning ``False`` stops the walk.
 """
 
 import os
 import stat
+import time
 import hashlib
 import json
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
+from .dump_source import file_holes
+from .profiling import Profiler
+from .scan_cache import ScanCache
+from .watch import FilesystemWatch
 
-class FilesystemHyperreal:
-    """Analyze filesystem for hyperreal indicators — what's missing matters most."""
+try:
+    import xxhash
+except ImportError:  # xxhash is optional — hashlib algorithms always work
+    xxhash = None
 
-    # Temporal anomaly thresholds
-    FUTURE_THRESHOLD = 3600  # 1 hour in the future
-    ANCIENT_THRESHOLD = 946684800  # Before Y2K
 
-    def scan_temporal_anomalies(self, root_path, max_depth=3):
-        """Find files with impossible or suspicious timestamps.
+class Detector:
+    """A single analysis plugged into the fused filesystem walk.
 
-        In hyperreality, time itself becomes simulated — timestamps
-        that don't match reality indicate manipulation.
-        """
-        now = datetime.now().timestamp()
-        anomalies = []
+    A fresh instance is created for every scan.  ``visit_file`` is called
+    for each file and ``visit_directory`` for each subdirectory listed in
+    a scanned directory; both receive an ``os.DirEntry`` and yield
+    findings.  ``report`` turns the collected findings into the report
+    returned by :meth:`FilesystemHyperreal.scan`.
 
-        for dirpath, dirnames, filenames in os.walk(root_path):
-            # Depth control
-            depth = dirpath.replace(root_path, "").count(os.sep)
-            if depth >= max_depth:
-                dirnames.clear()
-                continue
+    Watch mode (:class:`FilesystemWatch`) keeps one instance alive for
+    as long as it runs: ``refresh`` is called before each batch of
+    changes and ``forget`` before a changed or removed file is let go.
+    """
 
-            for fname in filenames:
-                fpath = os.path.join(dirpath, fname)
-                try:
-                    st = os.lstat(fpath)
-
-                    # Future timestamps (Order 4 — no relation to temporal reality)
-                    if st.st_mtime > now + self.FUTURE_THRESHOLD:
-                        anomalies.append({
-                            "path": fpath,
-                            "type": "FUTURE_TIMESTAMP",
-                            "order": 4,
-                            "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            "description": "File claims to be from the future — temporal simulacrum",
-                        })
-
-                    # Ancient timestamps (Order 3 — masks real creation time)
-                    elif st.st_mtime < self.ANCIENT_THRESHOLD:
-                        anomalies.append({
-                            "path": fpath,
-                            "type": "ANCIENT_TIMESTAMP",
-                            "order": 3,
-                            "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            "description": "Impossibly old timestamp — hiding true origin",
-                        })
-
-                    # mtime before ctime (Order 2 — contradictory metadata)
-                    elif st.st_mtime < st.st_ctime - 60:
-                        anomalies.append({
-                            "path": fpath,
-                            "type": "TEMPORAL_PARADOX",
-                            "order": 2,
-                            "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            "ctime": datetime.fromtimestamp(st.st_ctime).isoformat(),
-                            "description": "Modified before created — timestomping detected",
-                        })
-
-                except (OSError, PermissionError):
-                    continue
+    name = None
+
+    def __init__(self, scanner):
+        self.scanner = scanner
+
+    def visit_file(self, entry):
+        return ()
+
+    def visit_directory(self, entry):
+        return ()
 
+    def refresh(self):
+        pass
+
+    def forget(self, path):
+        pass
+
+    def report(self, root_path, findings):
         return {
             "root": root_path,
             "scan_time": datetime.utcnow().isoformat(),
-            "anomalies_found": len(anomalies),
-            "anomalies": anomalies,
+            "findings": findings,
         }
 
-    def detect_hidden_spaces(self, root_path, max_depth=3):
-        """Find hidden files, alternate data streams, and concealed spaces."""
-        hidden = []
 
-        for dirpath, dirnames, filenames in os.walk(root_path):
-            depth = dirpath.replace(root_path, "").count(os.sep)
-            if depth >= max_depth:
-                dirnames.clear()
-                continue
+class TemporalAnomalyDetector(Detector):
+    """Files with impossible or suspicious timestamps.
 
-            for fname in filenames:
-                fpath = os.path.join(dirpath, fname)
-
-                # Hidden files (dot-prefix)
-                if fname.startswith(".") and fname not in (".gitignore", ".gitkeep", ".editorconfig"):
-                    try:
-                        st = os.stat(fpath)
-                        hidden.append({
-                            "path": fpath,
-                            "type": "HIDDEN_FILE",
-                            "size": st.st_size,
-                            "order": 2,
-                            "description": "File concealed by naming convention",
-                        })
-                    except (OSError, PermissionError):
-                        continue
-
-                # Files with no extension in binary directories
-                try:
-                    st = os.stat(fpath)
-                    if "." not in fname and st.st_mode & stat.S_IXUSR:
-                        hidden.append({
-                            "path": fpath,
-                            "type": "UNNAMED_EXECUTABLE",
-                            "size": st.st_size,
-                            "order": 2,
-                            "description": "Executable without extension — identity obscured",
-                        })
-                except (OSError, PermissionError):
-                    continue
+    In hyperreality, time itself becomes simulated — timestamps
+    that don't match reality indicate manipulation.
+    """
+
+    name = "temporal_anomalies"
+
+    def __init__(self, scanner):
+        super().__init__(scanner)
+        self.now = datetime.now().timestamp()
+
+    def refresh(self):
+        self.now = datetime.now().timestamp()
+
+    def visit_file(self, entry):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except (OSError, PermissionError):
+            return
+
+        # Future timestamps (Order 4 — no relation to temporal reality)
+        if st.st_mtime > self.now + self.scanner.FUTURE_THRESHOLD:
+            yield {
+                "path": entry.path,
+                "type": "FUTURE_TIMESTAMP",
+                "order": 4,
+                "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                "description": "File claims to be from the future — temporal simulacrum",
+            }
+
+        # Ancient timestamps (Order 3 — masks real creation time)
+        elif st.st_mtime < self.scanner.ANCIENT_THRESHOLD:
+            yield {
+                "path": entry.path,
+                "type": "ANCIENT_TIMESTAMP",
+                "order": 3,
+                "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                "description": "Impossibly old timestamp — hiding true origin",
+            }
 
-            # Hidden directories
-            for dname in dirnames:
-                if dname.startswith(".") and dname not in (".git", ".github", ".vscode"):
-                    hidden.append({
-                        "path": os.path.join(dirpath, dname),
-                        "type": "HIDDEN_DIRECTORY",
-                        "order": 2,
-                        "description": "Directory concealed by naming convention",
-                    })
+        # mtime before ctime (Order 2 — contradictory metadata)
+        elif st.st_mtime < st.st_ctime - 60:
+            yield {
+                "path": entry.path,
+                "type": "TEMPORAL_PARADOX",
+                "order": 2,
+                "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                "ctime": datetime.fromtimestamp(st.st_ctime).isoformat(),
+                "description": "Modified before created — timestomping detected",
+            }
 
+    def report(self, root_path, findings):
         return {
             "root": root_path,
             "scan_time": datetime.utcnow().isoformat(),
-            "hidden_count": len(hidden),
-            "items": hidden,
+            "anomalies_found": len(findings),
+            "anomalies": findings,
         }
 
-    def find_duplicate_simulacra(self, root_path, max_depth=3):
-        """Find duplicate files — copies that may have replaced originals.
 
-        In Baudrillard's framework, when copies proliferate, the concept
-        of 'original' becomes meaningless.
+class HiddenSpaceDetector(Detector):
+    """Hidden files, alternate data streams, and concealed spaces."""
+
+    name = "hidden_spaces"
+
+    def visit_file(self, entry):
+        fname = entry.name
+        try:
+            # DirEntry caches this, and reuses the lstat for non-links
+            st = entry.stat()
+        except (OSError, PermissionError):
+            return
+
+        # Hidden files (dot-prefix)
+        if fname.startswith(".") and fname not in (".gitignore", ".gitkeep", ".editorconfig"):
+            yield {
+                "path": entry.path,
+                "type": "HIDDEN_FILE",
+                "size": st.st_size,
+                "order": 2,
+                "description": "File concealed by naming convention",
+            }
+
+        # Files with no extension in binary directories
+        if "." not in fname and st.st_mode & stat.S_IXUSR:
+            yield {
+                "path": entry.path,
+                "type": "UNNAMED_EXECUTABLE",
+                "size": st.st_size,
+                "order": 2,
+                "description": "Executable without extension — identity obscured",
+            }
+
+    def visit_directory(self, entry):
+        # Hidden directories
+        if entry.name.startswith(".") and entry.name not in (".git", ".github", ".vscode"):
+            yield {
+                "path": entry.path,
+                "type": "HIDDEN_DIRECTORY",
+                "order": 2,
+                "description": "Directory concealed by naming convention",
+            }
+
+    def report(self, root_path, findings):
+        return {
+            "root": root_path,
+            "scan_time": datetime.utcnow().isoformat(),
+            "hidden_count": len(findings),
+            "items": findings,
+        }
+
+
+class DuplicateDetector(Detector):
+    """Duplicate files — copies that may have replaced originals.
+
+    In Baudrillard's framework, when copies proliferate, the concept
+    of 'original' becomes meaningless.
+
+    Hashing is staged so most bytes are never read: a file is only
+    hashed once another file of the same size turns up, then its first
+    and last ``PARTIAL_SIZE`` bytes are compared, and only files that
+    still collide get a streamed full hash, in which the holes of sparse
+    files are hashed as zeros without being read.  Each inode is hashed
+    at most once, so hardlinks share a digest; they are identical by
+    definition, and an inode with several links is only hashed once
+    another inode of its size turns up.  A file is reported the moment
+    it turns out to duplicate an earlier one.
+
+    With a scanner ``cache``, digests of unchanged inodes are taken from
+    it instead of being recomputed, and new digests are written back.
+    """
+
+    name = "duplicate_simulacra"
+    PARTIAL_SIZE = 4096  # Bytes hashed from each end in the partial stage
+    READ_SIZE = 1024 * 1024  # Chunk size for streamed full hashes
+
+    def __init__(self, scanner):
+        super().__init__(scanner)
+        self.new_hash = _hash_factory(scanner.hash_algorithm)
+        self.by_size = defaultdict(list)  # size -> inode records
+        self.by_partial = defaultdict(list)  # (size, partial digest) -> records
+        self.inodes = {}  # (st_dev, st_ino) -> record
+        self.paths = {}  # path -> inode key of its record, hardlinks included
+        self.first_seen = {}  # full digest -> first file with that content
+        self.counts = defaultdict(int)
+        self.stats = {"partial_hashes": 0, "full_hashes": 0, "bytes_hashed": 0, "hole_bytes": 0,
+                      "read_errors": 0}
+        self.cache = scanner.cache
+        if self.cache is not None:
+            self._cache_base = dict(self.cache.stats)
+        self._buf = None
+        self._zeros = None
+
+    def visit_file(self, entry):
+        try:
+            # Symlinks are not copies — only the files they point at count
+            st = entry.stat(follow_symlinks=False)
+        except (OSError, PermissionError):
+            return
+        if not stat.S_ISREG(st.st_mode) or st.st_size == 0:  # Skip empty/special/links
+            return
+
+        file_info = {
+            "path": entry.path,
+            "size": st.st_size,
+            "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(),
+        }
+        key = (st.st_dev, st.st_ino)
+        record = self.inodes.get(key)
+        if record is not None and (record["stat"].st_size, record["stat"].st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+            self._drop(key)  # Rewritten through another name — its digests are stale
+            record = None
+        if record is not None:
+            # Hardlink: same bytes by definition, so hash the inode once
+            link = {"info": dict(file_info, hardlink=True), "counted": False}
+            record["paths"].append(link)
+            self.paths[entry.path] = key
+            if record["counted"]:
+                yield from self._count_path(record, link)
+            elif len(self.by_size[st.st_size]) > 1:
+                yield from self._settle(record)
+            return
+
+        record = {
+            "info": file_info, "stat": st, "partial": None, "full": None,
+            "paths": [{"info": file_info, "counted": False}],
+            "counted": False, "recalled": False, "cache_hit": None,
+        }
+        self.inodes[key] = record
+        self.paths[entry.path] = key
+        bucket = self.by_size[st.st_size]
+        bucket.append(record)
+        if len(bucket) == 1:
+            return  # Unique size so far — nothing to compare against, read nothing
+
+        for peer in bucket:
+            if peer["partial"] is None and self._partial(peer) is not None:
+                self.by_partial[(st.st_size, peer["partial"])].append(peer)
+        for peer in bucket:
+            if len(peer["paths"]) > 1:
+                yield from self._settle(peer)  # Its hardlinks waited for a same-size peer
+
+        peers = self.by_partial.get((st.st_size, record["partial"]), ())
+        if record["partial"] is None or len(peers) < 2:
+            return
+        for peer in peers:
+            yield from self._settle(peer)
+
+    def forget(self, path):
+        """Drop ``path``'s count, and its inode's record once no path is left.
+
+        Changed content is hashed anew when the path is visited again.
         """
-        hash_map = defaultdict(list)
+        key = self.paths.pop(path, None)
+        if key is None:
+            return
+        record = self.inodes[key]
+        gone = next(p for p in record["paths"] if p["info"]["path"] == path)
+        record["paths"].remove(gone)
+        if gone["counted"]:
+            self._uncount(record["full"], gone["info"])
+        if record["paths"]:
+            record["info"] = record["paths"][0]["info"]  # Read the inode through a path still there
+        else:
+            self._drop(key)
 
-        for dirpath, dirnames, filenames in os.walk(root_path):
-            depth = dirpath.replace(root_path, "").count(os.sep)
-            if depth >= max_depth:
-                dirnames.clear()
-                continue
+    def _drop(self, key):
+        """Remove an inode's record and uncount every path of it."""
+        record = self.inodes.pop(key)
+        size = record["stat"].st_size
+        self.by_size[size] = [r for r in self.by_size[size] if r is not record]
+        if record["partial"] is not None:
+            peers = self.by_partial[(size, record["partial"])]
+            self.by_partial[(size, record["partial"])] = [r for r in peers if r is not record]
+        paths, record["paths"] = record["paths"], []
+        for p in paths:
+            self.paths.pop(p["info"]["path"], None)
+            if p["counted"]:
+                self._uncount(record["full"], p["info"])
 
-            for fname in filenames:
-                fpath = os.path.join(dirpath, fname)
-                try:
-                    st = os.stat(fpath)
-                    if st.st_size == 0 or st.st_size > 100 * 1024 * 1024:  # Skip empty/huge
-                        continue
-                    with open(fpath, "rb") as f:
-                        h = hashlib.sha256(f.read()).hexdigest()
-                    hash_map[h].append({
-                        "path": fpath,
-                        "size": st.st_size,
-                        "mtime": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                    })
-                except (OSError, PermissionError):
-                    continue
+    def _uncount(self, digest, file_info):
+        self.counts[digest] -= 1
+        if self.first_seen.get(digest) is file_info:
+            # Later copies name a file that still exists as their original
+            survivor = next((p["info"] for r in self.inodes.values() if r["full"] == digest
+                             for p in r["paths"] if p["counted"]), None)
+            if survivor is None:
+                del self.first_seen[digest]
+                self.counts[digest] = 0
+            else:
+                self.first_seen[digest] = survivor
+
+    def _settle(self, record):
+        """Full-hash an inode record and count each of its paths once."""
+        if record["counted"] or self._full(record) is None:
+            return
+        record["counted"] = True
+        for p in record["paths"]:
+            yield from self._count_path(record, p)
+
+    def _count_path(self, record, p):
+        p["counted"] = True
+        yield from self._count(record["full"], p["info"])
+
+    def _count(self, digest, file_info):
+        self.counts[digest] += 1
+        if self.counts[digest] == 1:
+            self.first_seen[digest] = file_info
+            return
+        yield dict(
+            file_info,
+            type="DUPLICATE",
+            hash=digest,
+            first_seen=self.first_seen[digest],
+            order=2 if self.counts[digest] <= 3 else 3,
+        )
+
+    def _partial(self, record):
+        """Hash the first and last ``PARTIAL_SIZE`` bytes of a file."""
+        if self._recall(record, "partial") is not None:
+            return record["partial"]
+        size = record["info"]["size"]
+        if size <= 2 * self.PARTIAL_SIZE:
+            # Small file — the partial hash *is* the full hash
+            return self._full(record, partial_stage=True)
+        try:
+            with open(record["info"]["path"], "rb") as f:
+                h = self.new_hash()
+                h.update(f.read(self.PARTIAL_SIZE))
+                f.seek(size - self.PARTIAL_SIZE)
+                h.update(f.read(self.PARTIAL_SIZE))
+        except (OSError, PermissionError):
+            self.stats["read_errors"] += 1
+            return None
+        self.stats["partial_hashes"] += 1
+        self.stats["bytes_hashed"] += 2 * self.PARTIAL_SIZE
+        record["partial"] = h.hexdigest()
+        self._remember(record)
+        return record["partial"]
+
+    def _full(self, record, partial_stage=False):
+        """Streamed hash of a whole file, computed at most once per inode."""
+        if record["full"] is not None:
+            if partial_stage:
+                # Hashed whole already (e.g. through a hardlink) — file it by partial too
+                record["partial"] = record["full"]
+            return record["full"]
+        if not partial_stage and self._recall(record, "full") is not None:
+            return record["full"]
+        if self._buf is None:
+            self._buf = bytearray(self.READ_SIZE)
+        buf = memoryview(self._buf)
+        h = self.new_hash()
+        try:
+            with open(record["info"]["path"], "rb", buffering=0) as f:
+                pos = 0
+                for hole_start, hole_end in self._holes(f, record["stat"]) + [(None, None)]:
+                    while hole_start is None or pos < hole_start:
+                        want = len(buf) if hole_start is None else min(len(buf), hole_start - pos)
+                        n = f.readinto(buf[:want])
+                        if not n:
+                            break
+                        h.update(buf[:n])
+                        pos += n
+                        self.stats["bytes_hashed"] += n
+                    if hole_start is not None:
+                        # A hole reads as zeros — hash them without reading
+                        for at in range(hole_start, hole_end, len(buf)):
+                            h.update(self._zeros[:min(len(buf), hole_end - at)])
+                        self.stats["hole_bytes"] += hole_end - hole_start
+                        pos = f.seek(hole_end)
+        except (OSError, PermissionError):
+            self.stats["read_errors"] += 1
+            return None
+        self.stats["partial_hashes" if partial_stage else "full_hashes"] += 1
+        record["full"] = h.hexdigest()
+        if partial_stage:
+            record["partial"] = record["full"]
+        self._remember(record)
+        return record["full"]
+
+    def _holes(self, f, st):
+        """Holes of ``f`` when its inode is sparse (fewer blocks than bytes)."""
+        if getattr(st, "st_blocks", None) is None or st.st_blocks * 512 >= st.st_size:
+            return []
+        holes = file_holes(f.fileno(), st.st_size)
+        f.seek(0)
+        if holes and self._zeros is None:
+            self._zeros = memoryview(bytes(self.READ_SIZE))
+        return holes
+
+    def _recall(self, record, key):
+        """Fill a record's digests from the cache; returns ``record[key]``."""
+        if self.cache is None:
+            return None
+        if not record["recalled"]:
+            record["recalled"] = True
+            cached = self.cache.lookup(record["stat"], self.scanner.hash_algorithm)
+            if cached is not None:
+                record["partial"] = record["partial"] or cached[0]
+                record["full"] = record["full"] or cached[1]
+        # Tallied once per file: a hit only if no digest it needed was missing
+        hit = record[key] is not None
+        if record["cache_hit"] is None:
+            self.cache.count(hit)
+        elif record["cache_hit"] and not hit:
+            self.cache.count(False, was_hit=True)
+        record["cache_hit"] = hit and record["cache_hit"] is not False
+        return record[key]
+
+    def _remember(self, record):
+        if self.cache is not None:
+            self.cache.store(
+                record["stat"], record["info"]["path"], self.scanner.hash_algorithm,
+                record["partial"], record["full"],
+            )
+
+    def report(self, root_path, findings):
+        hash_map = {}
+        for copy in findings:
+            files = hash_map.setdefault(copy["hash"], [copy["first_seen"]])
+            files.append({
+                k: copy[k] for k in ("path", "size", "mtime", "hardlink") if k in copy
+            })
 
         duplicates = []
         for h, files in hash_map.items():
-            if len(files) > 1:
-                # The oldest file is the "original" (Order 1)
-                files.sort(key=lambda x: x["mtime"])
-                duplicates.append({
-                    "hash": h,
-                    "count": len(files),
-                    "original": files[0],
-                    "copies": files[1:],
-                    "order": 2 if len(files) <= 3 else 3,
-                    "analysis": (
-                        "Multiple copies — the original loses primacy"
-                        if len(files) <= 3
-                        else "Proliferation of copies — original concept dissolves"
-                    ),
-                })
+            # The oldest file is the "original" (Order 1)
+            files.sort(key=lambda x: x["mtime"])
+            duplicates.append({
+                "hash": h,
+                "count": len(files),
+                "original": files[0],
+                "copies": files[1:],
+                "order": 2 if len(files) <= 3 else 3,
+                "analysis": (
+                    "Multiple copies — the original loses primacy"
+                    if len(files) <= 3
+                    else "Proliferation of copies — original concept dissolves"
+                ),
+            })
 
         return {
             "root": root_path,
             "scan_time": datetime.utcnow().isoformat(),
+            "hash_algorithm": self.scanner.hash_algorithm,
             "duplicate_groups": len(duplicates),
             "total_copies": sum(d["count"] - 1 for d in duplicates),
+            # Hardlinks share storage, so they don't waste any
             "wasted_space": sum(
-                sum(c["size"] for c in d["copies"]) for d in duplicates
+                sum(c["size"] for c in d["copies"] if not c.get("hardlink"))
+                for d in duplicates
             ),
+            "hash_stats": dict(self.stats),
+            **self._cache_report(root_path),
             "duplicates": duplicates,
         }
+
+    def _cache_report(self, root_path):
+        if self.cache is None:
+            return {}
+        self.cache.evict_missing(root_path)
+        stats = {k: v - self._cache_base.get(k, 0) for k, v in self.cache.stats.items()}
+        return {"cache_stats": stats}
+
+
+class FilesystemHyperreal:
+    """Analyze filesystem for hyperreal indicators — what's missing matters most.
+
+    ``hash_algorithm`` names the content hash used for duplicate
+    detection: any ``hashlib`` algorithm (``"blake2b"`` is the fastest
+    cryptographic choice) or, when the ``xxhash`` package is installed,
+    ``"xxh64"``, ``"xxh3_64"`` or ``"xxh3_128"``.
+
+    ``cache`` makes repeated scans incremental: a :class:`ScanCache`, a
+    path to its SQLite file, or ``True`` for the default location.
+    Unchanged files (same inode, size, mtime and ctime) are not re-read,
+    rows for deleted files are evicted after each duplicate scan, and the
+    duplicate report gains ``cache_stats`` with hit/miss counters.
+
+    ``workers`` > 1 lists directories and stats their entries on a pool
+    of that many threads, for trees where metadata latency (NFS, SMB,
+    cold disks) dominates.  Findings come out in the same order as a
+    serial scan.
+
+    ``profile`` (``True`` or a hook) times listing, ``lstat`` calls and
+    each detector, counts directories, files, stat errors, bytes hashed
+    and cache hits, and adds a ``profile`` block to the report —
+    alongside the detector reports in :meth:`scan`.
+    """
+
+    # Temporal anomaly thresholds
+    FUTURE_THRESHOLD = 3600  # 1 hour in the future
+    ANCIENT_THRESHOLD = 946684800  # Before Y2K
+
+    DETECTORS = (TemporalAnomalyDetector, HiddenSpaceDetector, DuplicateDetector)
+
+    def __init__(self, hash_algorithm="sha256", cache=None, workers=1, profile=None):
+        _hash_factory(hash_algorithm)  # Fail fast on unknown algorithms
+        self.hash_algorithm = hash_algorithm
+        self.workers = max(1, int(workers))
+        if cache is True:
+            cache = ScanCache()
+        elif isinstance(cache, (str, os.PathLike)):
+            cache = ScanCache(cache)
+        self.cache = cache
+        self.profile = profile
+        self.detectors = {}
+        for detector in self.DETECTORS:
+            self.register_detector(detector)
+
+    def register_detector(self, detector, name=None):
+        """Add a :class:`Detector` subclass to the fused scan.
+
+        It is keyed by ``name`` (default: its ``name`` attribute), which is
+        also the key of its report in :meth:`scan`.  Registering under an
+        existing name replaces that detector.
+        """
+        name = name or detector.name
+        if not name:
+            raise ValueError("Detector needs a name")
+        self.detectors[name] = detector
+        return name
+
+    def scan(self, root_path, max_depth=3, detectors=None, progress=None):
+        """Run several detectors over one traversal of ``root_path``.
+
+        ``detectors`` lists registered names (default: all of them).
+        Returns a mapping of detector name to that detector's report, plus
+        ``profile`` when profiling.
+        """
+        instances = self._instantiate(detectors)
+        prof = Profiler.create(self.profile)
+        findings = {name: [] for name in instances}
+        for name, finding in self._iter_scan(root_path, max_depth, instances, progress, prof):
+            findings[name].append(finding)
+        return self._report(root_path, instances, findings, prof)
+
+    def iter_scan(self, root_path, max_depth=3, detectors=None, progress=None):
+        """Yield ``(detector_name, finding)`` pairs from one traversal."""
+        instances = self._instantiate(detectors)
+        prof = Profiler.create(self.profile)
+        yield from self._iter_scan(root_path, max_depth, instances, progress, prof)
+        if prof is not None:
+            prof.finish()
+
+    def scan_temporal_anomalies(self, root_path, max_depth=3, progress=None):
+        """Find files with impossible or suspicious timestamps."""
+        return self._scan_one(TemporalAnomalyDetector, root_path, max_depth, progress)
+
+    def iter_temporal_anomalies(self, root_path, max_depth=3, progress=None):
+        """Yield timestamp anomalies one at a time as the tree is walked."""
+        return self._iter_one(TemporalAnomalyDetector, root_path, max_depth, progress)
+
+    def detect_hidden_spaces(self, root_path, max_depth=3, progress=None):
+        """Find hidden files, alternate data streams, and concealed spaces."""
+        return self._scan_one(HiddenSpaceDetector, root_path, max_depth, progress)
+
+    def iter_hidden_spaces(self, root_path, max_depth=3, progress=None):
+        """Yield hidden files and directories one at a time as the tree is walked."""
+        return self._iter_one(HiddenSpaceDetector, root_path, max_depth, progress)
+
+    def find_duplicate_simulacra(self, root_path, max_depth=3, progress=None):
+        """Find duplicate files — copies that may have replaced originals."""
+        return self._scan_one(DuplicateDetector, root_path, max_depth, progress)
+
+    def iter_duplicate_simulacra(self, root_path, max_depth=3, progress=None):
+        """Yield each file the moment it turns out to duplicate an earlier one.
+
+        A finding names the copy and the ``first_seen`` file with the same
+        content.
+        """
+        return self._iter_one(DuplicateDetector, root_path, max_depth, progress)
+
+    def watch(self, root_path, callback, max_depth=3, detectors=None, duration=None, stop=None,
+              interval=2.0, backend="auto", emit_baseline=False):
+        """Scan ``root_path`` once, then report new findings as the tree changes.
+
+        Each new finding goes to ``callback`` (a :class:`JsonlSink` writes
+        them as JSONL) until ``duration`` seconds pass or the ``stop``
+        event is set; returns the watch's ``stats``.  See
+        :class:`FilesystemWatch`, which also gives step-by-step control.
+        """
+        with FilesystemWatch(self, root_path, callback, max_depth, detectors,
+                             backend, interval, emit_baseline) as watch:
+            watch.start()
+            return watch.run(duration, stop)
+
+    def _scan_one(self, detector, root_path, max_depth, progress):
+        instances = {detector.name: detector(self)}
+        prof = Profiler.create(self.profile)
+        findings = [
+            finding for _, finding in
+            self._iter_scan(root_path, max_depth, instances, progress, prof)
+        ]
+        reports = self._report(root_path, instances, {detector.name: findings}, prof)
+        report = reports[detector.name]
+        if prof is not None:
+            report["profile"] = reports["profile"]
+        return report
+
+    def _iter_one(self, detector, root_path, max_depth, progress):
+        instances = {detector.name: detector(self)}
+        prof = Profiler.create(self.profile)
+        for _, finding in self._iter_scan(root_path, max_depth, instances, progress, prof):
+            yield finding
+        if prof is not None:
+            prof.finish()
+
+    def _report(self, root_path, instances, findings, prof=None):
+        if prof is None:
+            return {
+                name: detector.report(root_path, findings[name])
+                for name, detector in instances.items()
+            }
+        reports = {}
+        for name, detector in instances.items():
+            with prof.stage(f"report.{name}"):
+                reports[name] = detector.report(root_path, findings[name])
+        reports["profile"] = prof.finish()
+        return reports
+
+    def _instantiate(self, names):
+        if names is None:
+            names = list(self.detectors)
+        unknown = [name for name in names if name not in self.detectors]
+        if unknown:
+            raise ValueError(f"Unknown detectors: {', '.join(unknown)}")
+        return {name: self.detectors[name](self) for name in names}
+
+    def _iter_scan(self, root_path, max_depth, instances, progress, prof=None):
+        seen = 0
+        walk = self._walk(root_path, max_depth)
+        if prof is not None:
+            walk = prof.timed(walk, "walk")
+            cached = dict(self.cache.stats) if self.cache is not None else {}
+        try:
+            for _, files, dirs in walk:
+                yield from self._visit(files, dirs, instances, prof)
+                seen += len(files)
+                if progress is not None and progress(seen, None) is False:
+                    return
+        finally:
+            if self.cache is not None:
+                self.cache.flush()  # Keep digests even if the caller stops early
+            if prof is not None:
+                for detector in instances.values():
+                    for key, value in getattr(detector, "stats", {}).items():
+                        prof.count(key, value)
+                if self.cache is not None:
+                    for key, value in self.cache.stats.items():
+                        prof.count(f"cache_{key}", value - cached.get(key, 0))
+
+    def _visit(self, files, dirs, instances, prof=None):
+        """One directory's visits for :meth:`_iter_scan`, timed per detector when profiling."""
+        if prof is not None:
+            prof.count("directories")
+            prof.count("files", len(files))
+            files = [_CountedEntry(entry, prof) for entry in files]
+            dirs = [_CountedEntry(entry, prof) for entry in dirs]
+            spent = dict.fromkeys(instances, 0.0)
+        for entries, visit in ((files, "visit_file"), (dirs, "visit_directory")):
+            visits = [(name, getattr(detector, visit)) for name, detector in instances.items()]
+            for entry in entries:
+                for name, visit_entry in visits:
+                    found = visit_entry(entry)
+                    if prof is not None:
+                        start = time.perf_counter()
+                        found = list(found)
+                        spent[name] += time.perf_counter() - start
+                    for finding in found:
+                        yield name, finding
+        if prof is not None:
+            for name, seconds in spent.items():
+                prof.add_time(f"detect.{name}", seconds, len(files) + len(dirs))
+
+    def _walk(self, root_path, max_depth):
+        """Yield ``(dirpath, files, dirs)`` top-down, like ``os.walk``.
+
+        ``files`` and ``dirs`` are ``os.DirEntry`` lists sorted by name, so
+        output is reproducible and stat results are cached per entry and
+        shared by every detector.  Directories ``max_depth`` levels below
+        the root are not listed, and symlinked directories are reported but
+        not descended into.
+        """
+        if self.workers > 1:
+            yield from self._walk_parallel(root_path, max_depth)
+            return
+        stack = [(root_path, 0)]
+        while stack:
+            dirpath, depth = stack.pop()
+            if depth >= max_depth:
+                continue
+            listing = _list_directory(dirpath)
+            if listing is None:
+                continue
+            files, dirs = listing
+            yield dirpath, files, dirs
+            stack.extend((path, depth + 1) for path in _descend(dirs))
+
+    def _walk_parallel(self, root_path, max_depth):
+        """:meth:`_walk` with directory listing spread over a thread pool.
+
+        Pool threads list directories and ``lstat`` their entries ahead of
+        the detectors, which still see directories in exactly the serial
+        order.  At most ``4 * workers`` listings are in flight or waiting,
+        so memory stays bounded and listing carries on while a detector is
+        busy hashing.
+        """
+        window = 4 * self.workers
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        stack = [[root_path, 0, None]] if max_depth > 0 else []
+        ahead = 0  # Listings submitted but not yet consumed
+        try:
+            while stack:
+                # Keep the directories visited next being listed in the pool
+                for item in reversed(stack):
+                    if ahead >= window:
+                        break
+                    if item[2] is None:
+                        item[2] = pool.submit(_list_directory, item[0], True)
+                        ahead += 1
+
+                dirpath, depth, future = stack.pop()
+                ahead -= 1
+                listing = future.result()
+                if listing is None:
+                    continue
+                files, dirs = listing
+                yield dirpath, files, dirs
+                if depth + 1 < max_depth:
+                    stack.extend([path, depth + 1, None] for path in _descend(dirs))
+        finally:
+            for item in stack:
+                if item[2] is not None:
+                    item[2].cancel()
+            pool.shutdown(wait=True)
+
+
+class _CountedEntry:
+    """A ``DirEntry`` that counts the stat calls made through it.
+
+    ``DirEntry`` caches one ``lstat`` and, for symlinks, one ``stat``,
+    so only the first call for each is counted as ``stat_calls``; a
+    failing entry counts once in ``errors_skipped``.
+    """
+
+    __slots__ = ("_entry", "_prof", "_fetched", "_failed")
+
+    def __init__(self, entry, prof):
+        self._entry = entry
+        self._prof = prof
+        self._fetched = set()
+        self._failed = False
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+    def stat(self, *, follow_symlinks=True):
+        follow = follow_symlinks and self._entry.is_symlink()
+        if follow not in self._fetched:
+            self._prof.count("stat_calls")
+        try:
+            st = self._entry.stat(follow_symlinks=follow_symlinks)
+        except OSError:
+            if not self._failed:
+                self._failed = True
+                self._prof.count("errors_skipped")
+            raise
+        self._fetched.add(follow)
+        return st
+
+
+def _list_directory(dirpath, prefetch=False):
+    """List one directory as name-sorted ``(files, dirs)``, or ``None``.
+
+    With ``prefetch`` every entry is ``lstat``-ed (and symlinks followed)
+    here, warming the ``DirEntry`` caches so detectors don't block on
+    metadata round trips.
+    """
+    try:
+        with os.scandir(dirpath) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return None
+
+    files, dirs = [], []
+    for entry in entries:
+        try:
+            if prefetch:
+                entry.stat(follow_symlinks=False)
+                entry.stat()
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        (dirs if is_dir else files).append(entry)
+    return files, dirs
+
+
+def _descend(dirs):
+    """Paths of the subdirectories to walk next, in stack (reversed) order."""
+    paths = []
+    for entry in reversed(dirs):
+        try:
+            if entry.is_symlink():
+                continue
+        except OSError:
+            continue
+        paths.append(entry.path)
+    return paths
+
+
+def _hash_factory(name):
+    """Return a constructor for the named content hash."""
+    if name.startswith("xxh"):
+        if xxhash is None:
+            raise ValueError(f"{name} requires the xxhash package")
+        try:
+            return getattr(xxhash, name)
+        except AttributeError:
+            raise ValueError(f"Unknown xxhash algorithm: {name}")
+    # SHAKE digests need a length, so they can't be used as-is
+    if name not in hashlib.algorithms_available or name.startswith("shake"):
+        raise ValueError(f"Unknown hash algorithm: {name}")
+    return getattr(hashlib, name, None) or (lambda: hashlib.new(name))
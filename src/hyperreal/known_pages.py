@@ -0,0 +1,213 @@
+"""Hyperreal Known Pages — recognise memory that is only a copy of disk.
+
+Most of a memory image is pages of stock libraries and binaries,
+faithful copies whose originals are on disk.  A :class:`KnownPageSet`
+holds the hashes of every page of such files in one sorted
+``array('Q')`` — 8 bytes per page, binary-searched — so the dump
+analysis can skip them and spend its time on what has no original.
+A :class:`PageHashCache` keeps the per-page hashes of individual files,
+so checks of live mappings against disk hash each library once.
+"""
+
+import os
+import json
+import heapq
+import threading
+from array import array
+from collections import OrderedDict
+from bisect import bisect_left
+
+from .region_table import RegionTable
+from .entropy_map import write_npy, read_npy
+from .snapshot_diff import block_hasher, default_algorithm
+
+
+class KnownPageSet:
+    """Hashes of known-benign pages, sorted and de-duplicated.
+
+    Files are hashed page by page at page-aligned offsets, the way they
+    are mapped into memory; a short final page is zero-padded, as the
+    kernel pads it.  All-zero pages are never added — wiped memory must
+    stay visible as negative space.
+    """
+
+    def __init__(self, block_size=4096, algorithm=None):
+        self.block_size = block_size
+        self.algorithm = algorithm or default_algorithm()
+        self.hashes = array("Q")
+        self._digest = block_hasher(self.algorithm)
+        self._zero = self._digest(bytes(block_size))
+        self._pending = array("Q")
+        self.files = 0
+
+    def __len__(self):
+        self._merge()
+        return len(self.hashes)
+
+    def __contains__(self, digest):
+        self._merge()
+        i = bisect_left(self.hashes, digest)
+        return i < len(self.hashes) and self.hashes[i] == digest
+
+    def __getstate__(self):
+        self._merge()
+        state = self.__dict__.copy()
+        del state["_digest"]  # Rebuilt by workers — lambdas don't pickle
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._digest = block_hasher(self.algorithm)
+
+    def add_file(self, path):
+        """Add every page of one file; returns the number of pages added."""
+        try:
+            with open(path, "rb", buffering=0) as f:
+                hashes = file_page_hashes(f, self.block_size, self._digest)
+        except OSError:
+            return 0
+        added = [digest for digest in hashes if digest != self._zero]
+        self._pending.extend(added)
+        self.files += 1
+        return len(added)
+
+    def add_directory(self, root_path, max_depth=3):
+        """Add every regular file under ``root_path`` (e.g. ``/usr/lib``)."""
+        root_depth = root_path.rstrip(os.sep).count(os.sep)
+        added = 0
+        for dirpath, dirnames, filenames in os.walk(root_path):
+            if dirpath.count(os.sep) - root_depth >= max_depth - 1:
+                dirnames[:] = []
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if os.path.isfile(path) and not os.path.islink(path):
+                    added += self.add_file(path)
+        return added
+
+    def add_process(self, pid):
+        """Add the files mapped by process ``pid`` (its binary and libraries)."""
+        table = RegionTable.from_proc(pid)
+        added = 0
+        for path in sorted(set(table.pathnames)):
+            if path.startswith("/") and not path.endswith("(deleted)"):
+                added += self.add_file(path)
+        return added
+
+    def known_blocks(self, chunk):
+        """One flag per full block of ``chunk``: is it a known page?"""
+        self._merge()
+        hashes = self.hashes
+        count = len(hashes)
+        size = self.block_size
+        digest = self._digest
+        flags = []
+        for pos in range(0, len(chunk) - size + 1, size):
+            h = digest(chunk[pos:pos + size])
+            i = bisect_left(hashes, h)
+            flags.append(i < count and hashes[i] == h)
+        return flags
+
+    def save(self, path):
+        """Write the set as a ``uint64`` ``.npy`` file plus ``<path>.json``."""
+        self._merge()
+        write_npy(path, self.hashes)
+        with open(path + ".json", "w") as f:
+            json.dump({"block_size": self.block_size, "algorithm": self.algorithm,
+                       "files": self.files}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        known = cls(meta["block_size"], meta["algorithm"])
+        known.hashes = read_npy(path, "Q")
+        known.files = meta.get("files", 0)
+        return known
+
+    def _merge(self):
+        if not self._pending:
+            return
+        merged = array("Q")
+        last = None
+        # Merge two sorted runs without building a set of Python ints
+        for digest in heapq.merge(self.hashes, sorted(self._pending)):
+            if digest != last:
+                merged.append(digest)
+                last = digest
+        self.hashes = merged
+        self._pending = array("Q")
+
+
+class PageHashCache:
+    """Per-page hashes of files on disk, shared by every check in a process.
+
+    Entries are keyed by device, inode, size and mtime, so a library
+    mapped by hundreds of processes is hashed once and a file rewritten
+    in place is hashed again.  At most ``max_files`` files are kept,
+    least recently used first out.  Safe to share between threads.
+    """
+
+    def __init__(self, block_size=4096, algorithm=None, max_files=4096):
+        self.block_size = block_size
+        self.algorithm = algorithm or default_algorithm()
+        self.max_files = max_files
+        self.digest = block_hasher(self.algorithm)
+        self.stats = {"hits": 0, "files_hashed": 0, "bytes_hashed": 0}
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+        self._hashing = {}  # key -> lock held while one thread hashes that file
+
+    def hashes(self, path):
+        """``array('Q')`` of one hash per page of ``path`` (zero-padded last page)."""
+        with open(path, "rb", buffering=0) as f:
+            st = os.fstat(f.fileno())
+            key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+            with self._lock:
+                gate = self._hashing.setdefault(key, threading.Lock())
+            with gate:  # Threads asking for the same file wait for one hash of it
+                with self._lock:
+                    hashes = self._files.get(key)
+                    if hashes is not None:
+                        self._files.move_to_end(key)
+                        self._hashing.pop(key, None)
+                        self.stats["hits"] += 1
+                        return hashes
+                hashes = file_page_hashes(f, self.block_size, self.digest)
+                with self._lock:
+                    self._files[key] = hashes
+                    while len(self._files) > self.max_files:
+                        self._files.popitem(last=False)
+                    self._hashing.pop(key, None)
+                    self.stats["files_hashed"] += 1
+                    self.stats["bytes_hashed"] += st.st_size
+                return hashes
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+
+
+def file_page_hashes(f, block_size, digest):
+    """Hash every page of the open binary file ``f`` from its start.
+
+    A short final page is zero-padded, as the kernel pads it when the
+    file is mapped.
+    """
+    hashes = array("Q")
+    buf = bytearray(block_size * 256)
+    view = memoryview(buf)
+    f.seek(0)
+    while True:
+        n = f.readinto(buf)
+        while n and n < len(buf):  # Fill the buffer so only the true end is padded
+            more = f.readinto(view[n:])
+            if not more:
+                break
+            n += more
+        if not n:
+            break
+        if n % block_size:
+            view[n:n + block_size - n % block_size] = bytes(block_size - n % block_size)  # Kernel zero-fill
+            n += block_size - n % block_size
+        hashes.extend(digest(view[pos:pos + block_size]) for pos in range(0, n, block_size))
+    return hashes
@@ -6,14 +6,63 @@ by the absence it conceals.
 """
 
 import os
+import math
 import struct
 import json
+import time
 from datetime import datetime
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .carving import ExecutableCarver
+from .dump_source import DumpSource, ProcessMemorySource, SpanDumpSource, open_dump
+from .entropy_map import EntropyMap, quantize
+from .known_pages import KnownPageSet, PageHashCache
+from .profiling import Profiler, stage
+from .region_table import RegionTable, PERM_EXEC
+from .signatures import SignatureSet
+from .snapshot_diff import BlockIndex, diff_indexes
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional — fall back to pure Python
+    np = None
 
 
 class NegativeSpaceAnalyzer:
-    """Detect what's been erased, hidden, or hollowed out in memory."""
+    """Detect what's been erased, hidden, or hollowed out in memory.
+
+    ``backend`` selects the entropy engine: ``"numpy"`` computes byte
+    histograms for many blocks at once, ``"python"`` uses the pure-Python
+    path, and ``"auto"`` (default) picks NumPy when it is installed.
+
+    ``signatures`` replaces the built-in hidden-structure signatures with a
+    :class:`SignatureSet` or the path of a JSON signature file.  Start from
+    :meth:`default_signatures` and ``load`` a file to extend the built-ins.
+
+    With ``workers`` > 1 a dump is split into ``shard_size`` byte ranges
+    that are analysed in a process pool; voids and signature matches that
+    cross shard edges are stitched back together, so the result is the
+    same as a serial run.
+
+    ``known_pages`` is a :class:`KnownPageSet` (or the path of a saved
+    one) of pages copied from files on disk; blocks found in it are
+    skipped — no entropy, voids or signatures — and counted in the
+    summary's ``known_bytes_skipped``.
+
+    With ``carve`` (default) ELF, PE and Mach-O headers are matched in the
+    same pass as the signatures; those that parse are reported under
+    ``executables`` — see :class:`ExecutableCarver`.
+
+    ``profile`` (``True`` or a hook) times the read, known-page, entropy,
+    signature and carving stages and adds a ``profile`` block to each
+    report — see :mod:`hyperreal.profiling`.  Shard workers profile
+    their own ranges and the totals are merged.
+    """
+
+    BLOCK_SIZE = 4096
+    BATCH_BLOCKS = 256  # Blocks per vectorized read (1MB)
+    SHARD_SIZE = 64 * 1024 * 1024  # Default bytes per worker task
 
     # ELF magic bytes
     ELF_MAGIC = b"\x7fELF"
@@ -26,98 +75,733 @@ class NegativeSpaceAnalyzer:
         b"\xfe\xed\xfa\xce": "Mach-O magic — cross-platform artifact",
     }
 
-    def analyze_memory_dump(self, filepath):
-        """Analyze a memory dump file for negative space indicators."""
+    def __init__(self, backend="auto", signatures=None, workers=1, shard_size=None,
+                 known_pages=None, carve=True, profile=None):
+        if backend == "auto":
+            backend = "numpy" if np is not None else "python"
+        if backend not in ("numpy", "python"):
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == "numpy" and np is None:
+            raise ImportError("NumPy backend requested but numpy is not installed")
+        self.backend = backend
+
+        if signatures is None:
+            signatures = self.default_signatures()
+        elif not isinstance(signatures, SignatureSet):
+            signatures = SignatureSet.from_file(signatures)
+        self.signatures = signatures
+
+        if known_pages is not None and not isinstance(known_pages, KnownPageSet):
+            known_pages = KnownPageSet.load(known_pages)
+        if known_pages is not None and known_pages.block_size != self.BLOCK_SIZE:
+            raise ValueError(f"known_pages must hash {self.BLOCK_SIZE}-byte pages")
+        self.known_pages = known_pages
+        self.carver = ExecutableCarver() if carve else None
+        self._combined = None
+        self.profile = profile
+
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        shard_size = shard_size or self.SHARD_SIZE
+        if shard_size < self.BLOCK_SIZE:
+            raise ValueError(f"shard_size must be at least {self.BLOCK_SIZE} bytes")
+        self.workers = workers
+        # Shards start on block boundaries so block-level results line up
+        self.shard_size = -(-shard_size // self.BLOCK_SIZE) * self.BLOCK_SIZE
+
+    def __getstate__(self):
+        # A hook may not pickle; shard workers only need to know to profile
+        state = dict(self.__dict__)
+        state["profile"] = bool(self.profile)
+        return state
+
+    @classmethod
+    def default_signatures(cls):
+        """Built-in signature set: ``HOLLOW_PATTERNS`` plus ``ELF_MAGIC``."""
+        sigset = SignatureSet(cls.HOLLOW_PATTERNS)
+        sigset.add(cls.ELF_MAGIC, "ELF header — embedded executable image", order=2)
+        return sigset
+
+    def analyze_memory_dump(self, filepath, progress=None, entropy_map=None):
+        """Analyze a memory dump file for negative space indicators.
+
+        ``filepath`` may also be an open :class:`DumpSource`, letting
+        several analyses share one mapping of the same image.
+        ``progress(done, total)`` is called as bytes are scanned; returning
+        ``False`` cancels the scan and the partial results are returned.
+
+        Pass an empty :class:`EntropyMap` as ``entropy_map`` to keep every
+        block's entropy, not just the 1MB samples; it is filled in the same
+        pass and the report gains ``entropy_deserts`` and
+        ``entropy_islands``.
+
+        Compressed (gzip, zstd, lz4) and container (LiME, ELF core) dumps
+        are read in place — see :func:`open_dump`; container findings
+        carry the captured memory's own addresses.
+        """
+        if isinstance(filepath, DumpSource):
+            return self._analyze_source(filepath, progress, entropy_map)
         if not os.path.exists(filepath):
             return {"error": f"File not found: {filepath}"}
+        try:
+            source = open_dump(filepath)
+        except ValueError as e:
+            return {"error": str(e)}
+        with source:
+            return self._analyze_source(source, progress, entropy_map)
+
+    def iter_memory_dump(self, filepath, progress=None, entropy_map=None):
+        """Yield findings from a memory dump as they are found.
+
+        Each finding is a dict shaped like the entries of
+        :meth:`analyze_memory_dump` with a ``finding`` key naming its kind
+        (``negative_space``, ``entropy`` or ``hidden_structure``); the last
+        one is the ``summary``.  Nothing is accumulated, so memory stays
+        bounded however many findings a dump produces.  With an
+        ``entropy_map``, ``entropy_desert`` and ``entropy_island`` findings
+        follow the scan, just before the summary.
+        """
+        if isinstance(filepath, DumpSource):
+            yield from self._iter_source(filepath, progress, entropy_map)
+            return
+        if not os.path.exists(filepath):
+            yield {"finding": "error", "error": f"File not found: {filepath}"}
+            return
+        try:
+            source = open_dump(filepath)
+        except ValueError as e:
+            yield {"finding": "error", "error": str(e)}
+            return
+        with source:
+            yield from self._iter_source(source, progress, entropy_map)
+
+    def carve_executables(self, filepath, extract_dir=None, progress=None):
+        """Carve embedded executables from a dump without the full analysis.
+
+        Returns the ``executables`` list of :meth:`analyze_memory_dump`;
+        with ``extract_dir`` each image is also written there and its
+        record gains the ``extracted`` path.
+        """
+        carver = self.carver or ExecutableCarver()
+        if not isinstance(filepath, DumpSource):
+            if not os.path.exists(filepath):
+                return {"error": f"File not found: {filepath}"}
+            try:
+                source = open_dump(filepath)
+            except ValueError as e:
+                return {"error": str(e)}
+            with source:
+                return self.carve_executables(source, extract_dir, progress)
+        found = carver.carve(filepath, progress)
+        if extract_dir is not None:
+            carver.extract(filepath, found, extract_dir)
+        return found
+
+    def analyze_process(self, pid, progress=None, entropy_map=None):
+        """Analyze the live memory of process ``pid`` without dumping it.
 
-        file_size = os.path.getsize(filepath)
+        Resident pages of readable mappings are read from
+        ``/proc/<pid>/mem`` (see :class:`ProcessMemorySource`); offsets in
+        the report are virtual addresses and ``absent_bytes`` counts the
+        pages skipped because they were never faulted in.
+        """
+        try:
+            source = ProcessMemorySource(pid)
+        except FileNotFoundError:
+            return {"error": f"Process {pid} not found or not accessible"}
+        except PermissionError:
+            return {"error": "Permission denied — run as root"}
+        with source:
+            results = self._analyze_source(source, progress, entropy_map)
+        results["pid"] = pid
+        results["summary"]["absent_bytes"] = source.absent_bytes
+        return results
+
+    def iter_process(self, pid, progress=None, entropy_map=None):
+        """Yield findings from the live memory of process ``pid``."""
+        try:
+            source = ProcessMemorySource(pid)
+        except FileNotFoundError:
+            yield {"finding": "error", "error": f"Process {pid} not found or not accessible"}
+            return
+        except PermissionError:
+            yield {"finding": "error", "error": "Permission denied — run as root"}
+            return
+        with source:
+            for finding in self._iter_source(source, progress, entropy_map):
+                if finding["finding"] == "summary":
+                    finding["absent_bytes"] = source.absent_bytes
+                yield finding
+
+    def compare_memory_dumps(self, baseline, snapshot, index_dir=None, progress=None):
+        """Analyze only what changed between two captures of the same memory.
+
+        Both dumps get a per-block hash index (see :class:`BlockIndex`),
+        cached as ``<dump>.blockidx.npy`` in ``index_dir`` or the user's
+        cache directory (see :meth:`BlockIndex.for_dump`), so a baseline
+        is hashed once and each snapshot once.  The report lists the
+        changed, zeroed, populated and truncated ranges, and ``analysis``
+        holds the usual dump analysis run over the snapshot's differing
+        ranges alone.  ``progress`` follows that analysis.
+        """
+        for path in (baseline, snapshot):
+            if not os.path.exists(path):
+                return {"error": f"File not found: {path}"}
+
+        old = BlockIndex.for_dump(baseline, index_dir, self.BLOCK_SIZE)
+        new = BlockIndex.for_dump(snapshot, index_dir, self.BLOCK_SIZE)
+        changes = diff_indexes(old, new)
+        spans = [(start, end) for start, end, change in changes if change != "truncated"]
+        with open_dump(snapshot) as source:
+            analysis = self._analyze_source(SpanDumpSource(source, spans), progress)
+
+        totals = Counter()
+        for start, end, change in changes:
+            totals[change] += end - start
+        return {
+            "baseline": baseline,
+            "snapshot": snapshot,
+            "scan_time": datetime.utcnow().isoformat(),
+            "changes": [
+                {"start": hex(start), "end": hex(end), "size": end - start, "change": change}
+                for start, end, change in changes
+            ],
+            "summary": {
+                "changed_bytes": totals["changed"],
+                "zeroed_bytes": totals["zeroed"],
+                "populated_bytes": totals["populated"],
+                "truncated_bytes": totals["truncated"],
+                "unchanged_bytes": new.data_size - sum(end - start for start, end in spans),
+                "index_cached": {"baseline": old.cached, "snapshot": new.cached},
+            },
+            "analysis": analysis,
+        }
+
+    def _analyze_source(self, source, progress=None, entropy_map=None):
         results = {
-            "file": filepath,
-            "size": file_size,
+            "file": source.name,
+            "size": source.size,
             "scan_time": datetime.utcnow().isoformat(),
             "negative_spaces": [],
             "entropy_map": [],
             "hidden_structures": [],
+            "executables": [],
         }
 
-        with open(filepath, "rb") as f:
-            offset = 0
-            block_size = 4096
-            zero_runs = 0
-            total_blocks = 0
-
-            while True:
-                block = f.read(block_size)
-                if not block:
-                    break
-                total_blocks += 1
-
-                # Detect zero regions (negative space)
-                if block == b"\x00" * len(block):
-                    zero_runs += 1
-                    if zero_runs == 1:
-                        zero_start = offset
-                else:
-                    if zero_runs > 0:
-                        results["negative_spaces"].append({
-                            "type": "void",
-                            "start": hex(zero_start),
-                            "end": hex(offset),
-                            "size": zero_runs * block_size,
-                            "interpretation": "Evidence of erasure — the absence is the message",
-                        })
-                        zero_runs = 0
-
-                # Check for hollow patterns
-                for pattern, meaning in self.HOLLOW_PATTERNS.items():
-                    if pattern in block:
-                        pos = block.find(pattern)
-                        results["hidden_structures"].append({
-                            "offset": hex(offset + pos),
-                            "pattern": meaning,
-                            "order": 3,  # Masks absence of reality
-                        })
-
-                # Entropy calculation per block
-                byte_counts = Counter(block)
-                entropy = 0.0
-                for count in byte_counts.values():
-                    if count > 0:
-                        p = count / len(block)
-                        import math
-                        entropy -= p * math.log2(p)
-
-                if total_blocks % 256 == 0:  # Sample every 1MB
-                    results["entropy_map"].append({
-                        "offset": hex(offset),
-                        "entropy": round(entropy, 3),
-                        "classification": self._classify_entropy(entropy),
-                    })
-
-                offset += len(block)
-
-            # Handle trailing zeros
-            if zero_runs > 0:
-                results["negative_spaces"].append({
-                    "type": "void",
-                    "start": hex(zero_start),
-                    "end": hex(offset),
-                    "size": zero_runs * block_size,
-                    "interpretation": "Terminal void — absence at the boundary",
-                })
+        prof = Profiler.create(self.profile)
+        structures = []
+        for kind, value in self._events(source, progress, prof):
+            if kind == "void":
+                results["negative_spaces"].append(self._describe_void(*value))
+            elif kind == "entropy":
+                results["entropy_map"].append(self._describe_entropy(*value))
+            elif kind == "structure":
+                structures.append(value)
+            elif kind == "executable":
+                results["executables"].append(value)
+            elif kind == "entropies":
+                if entropy_map is not None:
+                    entropy_map.append(*value)
+            else:
+                end = value
 
+        results["hidden_structures"] = [
+            self._describe_structure(match) for match in sorted(structures)
+        ]
+        results["executables"].sort(key=lambda e: int(e["offset"], 16))
+        if entropy_map is not None:
+            results["entropy_deserts"] = [
+                self._describe_window(entropy_map, *r) for r in entropy_map.deserts()
+            ]
+            results["entropy_islands"] = [
+                self._describe_window(entropy_map, *r) for r in entropy_map.islands()
+            ]
         results["summary"] = {
-            "total_blocks": total_blocks,
+            "total_blocks": end["blocks"],
+            "scanned_bytes": end["scanned"],
             "void_percentage": round(
-                sum(ns["size"] for ns in results["negative_spaces"]) / max(file_size, 1) * 100, 2
+                sum(ns["size"] for ns in results["negative_spaces"]) / max(end["scanned"], 1) * 100, 2
             ),
             "hidden_structures_count": len(results["hidden_structures"]),
+            "executables_count": len(results["executables"]),
+            "known_bytes_skipped": end["known"],
+            "hole_bytes": end["holes"],
+            "cancelled": end["cancelled"],
             "hyperreality_assessment": self._assess_hyperreality(results),
         }
+        if prof is not None:
+            results["profile"] = prof.finish()
 
         return results
 
+    def _iter_source(self, source, progress=None, entropy_map=None):
+        void_bytes = 0
+        structures = 0
+        executables = 0
+        prof = Profiler.create(self.profile)
+        for kind, value in self._events(source, progress, prof):
+            if kind == "void":
+                finding = self._describe_void(*value)
+                void_bytes += finding["size"]
+                yield dict(finding, finding="negative_space")
+            elif kind == "entropy":
+                yield dict(self._describe_entropy(*value), finding="entropy")
+            elif kind == "structure":
+                structures += 1
+                yield dict(self._describe_structure(value), finding="hidden_structure")
+            elif kind == "executable":
+                executables += 1
+                yield dict(value, finding="executable")
+            elif kind == "entropies":
+                if entropy_map is not None:
+                    entropy_map.append(*value)
+            else:
+                if entropy_map is not None:
+                    for r in entropy_map.deserts():
+                        yield dict(self._describe_window(entropy_map, *r), finding="entropy_desert")
+                    for r in entropy_map.islands():
+                        yield dict(self._describe_window(entropy_map, *r), finding="entropy_island")
+                summary = {
+                    "finding": "summary",
+                    "file": source.name,
+                    "size": source.size,
+                    "total_blocks": value["blocks"],
+                    "scanned_bytes": value["scanned"],
+                    "void_percentage": round(void_bytes / max(value["scanned"], 1) * 100, 2),
+                    "hidden_structures_count": structures,
+                    "executables_count": executables,
+                    "known_bytes_skipped": value["known"],
+                    "hole_bytes": value["holes"],
+                    "cancelled": value["cancelled"],
+                }
+                if prof is not None:
+                    summary["profile"] = prof.finish()
+                yield summary
+
+    def _events(self, source, progress=None, prof=None):
+        """Yield raw ``(kind, value)`` events for the whole of ``source``.
+
+        Serial scans stream straight from :meth:`_iter_range`; parallel
+        scans replay each shard's partial in order.  The most recent void
+        is held back until it can no longer grow, which joins voids meeting
+        at shard edges and tells a terminal void from an interior one.
+        Runs that reach a shard edge come as ``run`` fragments and are
+        joined the same way before being matched.  The final event is
+        ``("end", {"end", "blocks", "cancelled", "known", "holes", "scanned"})``.
+        Shard profiles are merged into ``prof``.
+        """
+        size = source.size
+        spans = source.spans()
+        whole = spans == [(0, size)]
+        if whole and self.workers > 1 and source.path and size > self.shard_size:
+            ranges = (_partial_events(p) for p in self._run_shards(source, progress))
+        elif whole:
+            ranges = [self._iter_range(source, 0, size, progress, prof)]
+        else:
+            ranges = [self._iter_spans(source, spans, progress, prof)]
+
+        held = None
+        runs = {}  # byte -> [start, end] of a run that may go on into the next shard
+        scan = self._scan_signatures()
+
+        def run_match(byte, run):
+            match = scan.run_match(byte, run[0], run[1] - run[0])
+            if match is not None:
+                if prof is not None:
+                    prof.count("matches")
+                yield "structure", match
+
+        total = {"end": 0, "blocks": 0, "cancelled": False, "known": 0, "holes": 0,
+                 "scanned": sum(end - start for start, end in spans)}
+        for events in ranges:
+            for kind, value in events:
+                if kind == "run":
+                    byte, start, length = value
+                    run = runs.get(byte)
+                    if run and run[1] == start:
+                        run[1] += length
+                        continue
+                    if run:
+                        yield from run_match(byte, run)
+                    runs[byte] = [start, start + length]
+                elif kind == "void":
+                    if held and held[1] == value[0]:
+                        held[1] = value[1]
+                        held[2] += value[2]
+                        continue
+                    if held:
+                        yield "void", (*held, False)
+                    held = list(value)
+                elif kind == "end":
+                    total["end"] = value["end"]
+                    total["blocks"] += value["blocks"]
+                    total["known"] += value["known"]
+                    total["holes"] += value["holes"]
+                    total["cancelled"] |= value["cancelled"]
+                    for byte, run in list(runs.items()):
+                        if run[1] != value["end"]:  # Stopped short of the next shard
+                            del runs[byte]
+                            yield from run_match(byte, run)
+                elif kind == "profile":
+                    if prof is not None:
+                        prof.merge(value)
+                else:
+                    yield kind, value
+
+        for byte, run in runs.items():
+            yield from run_match(byte, run)
+        if held:
+            yield "void", (*held, held[1] == total["end"])
+        yield "end", total
+
+    def _iter_spans(self, source, spans, progress=None, prof=None):
+        """:meth:`_iter_range` over each span of a sparse source in turn.
+
+        Progress counts scanned bytes, not offsets, so a handful of
+        resident pages high in an address space reads as what it is.
+        """
+        total = sum(end - start for start, end in spans)
+        done = 0
+        blocks = 0
+        known = 0
+        holes = 0
+        end_offset = 0
+        cancelled = False
+        for start, end in spans:
+            span_progress = None
+            if progress is not None:
+                def span_progress(offset, _, base=done - start):
+                    return progress(base + offset, total)
+            for kind, value in self._iter_range(source, start, end, span_progress, prof):
+                if kind != "end":
+                    yield kind, value
+                    continue
+                blocks += value["blocks"]
+                known += value["known"]
+                holes += value["holes"]
+                end_offset = value["end"]
+                cancelled = value["cancelled"]
+            done += end - start
+            if cancelled:
+                break
+        yield "end", {
+            "end": end_offset, "blocks": blocks, "cancelled": cancelled, "known": known, "holes": holes,
+        }
+
+    def _run_shards(self, source, progress=None):
+        """Scan shards in a process pool and yield their partials in order."""
+        size = source.size
+        tasks = [
+            (self, source.path, start, min(start + self.shard_size, size))
+            for start in range(0, size, self.shard_size)
+        ]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(_scan_shard, task) for task in tasks]
+            try:
+                for future in futures:
+                    partial = future.result()
+                    if progress is not None and progress(partial["end"], size) is False:
+                        partial["cancelled"] = True
+                        yield partial
+                        return
+                    yield partial
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _scan_range(self, source, start, end):
+        """Collect :meth:`_iter_range` events for one shard into a partial."""
+        partial = {"voids": [], "entropy": [], "structures": [], "codes": [], "executables": [], "runs": []}
+        prof = Profiler.create(self.profile)
+        for kind, value in self._iter_range(source, start, end, prof=prof, split_runs=True):
+            if kind == "run":
+                partial["runs"].append(value)
+            elif kind == "void":
+                partial["voids"].append(value)
+            elif kind == "entropy":
+                partial["entropy"].append(value)
+            elif kind == "entropies":
+                partial["codes"].append(value)
+            elif kind == "structure":
+                partial["structures"].append(value)
+            elif kind == "executable":
+                partial["executables"].append(value)
+            else:
+                partial.update(value)
+        partial["structures"].sort()
+        if prof is not None:
+            partial["profile"] = prof.summary()
+        return partial
+
+    def _iter_range(self, source, start, end, progress=None, prof=None, split_runs=False):
+        """Yield events for ``[start, end)`` of ``source`` as they are found.
+
+        Offsets stay integers so events from neighbouring shards can be
+        merged.  Signature matches are owned by the range they start in;
+        the scan reads past ``end`` only as far as needed to finish them.
+        With ``split_runs`` a run crossing either edge is not followed
+        past it but yielded as a ``("run", (byte, start, length))``
+        fragment, so a long void costs each shard only its own bytes.
+        """
+        block_size = self.BLOCK_SIZE
+        scan = self._scan_signatures()
+        carved = len(self.signatures)  # Matches from here on are header candidates
+        stream = scan.stream()
+        # A run that begins in the previous shard belongs to that shard
+        previous = source.view(start - 1, 1) if start else b""
+        previous = previous[0] if len(previous) else None
+        if split_runs and previous is not None:
+            stream.hold(previous, start)
+        void = None  # [start, end, blocks]
+        blocks = 0
+        known = 0
+        holes = 0
+        offset = start
+        cancelled = False
+
+        def owned(matches):
+            for m in matches:
+                if not start <= m[0] < end or (
+                    m[0] == start and scan.run_byte(m[2]) == previous
+                ):
+                    continue
+                if prof is not None:
+                    prof.count("matches")
+                if m[2] < carved:
+                    yield "structure", m
+                    continue
+                with stage(prof, "carve"):
+                    executable = self.carver.validate(source, (m[0], m[1], m[2] - carved))
+                if executable is not None:
+                    if prof is not None:
+                        prof.count("executables")
+                    yield "executable", executable
+
+        for base, chunk, zeros, entropies in self._iter_chunks(source, start, end, prof):
+            if zeros is None:
+                # A hole in a sparse file reads as zeros — account for it unread
+                length = chunk
+                count = -(-length // block_size)
+                with stage(prof, "signatures"):
+                    matches = stream.feed_fill(0, length, base)
+                yield from owned(matches)
+                if void:
+                    void[1] += length
+                    void[2] += count
+                else:
+                    void = [base, base + length, count]
+                first = base // block_size
+                for i in range(first + (255 - first) % 256, first + count, 256):
+                    yield "entropy", (i * block_size, 0.0)
+                yield "entropies", (base, bytes(count))
+                blocks += count
+                holes += length
+                offset += length
+                if progress is not None and progress(offset, source.size) is False:
+                    cancelled = True
+                    break
+                continue
+
+            # Known pages have no entropy; only the blocks between them are analysed
+            runs = _unknown_runs(entropies) if None in entropies else [(0, len(entropies))]
+
+            # Signatures are matched across the whole chunk in one pass;
+            # the stream stitches matches that straddle chunk edges.
+            for first, last in runs:
+                piece = chunk[first * block_size:last * block_size]
+                with stage(prof, "signatures"):
+                    matches = stream.feed(piece, base + first * block_size)
+                yield from owned(matches)
+
+            for is_zero, block_entropy in zip(zeros, entropies):
+                length = min(block_size, base + len(chunk) - offset)
+
+                if block_entropy is None:
+                    # A page copied from a known file — nothing to analyse
+                    known += length
+                    if void:
+                        yield "void", tuple(void)
+                        void = None
+                    blocks += 1
+                    offset += length
+                    continue
+
+                # Detect zero regions (negative space)
+                if is_zero:
+                    if void:
+                        void[1] += length
+                        void[2] += 1
+                    else:
+                        void = [offset, offset + length, 1]
+                elif void:
+                    yield "void", tuple(void)
+                    void = None
+
+                if (offset // block_size + 1) % 256 == 0:  # Sample every 1MB
+                    yield "entropy", (offset, block_entropy)
+
+                blocks += 1
+                offset += length
+
+            # Every block's entropy, one byte each, for an EntropyMap
+            for first, last in runs:
+                yield "entropies", (base + first * block_size, quantize(entropies[first:last]))
+
+            if progress is not None and progress(offset, source.size) is False:
+                cancelled = True
+                break
+
+        if split_runs:
+            for fragment in stream.held + stream.take_runs():
+                yield "run", fragment
+
+        # Finish matches that straddle the end of the range
+        if offset < source.size and not cancelled:
+            # With runs split, only the literal lookahead is left to read
+            batch = 1 if split_runs else self.BATCH_BLOCKS
+            for base, chunk in _sparse_chunks(source, offset, source.size, block_size, batch):
+                if base >= offset + stream.lookahead and not stream.pending_before(end):
+                    break
+                if isinstance(chunk, int):
+                    yield from owned(stream.feed_fill(0, chunk, base))
+                else:
+                    yield from owned(stream.feed(chunk, base))
+        yield from owned(stream.close())
+
+        if void:
+            yield "void", tuple(void)
+        if prof is not None:
+            prof.count("blocks", blocks)
+            prof.count("known_bytes", known)
+            prof.count("hole_bytes", holes)
+        yield "end", {
+            "end": offset, "blocks": blocks, "cancelled": cancelled, "known": known, "holes": holes,
+        }
+
+    def _scan_signatures(self):
+        """``signatures`` plus the carver's header magics, matched in one pass."""
+        if self.carver is None:
+            return self.signatures
+        if self._combined is None or self._combined[0] != len(self.signatures):
+            combined = SignatureSet()
+            for sigset in (self.signatures, self.carver.signatures):
+                for pattern, description, order in zip(sigset.patterns, sigset.descriptions, sigset.orders):
+                    combined.add(pattern, description, order)
+            self._combined = (len(self.signatures), combined)
+        return self._combined[1]
+
+    def _iter_chunks(self, source, start=0, end=None, prof=None):
+        """Yield ``(offset, chunk, zeros, entropies)`` for each chunk of ``source``.
+
+        ``zeros`` and ``entropies`` hold one entry per block of the chunk;
+        blocks found in ``known_pages`` get entropy ``None``.  Chunks are
+        memoryviews straight from the source, so nothing is copied on the
+        way to the detectors.  Holes of a sparse source are never read;
+        they come through as ``(offset, length, None, None)``.
+        """
+        block_size = self.BLOCK_SIZE
+        end = source.size if end is None else end
+        chunks = _sparse_chunks(source, start, end, block_size, self.BATCH_BLOCKS)
+        if prof is not None:
+            chunks = prof.timed(chunks, "read")
+        for base, chunk in chunks:
+            if isinstance(chunk, int):
+                yield base, chunk, None, None
+                continue
+            if prof is not None:
+                prof.count("bytes_read", len(chunk))
+            known = []
+            if self.known_pages is not None:
+                with stage(prof, "known_pages"):
+                    known = self.known_pages.known_blocks(chunk)
+                if not any(known):
+                    known = []
+            with stage(prof, "entropy"):
+                zeros, entropies = self._chunk_entropies(chunk, known)
+            yield base, chunk, zeros, entropies
+
+    def _chunk_entropies(self, chunk, known):
+        """Per-block ``(zeros, entropies)`` of one chunk; known blocks get ``None``."""
+        block_size = self.BLOCK_SIZE
+        full = len(chunk) // block_size
+        zeros, entropies = [], []
+        if self.backend == "numpy" and full:
+            blocks = np.frombuffer(chunk, dtype=np.uint8, count=full * block_size)
+            blocks = blocks.reshape(full, block_size)
+            if known:
+                zeros, entropies = [False] * full, [None] * full
+                rows = np.flatnonzero(~np.array(known, dtype=bool))
+                if len(rows):
+                    unknown = blocks[rows]
+                    for i, is_zero, entropy in zip(
+                        rows.tolist(), (~unknown.any(axis=1)).tolist(),
+                        _batch_entropy(unknown).tolist(),
+                    ):
+                        zeros[i], entropies[i] = is_zero, entropy
+                    del unknown
+            else:
+                zeros = (~blocks.any(axis=1)).tolist()
+                entropies = _batch_entropy(blocks).tolist()
+            del blocks  # Release the buffer export before the next chunk
+
+        # Pure-Python path, and the trailing partial block at end of file
+        for pos in range(len(zeros) * block_size, len(chunk), block_size):
+            if known and pos // block_size < len(known) and known[pos // block_size]:
+                zeros.append(False)
+                entropies.append(None)
+                continue
+            block = chunk[pos:pos + block_size]
+            zeros.append(_ZERO_BLOCK.startswith(block))
+            entropies.append(self._block_entropy(block))
+        return zeros, entropies
+
+    def _describe_void(self, start, end, blocks, terminal):
+        return {
+            "type": "void",
+            "start": hex(start),
+            "end": hex(end),
+            "size": blocks * self.BLOCK_SIZE,
+            "interpretation": (
+                "Terminal void — absence at the boundary"
+                if terminal
+                else "Evidence of erasure — the absence is the message"
+            ),
+        }
+
+    def _describe_entropy(self, offset, entropy):
+        return {
+            "offset": hex(offset),
+            "entropy": round(entropy, 3),
+            "classification": self._classify_entropy(entropy),
+        }
+
+    def _describe_window(self, entropy_map, first, end, mean):
+        return {
+            "start": hex(entropy_map.offset(first)),
+            "end": hex(entropy_map.offset(end - 1) + entropy_map.block_size),
+            "blocks": end - first,
+            "mean_entropy": mean,
+            "classification": self._classify_entropy(mean),
+        }
+
+    def _describe_structure(self, match):
+        offset, length, index = match
+        return {
+            "offset": hex(offset),
+            "length": length,
+            "pattern": self.signatures.descriptions[index],
+            "order": self.signatures.orders[index],
+        }
+
+    @staticmethod
+    def _block_entropy(block):
+        """Shannon entropy (bits per byte) of a single block."""
+        entropy = 0.0
+        for count in Counter(block).values():
+            p = count / len(block)
+            entropy -= p * math.log2(p)
+        return entropy
+
     def _classify_entropy(self, entropy):
         """Classify entropy level."""
         if entropy < 1.0:
@@ -161,57 +845,160 @@ class NegativeSpaceAnalyzer:
             }
 
 
+_ZERO_BLOCK = bytes(NegativeSpaceAnalyzer.BLOCK_SIZE)
+_SHARED_PAGE_HASHES = PageHashCache(NegativeSpaceAnalyzer.BLOCK_SIZE)
+
+
+def _scan_shard(task):
+    """Process-pool entry point: scan one byte range of a dump file."""
+    analyzer, path, start, end = task
+    with open_dump(path) as source:
+        return analyzer._scan_range(source, start, end)
+
+
+def _partial_events(partial):
+    """Replay a shard partial as :meth:`NegativeSpaceAnalyzer._iter_range` events."""
+    for void in partial["voids"]:
+        yield "void", void
+    for entropy in partial["entropy"]:
+        yield "entropy", entropy
+    for match in partial["structures"]:
+        yield "structure", match
+    for executable in partial["executables"]:
+        yield "executable", executable
+    for codes in partial["codes"]:
+        yield "entropies", codes
+    for run in partial["runs"]:
+        yield "run", run
+    if "profile" in partial:
+        yield "profile", partial["profile"]
+    yield "end", {k: partial[k] for k in ("end", "blocks", "cancelled", "known", "holes")}
+
+
+def _sparse_chunks(source, start, end, block_size, batch_blocks=256):
+    """``source.chunks`` over ``[start, end)`` that skips holes.
+
+    Data comes as ``(offset, memoryview)``; each hole, trimmed to whole
+    blocks (or to the end of the file), as ``(offset, length)``.
+    """
+    pos = start
+    for hole_start, hole_end in source.holes():
+        hole_start = max(-(-hole_start // block_size) * block_size, pos)
+        if hole_start >= end:
+            break
+        if hole_end != source.size:
+            hole_end = hole_end // block_size * block_size
+        hole_end = min(hole_end, end)
+        if hole_start >= hole_end:
+            continue
+        yield from source.chunks(pos, hole_start, block_size * batch_blocks)
+        yield hole_start, hole_end - hole_start
+        pos = hole_end
+    if pos < end:
+        yield from source.chunks(pos, end, block_size * batch_blocks)
+
+
+def _unknown_runs(entropies):
+    """``(first, last)`` runs of blocks that are not known pages."""
+    runs = []
+    first = None
+    for i, entropy in enumerate(entropies):
+        if entropy is None:
+            if first is not None:
+                runs.append((first, i))
+                first = None
+        elif first is None:
+            first = i
+    if first is not None:
+        runs.append((first, len(entropies)))
+    return runs
+
+
+def _batch_entropy(blocks):
+    """Shannon entropy of each row of a 2-D ``uint8`` array."""
+    n, width = blocks.shape
+    # Offset each row into its own 256-bin range so a single bincount
+    # produces every block's histogram at once.
+    bins = blocks + (np.arange(n, dtype=np.intp) * 256)[:, None]
+    hist = np.bincount(bins.ravel(), minlength=n * 256).reshape(n, 256)
+    p = hist / width
+    logp = np.zeros_like(p)
+    np.log2(p, out=logp, where=hist > 0)
+    # ``0.0 -`` keeps uniform blocks at +0.0, matching the Python path
+    return 0.0 - (p * logp).sum(axis=1)
+
+
 class ProcessMemoryForensics:
-    """Analyze live process memory for hyperreal indicators."""
+    """Analyze live process memory for hyperreal indicators.
+
+    ``page_cache`` is the :class:`PageHashCache` of on-disk page hashes
+    used by deep hollowing checks.  By default every instance shares one
+    cache for the whole process, so a host sweep hashes each library
+    once however many processes map it.
+
+    ``profile`` (``True`` or a hook) times reading the maps, classifying
+    regions and the deep check's reads, hashing and disk lookups, counts
+    regions, pages compared, bytes read, page cache hits and processes
+    skipped, and adds a ``profile`` block to :meth:`read_proc_maps`,
+    :meth:`detect_process_hollowing` and :meth:`sweep_host` results.
+    """
+
+    THREAT_RANK = {"HIGH": 3, "MEDIUM": 2, "LOW": 1, "NONE": 0}
+    MAX_PAGES_LISTED = 16  # Diverging page addresses listed per region
+
+    def __init__(self, page_cache=None, profile=None):
+        self.page_cache = page_cache if page_cache is not None else _SHARED_PAGE_HASHES
+        self.profile = profile
 
     def read_proc_maps(self, pid):
         """Read and analyze process memory maps from /proc."""
-        maps_file = f"/proc/{pid}/maps"
-        if not os.path.exists(maps_file):
-            return {"error": f"Process {pid} not found or not accessible"}
+        prof = Profiler.create(self.profile)
+        result = self._read_proc_maps(pid, prof)
+        if prof is not None:
+            result["profile"] = prof.finish()
+        return result
 
-        regions = []
-        try:
-            with open(maps_file, "r") as f:
-                for line in f:
-                    parts = line.strip().split()
-                    if len(parts) >= 5:
-                        addr_range = parts[0]
-                        perms = parts[1]
-                        offset = parts[2]
-                        dev = parts[3]
-                        inode = parts[4]
-                        pathname = parts[5] if len(parts) > 5 else "[anonymous]"
-
-                        start, end = addr_range.split("-")
-                        size = int(end, 16) - int(start, 16)
-
-                        region = {
-                            "start": f"0x{start}",
-                            "end": f"0x{end}",
-                            "size": size,
-                            "permissions": perms,
-                            "offset": offset,
-                            "pathname": pathname,
-                        }
-
-                        # Classify region
-                        region["simulacra_analysis"] = self._classify_region(
-                            perms, pathname, size
-                        )
-                        regions.append(region)
-        except PermissionError:
-            return {"error": "Permission denied — run as root"}
+    def _read_proc_maps(self, pid, prof=None):
+        with stage(prof, "read_maps"):
+            table = self.region_table(pid)
+        if isinstance(table, dict):
+            return table
+
+        with stage(prof, "classify"):
+            regions = table.to_dicts()
+            for region in regions:
+                # Classify region
+                region["simulacra_analysis"] = self._classify_region(
+                    region["permissions"], region["pathname"], region["size"]
+                )
+        if prof is not None:
+            prof.count("regions", len(regions))
 
         return {
             "pid": pid,
             "scan_time": datetime.utcnow().isoformat(),
             "total_regions": len(regions),
-            "total_mapped": sum(r["size"] for r in regions),
+            "total_mapped": table.total_mapped,
             "suspicious": [r for r in regions if r["simulacra_analysis"]["order"] >= 3],
             "regions": regions,
         }
 
+    def region_table(self, pid):
+        """Process memory maps as a compact :class:`RegionTable`.
+
+        Use this instead of :meth:`read_proc_maps` for processes with many
+        mappings or to resolve addresses with ``find``/``find_many``.
+        Returns an error dict like :meth:`read_proc_maps` on failure.
+        """
+        if not os.path.exists(f"/proc/{pid}/maps"):
+            return {"error": f"Process {pid} not found or not accessible"}
+        try:
+            return RegionTable.from_proc(pid)
+        except PermissionError:
+            return {"error": "Permission denied — run as root"}
+        except (FileNotFoundError, ProcessLookupError):
+            return {"error": f"Process {pid} exited during scan"}
+
     def _classify_region(self, perms, pathname, size):
         """Classify a memory region by simulacra order."""
         # RWX regions are suspicious (Order 3 — shouldn't exist in normal operation)
@@ -258,14 +1045,28 @@ class ProcessMemoryForensics:
             "threat": "NONE",
         }
 
-    def detect_process_hollowing(self, pid):
+    def detect_process_hollowing(self, pid, deep=False):
         """Detect process hollowing — a quintessential simulacra attack.
 
         In process hollowing, a legitimate process is gutted and replaced
         with malicious code while maintaining its external identity.
         This is Baudrillard's Order 3: the process masks the absence
         of its original content.
+
+        With ``deep`` the resident pages of every executable file-backed
+        mapping are read from ``/proc/<pid>/mem`` and hashed against the
+        same file offsets on disk; pages that differ are reported as
+        ``PATCHED_CODE`` and the check's totals go to ``deep_check``.
         """
+        prof = Profiler.create(self.profile)
+        cached = dict(self.page_cache.stats) if prof is not None else None
+        result = self._detect_hollowing(pid, deep, prof)
+        if prof is not None:
+            _count_cache(prof, self.page_cache, cached)
+            result["profile"] = prof.finish()
+        return result
+
+    def _detect_hollowing(self, pid, deep=False, prof=None):
         result = {
             "pid": pid,
             "scan_time": datetime.utcnow().isoformat(),
@@ -303,6 +1104,10 @@ class ProcessMemoryForensics:
                 "order": 2,
             })
 
+        if deep:
+            with stage(prof, "deep_check"):
+                result["deep_check"] = self._check_code_pages(pid, result["indicators"], prof)
+
         if result["indicators"]:
             max_order = max(i["order"] for i in result["indicators"])
             result["assessment"] = {
@@ -322,3 +1127,230 @@ class ProcessMemoryForensics:
             }
 
         return result
+
+    def _check_code_pages(self, pid, indicators, prof=None):
+        """Compare resident executable file-backed pages with the files on disk."""
+        summary = {"regions_checked": 0, "pages_compared": 0, "pages_diverged": 0, "unverified": []}
+        block = self.page_cache.block_size
+        digest = self.page_cache.digest
+        try:
+            source = ProcessMemorySource(pid, require=PERM_EXEC)
+        except OSError:
+            summary["error"] = "Cannot read process memory — run as root"
+            return summary
+
+        with source:
+            table = source.table
+            files = {}  # region index -> page hashes of its file (None: not comparable)
+            diverged = {}  # region index -> addresses of differing pages
+            for start, end in source.spans():
+                chunks = source.chunks(start, end)
+                if prof is not None:
+                    chunks = prof.timed(chunks, "read_memory")
+                for base, chunk in chunks:
+                    for pos in range(0, len(chunk) - block + 1, block):
+                        address = base + pos
+                        i = table.find(address)
+                        if i not in files:
+                            with stage(prof, "disk_hashes"):
+                                files[i] = self._disk_hashes(pid, table, i, summary)
+                        hashes = files[i]
+                        page = (table.offsets[i] + address - table.starts[i]) // block
+                        if hashes is None or page >= len(hashes):
+                            continue  # Not file-backed, or past the end of the file
+                        summary["pages_compared"] += 1
+                        if digest(chunk[pos:pos + block]) != hashes[page]:
+                            diverged.setdefault(i, []).append(address)
+                    if prof is not None:
+                        prof.count("bytes_read", len(chunk))
+
+        summary["regions_checked"] = sum(hashes is not None for hashes in files.values())
+        if prof is not None:
+            prof.count("pages_compared", summary["pages_compared"])
+        for i, addresses in sorted(diverged.items()):
+            summary["pages_diverged"] += len(addresses)
+            indicators.append({
+                "type": "PATCHED_CODE",
+                "detail": f"{len(addresses)} resident page(s) of {table.pathnames[i]} differ from the file on disk",
+                "order": 3,
+                "pathname": table.pathnames[i],
+                "start": f"0x{table.starts[i]:08x}",
+                "end": f"0x{table.ends[i]:08x}",
+                "pages": [hex(address) for address in addresses[:self.MAX_PAGES_LISTED]],
+            })
+        return summary
+
+    def _disk_hashes(self, pid, table, i, summary):
+        """Page hashes of the file behind region ``i``, or ``None``."""
+        pathname = table.pathnames[i]
+        if not pathname.startswith("/"):
+            return None
+        # map_files opens the very file mapped, even if it was replaced since
+        try:
+            return self.page_cache.hashes(f"/proc/{pid}/map_files/{table.starts[i]:x}-{table.ends[i]:x}")
+        except OSError:
+            pass
+        try:
+            if os.stat(pathname).st_ino == table.inodes[i]:
+                return self.page_cache.hashes(pathname)
+        except OSError:
+            pass
+        if pathname not in summary["unverified"]:
+            summary["unverified"].append(pathname)
+        return None
+
+    def sweep_host(self, workers=16, time_budget=None, pids=None, progress=None, deep=False):
+        """Scan every process on the host and rank what looks hollowed.
+
+        Each pid gets :meth:`read_proc_maps` and
+        :meth:`detect_process_hollowing` on a pool of ``workers`` threads.
+        Processes that exit mid-sweep are counted and dropped.  With
+        ``time_budget`` (seconds) the sweep stops when the budget runs out
+        and reports which pids were never scanned; scans still running are
+        abandoned rather than waited for.  ``pids`` restricts the
+        sweep (default: everything in ``/proc``); ``progress(done, total)``
+        is called as processes finish and can return ``False`` to stop.
+        ``deep`` runs the deep hollowing check on each process, sharing
+        the page cache so common libraries are hashed once.
+
+        Suspicious regions, hollowing indicators and processes are each
+        ranked most severe first.
+        """
+        started = time.monotonic()
+        deadline = None if time_budget is None else started + time_budget
+        pids = sorted(_list_pids() if pids is None else pids)
+        prof = Profiler.create(self.profile)
+        cached = dict(self.page_cache.stats) if prof is not None else None
+
+        results, exited, denied = [], [], []
+
+        def collect(done):
+            for future in done:
+                pid = pending.pop(future)
+                result = future.result()
+                if result is None:
+                    exited.append(pid)
+                elif "error" in result:
+                    denied.append(pid)
+                else:
+                    results.append(result)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        pending = {pool.submit(self._sweep_pid, pid, deep, prof): pid for pid in pids}
+        stopped = False
+        try:
+            while pending:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    stopped = True  # Time budget exhausted
+                    break
+                collect(done)
+                if progress is not None and progress(len(pids) - len(pending), len(pids)) is False:
+                    stopped = True
+                    break
+            # Scans that finished meanwhile count; the rest are skipped
+            collect([future for future in pending if future.done() and not future.cancelled()])
+        finally:
+            # Don't wait out scans still running — the budget is the budget
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+        report = self._sweep_report(
+            results, exited, denied, sorted(pending.values()), stopped,
+            time.monotonic() - started,
+        )
+        if prof is not None:
+            prof.count("processes", len(results))
+            prof.count("errors_skipped", len(exited) + len(denied))
+            _count_cache(prof, self.page_cache, cached)
+            report["profile"] = prof.finish()
+        return report
+
+    def _sweep_pid(self, pid, deep=False, prof=None):
+        """Scan one pid for the sweep; ``None`` if it exited meanwhile."""
+        maps = self._read_proc_maps(pid, prof)
+        if "error" in maps and not os.path.exists(f"/proc/{pid}"):
+            return None
+        if "error" in maps:
+            return {"pid": pid, "error": maps["error"]}
+        hollowing = self._detect_hollowing(pid, deep, prof)
+        try:
+            with open(f"/proc/{pid}/comm", "r") as f:
+                name = f.read().strip()
+        except OSError:
+            name = None
+        if not os.path.exists(f"/proc/{pid}"):
+            return None  # Exited — inaccessibility isn't concealment
+        return {"pid": pid, "name": name, "maps": maps, "hollowing": hollowing}
+
+    def _sweep_report(self, results, exited, denied, skipped, stopped, elapsed):
+        regions, indicators, processes = [], [], []
+        for r in results:
+            pid, name = r["pid"], r["name"]
+            suspicious = r["maps"]["suspicious"]
+            for region in suspicious:
+                analysis = region["simulacra_analysis"]
+                regions.append({
+                    "pid": pid,
+                    "name": name,
+                    "start": region["start"],
+                    "end": region["end"],
+                    "size": region["size"],
+                    "permissions": region["permissions"],
+                    "pathname": region["pathname"],
+                    "order": analysis["order"],
+                    "classification": analysis["classification"],
+                    "threat": analysis["threat"],
+                })
+            for indicator in r["hollowing"]["indicators"]:
+                indicators.append(dict(indicator, pid=pid, name=name))
+
+            assessment = r["hollowing"]["assessment"]
+            order = max([assessment["order"]] + [
+                s["simulacra_analysis"]["order"] for s in suspicious
+            ])
+            if order > 1:
+                processes.append({
+                    "pid": pid,
+                    "name": name,
+                    "order": order,
+                    "hollowed": assessment["hollowed"],
+                    "suspicious_regions": len(suspicious),
+                    "indicators": [i["type"] for i in r["hollowing"]["indicators"]],
+                })
+
+        rank = self.THREAT_RANK
+        regions.sort(key=lambda r: (-r["order"], -rank.get(r["threat"], 0), -r["size"], r["pid"]))
+        indicators.sort(key=lambda i: (-i["order"], i["pid"]))
+        processes.sort(key=lambda p: (-p["order"], -p["suspicious_regions"], p["pid"]))
+
+        return {
+            "scan_time": datetime.utcnow().isoformat(),
+            "elapsed": round(elapsed, 3),
+            "complete": not skipped and not stopped,
+            "processes_scanned": len(results),
+            "processes_exited": len(exited),
+            "processes_denied": len(denied),
+            "skipped_pids": skipped,
+            "hollowed_processes": sum(p["hollowed"] for p in processes),
+            "processes": processes,
+            "suspicious_regions": regions,
+            "hollowing_indicators": indicators,
+        }
+
+
+def _count_cache(prof, page_cache, before):
+    """Add what ``page_cache`` did since ``before`` to the profile counters."""
+    for key, value in page_cache.stats.items():
+        prof.count(f"page_cache_{key}", value - before.get(key, 0))
+
+
+def _list_pids():
+    """Numeric entries of ``/proc`` — the processes alive right now."""
+    try:
+        with os.scandir("/proc") as it:
+            return [int(entry.name) for entry in it if entry.name.isdigit()]
+    except OSError:
+        return []
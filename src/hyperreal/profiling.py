@@ -0,0 +1,126 @@
+"""Hyperreal Profiling — where a scan spends its time.
+
+:class:`NegativeSpaceAnalyzer`, :class:`ProcessMemoryForensics` and
+:class:`FilesystemHyperreal` take ``profile=``.  ``True`` times each
+stage of a scan, counts what it touched (bytes read, blocks, stat
+calls, bytes hashed, cache hits, errors skipped) and adds the totals
+to the result as a ``profile`` block.  A callable does the same and is
+also called as ``hook(event, data)``: ``("stage", {"stage",
+"seconds"})`` each time a timed stage ends and ``("summary", summary)``
+when the scan is done, which is how ``iter_*`` scans report.
+
+Profiling is off by default, and then costs one ``is None`` test per
+chunk, directory entry or region.
+"""
+
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+_OFF = nullcontext()
+
+# Counters turned into per-second rates over the scan's wall time
+RATES = (
+    ("bytes_read", "mb_per_s", 1 << 20),
+    ("blocks", "blocks_per_s", 1),
+    ("files", "files_per_s", 1),
+    ("processes", "processes_per_s", 1),
+)
+
+
+class Profiler:
+    """Per-stage timers and counters for one scan.
+
+    ``stage(name)`` times a block of code; ``add_time`` records time the
+    caller measured itself and ``count`` adds to a counter.  Updates are
+    locked, so one profiler can follow a threaded sweep — stage seconds
+    are then summed over threads and may exceed ``wall_seconds``.
+    """
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.timers = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, profile):
+        """The profiler a scanner's ``profile`` option asks for, or ``None``."""
+        if not profile:
+            return None
+        return cls(profile if callable(profile) else None)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, iterable, name):
+        """Iterate ``iterable``, timing each step as stage ``name``."""
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def add_time(self, name, seconds, calls=1):
+        with self._lock:
+            self.timers[name] += seconds
+            self.calls[name] += calls
+        if self.hook is not None:
+            self.hook("stage", {"stage": name, "seconds": seconds})
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def merge(self, summary):
+        """Add the stages and counters of another profiler's ``summary``.
+
+        The hook is not called: the other profiler reported those stages.
+        """
+        with self._lock:
+            for name, timer in summary["stages"].items():
+                self.timers[name] += timer["seconds"]
+                self.calls[name] += timer["calls"]
+            for name, n in summary["counters"].items():
+                self.counters[name] += n
+
+    def summary(self):
+        """``wall_seconds``, ``stages`` (``seconds`` and ``calls``), ``counters`` and ``rates``."""
+        wall = time.perf_counter() - self.started
+        with self._lock:
+            stages = {
+                name: {"seconds": round(seconds, 6), "calls": self.calls[name]}
+                for name, seconds in sorted(self.timers.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+        rates = {
+            rate: round(counters[counter] / scale / wall, 2)
+            for counter, rate, scale in RATES
+            if counter in counters and wall > 0
+        }
+        return {"wall_seconds": round(wall, 6), "stages": stages, "counters": counters, "rates": rates}
+
+    def finish(self):
+        """The final ``summary``, also passed to the hook."""
+        summary = self.summary()
+        if self.hook is not None:
+            self.hook("summary", summary)
+        return summary
+
+
+def stage(profiler, name):
+    """``profiler.stage(name)``, or a shared no-op when profiling is off."""
+    return _OFF if profiler is None else profiler.stage(name)
@@ -0,0 +1,152 @@
+"""Hyperreal Region Table — compact process memory maps.
+
+A JVM or browser process can have tens of thousands of mappings.  A
+:class:`RegionTable` keeps them as parallel integer arrays (start, end,
+permission bits, offset, device, inode) with interned pathnames, and
+answers "which region holds this address?" by binary search, so
+pointers can be resolved in bulk without building a dict per mapping.
+"""
+
+import os
+import sys
+from array import array
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional — bulk lookups fall back to bisect
+    np = None
+
+PERM_READ = 1
+PERM_WRITE = 2
+PERM_EXEC = 4
+PERM_SHARED = 8  # 's' in the fourth column; private mappings show 'p'
+
+
+class RegionTable:
+    """Memory mappings of one process, sorted by start address.
+
+    Columns are exposed as ``array`` objects — ``starts``, ``ends``,
+    ``perms``, ``offsets``, ``devs`` and ``inodes`` — plus the
+    ``pathnames`` list, all indexed by region number.  Anonymous
+    mappings have the pathname ``"[anonymous]"``.
+    """
+
+    def __init__(self):
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.perms = array("B")
+        self.offsets = array("Q")
+        self.devs = array("Q")
+        self.inodes = array("Q")
+        self.pathnames = []
+
+    @classmethod
+    def from_proc(cls, pid):
+        """Read ``/proc/<pid>/maps``; ``OSError`` propagates to the caller."""
+        with open(f"/proc/{pid}/maps", "r") as f:
+            return cls.from_lines(f)
+
+    @classmethod
+    def from_lines(cls, lines):
+        """Parse lines in ``/proc/<pid>/maps`` format."""
+        table = cls()
+        interned = {}
+        for line in lines:
+            parts = line.split(None, 5)
+            if len(parts) < 5:
+                continue
+            start, _, end = parts[0].partition("-")
+            major, _, minor = parts[3].partition(":")
+            pathname = parts[5].rstrip("\n") if len(parts) > 5 else "[anonymous]"
+            table.starts.append(int(start, 16))
+            table.ends.append(int(end, 16))
+            table.perms.append(_perm_bits(parts[1]))
+            table.offsets.append(int(parts[2], 16))
+            table.devs.append(os.makedev(int(major, 16), int(minor or "0", 16)))
+            table.inodes.append(int(parts[4]))
+            # Thousands of mappings share a handful of library paths
+            name = interned.get(pathname)
+            if name is None:
+                name = interned[pathname] = sys.intern(pathname)
+            table.pathnames.append(name)
+        if any(a > b for a, b in zip(table.starts, table.starts[1:])):
+            table._sort()
+        return table
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def total_mapped(self):
+        return sum(self.ends) - sum(self.starts)
+
+    def size(self, index):
+        return self.ends[index] - self.starts[index]
+
+    def permissions(self, index):
+        """The ``rwxp`` string of a region, as printed in ``maps``."""
+        bits = self.perms[index]
+        return "".join((
+            "r" if bits & PERM_READ else "-",
+            "w" if bits & PERM_WRITE else "-",
+            "x" if bits & PERM_EXEC else "-",
+            "s" if bits & PERM_SHARED else "p",
+        ))
+
+    def find(self, address):
+        """Index of the region containing ``address``, or ``-1``."""
+        i = bisect_right(self.starts, address) - 1
+        if i >= 0 and address < self.ends[i]:
+            return i
+        return -1
+
+    def find_many(self, addresses):
+        """:meth:`find` for many addresses at once; returns a list of indices.
+
+        Addresses outside every region — orphaned references — map to ``-1``.
+        """
+        if np is None or not len(self.starts):
+            return [self.find(address) for address in addresses]
+        starts = np.frombuffer(self.starts, dtype=np.uint64)
+        ends = np.frombuffer(self.ends, dtype=np.uint64)
+        query = np.asarray(addresses, dtype=np.uint64)
+        index = np.searchsorted(starts, query, side="right").astype(np.int64) - 1
+        inside = index >= 0
+        inside[inside] = query[inside] < ends[index[inside]]
+        return np.where(inside, index, -1).tolist()
+
+    def region(self, index):
+        """One region in the dict layout used by ``read_proc_maps``."""
+        return {
+            "start": f"0x{self.starts[index]:08x}",
+            "end": f"0x{self.ends[index]:08x}",
+            "size": self.size(index),
+            "permissions": self.permissions(index),
+            "offset": f"{self.offsets[index]:08x}",
+            "pathname": self.pathnames[index],
+        }
+
+    def to_dicts(self):
+        """Every region as a dict — the opt-in, memory-hungry view."""
+        return [self.region(i) for i in range(len(self))]
+
+    def _sort(self):
+        order = sorted(range(len(self.starts)), key=self.starts.__getitem__)
+        for name in ("starts", "ends", "perms", "offsets", "devs", "inodes"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, (column[i] for i in order)))
+        self.pathnames = [self.pathnames[i] for i in order]
+
+
+def _perm_bits(perms):
+    bits = 0
+    if perms[0:1] == "r":
+        bits |= PERM_READ
+    if perms[1:2] == "w":
+        bits |= PERM_WRITE
+    if perms[2:3] == "x":
+        bits |= PERM_EXEC
+    if perms[3:4] == "s":
+        bits |= PERM_SHARED
+    return bits
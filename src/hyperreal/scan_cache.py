@@ -0,0 +1,154 @@
+"""Hyperreal Scan Cache — remember what has already been read.
+
+Nightly rescans of the same volume mostly meet files that have not
+changed.  The cache stores each inode's content digests in SQLite,
+keyed on ``(st_dev, st_ino)`` and validated against size, mtime and
+ctime (nanoseconds), so an unchanged file is never read again and a
+repeat scan costs little more than its ``stat`` calls.
+"""
+
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    partial TEXT,
+    full TEXT,
+    PRIMARY KEY (dev, ino, algorithm)
+);
+CREATE INDEX IF NOT EXISTS digests_path ON digests (path);
+"""
+
+
+def default_cache_path():
+    """``$XDG_CACHE_HOME/hyperreal/scan_cache.sqlite3`` (``~/.cache`` by default)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "hyperreal", "scan_cache.sqlite3")
+
+
+class ScanCache:
+    """Persistent digest cache shared by repeated filesystem scans.
+
+    ``path`` defaults to :func:`default_cache_path`; ``":memory:"`` gives a
+    throwaway cache.  ``stats`` counts files whose digests were all
+    answered (``hits``) or that had to be read (``misses``), digests
+    written and rows evicted.  The connection is guarded by a lock, so one cache can
+    serve hashing threads.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._touched = set()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def lookup(self, st, algorithm):
+        """Return ``(partial, full)`` cached for an unchanged inode, else ``None``."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, ctime_ns, partial, full FROM digests "
+                "WHERE dev = ? AND ino = ? AND algorithm = ?",
+                (st.st_dev, st.st_ino, algorithm),
+            ).fetchone()
+            self._touched.add((st.st_dev, st.st_ino))
+        if row is None or row[:3] != (st.st_size, st.st_mtime_ns, st.st_ctime_ns):
+            return None
+        return row[3], row[4]
+
+    def store(self, st, path, algorithm, partial=None, full=None):
+        """Record the digests computed for an inode, replacing stale ones."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, algorithm, st.st_size, st.st_mtime_ns,
+                 st.st_ctime_ns, os.path.abspath(path), partial, full),
+            )
+            self._touched.add((st.st_dev, st.st_ino))
+            self.stats["stored"] += 1
+
+    def count(self, hit, was_hit=False):
+        """Tally one file as a cache hit or miss; ``was_hit`` retracts its earlier hit."""
+        with self._lock:
+            self.stats["hits" if hit else "misses"] += 1
+            if was_hit:
+                self.stats["hits"] -= 1
+
+    def evict_missing(self, root_path):
+        """Drop rows under ``root_path`` whose file no longer exists.
+
+        Rows looked up or stored since the last eviction are known to be
+        live and are skipped; the rest are checked with ``lstat``.
+        """
+        root = os.path.abspath(root_path)
+        prefix = _like_escape(root.rstrip(os.sep) + os.sep) + "%"
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT dev, ino, path FROM digests WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                (root, prefix),
+            ).fetchall()
+            touched, self._touched = self._touched, set()
+
+        gone = []
+        for dev, ino, path in rows:
+            if (dev, ino) in touched:
+                continue
+            try:
+                st = os.lstat(path)
+                if (st.st_dev, st.st_ino) == (dev, ino):
+                    continue
+            except OSError:
+                pass
+            gone.append((dev, ino))
+
+        with self._lock:
+            self._db.executemany("DELETE FROM digests WHERE dev = ? AND ino = ?", gone)
+            self._db.commit()
+            self.stats["evicted"] += len(gone)
+        return len(gone)
+
+    def invalidate(self, path=None):
+        """Forget cached digests — everything, or one file or directory tree."""
+        with self._lock:
+            if path is None:
+                self._db.execute("DELETE FROM digests")
+            else:
+                path = os.path.abspath(path)
+                prefix = _like_escape(path.rstrip(os.sep) + os.sep) + "%"
+                self._db.execute(
+                    "DELETE FROM digests WHERE path = ? OR path LIKE ? ESCAPE '\\'",
+                    (path, prefix),
+                )
+            self._db.commit()
+
+    def flush(self):
+        with self._lock:
+            self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,501 @@
+"""Hyperreal Signatures — single-pass multi-pattern scanning.
+
+Signatures are matched in one pass over each buffer and every
+occurrence is reported.  Large sets are prefiltered — on q-grams
+vectorized with NumPy when available, otherwise through a trie-shaped
+regular expression or, once a set starts with many different bytes,
+q-grams sampled every few bytes — and confirmed by walking a byte trie,
+so the cost per byte stays roughly flat as a set grows from a handful
+of patterns to thousands.  Without NumPy it is set by the shortest
+pattern, which bounds how sparsely grams can be sampled.  Signatures
+that repeat one byte (zero pages, NOP and INT3 sleds) are tracked as
+runs instead: a wiped gigabyte is one finding rather than a match at
+every offset.
+
+Scanning is streamed — buffers are fed in order and matches straddling
+a buffer boundary are stitched back together.
+"""
+
+import re
+import sys
+import json
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional — fall back to the Python prefilters
+    np = None
+
+RUN_MIN_LENGTH = 2  # Homogeneous patterns at least this long are runs
+DIRECT_LIMIT = 8  # Up to this many literals are searched one by one
+TRIE_LIMIT = 64  # Without NumPy, sets starting with more distinct bytes are sampled
+SAMPLE_TYPECODES = {1: "B", 2: "H", 4: "I"}  # array typecode reading q-byte grams
+FIND_LIMIT = 32  # Sampled grams located by find() before walking the whole buffer
+QGRAM_BITS = 18  # Prefilter table size (2**18 slots) for large sets
+FILL_CHUNK = 1024 * 1024  # Bytes materialized at a time when a fill must be scanned
+
+
+class SignatureSet:
+    """A collection of byte signatures with their interpretation.
+
+    ``signatures`` is either a mapping of pattern bytes to description
+    (the ``HOLLOW_PATTERNS`` layout) or an iterable of dicts with
+    ``pattern``, ``description`` and optional ``order`` keys.
+    """
+
+    def __init__(self, signatures=None):
+        self.patterns = []
+        self.descriptions = []
+        self.orders = []
+        self._compiled = None
+        if isinstance(signatures, dict):
+            for pattern, description in signatures.items():
+                self.add(pattern, description)
+        elif signatures:
+            for sig in signatures:
+                self.add(sig["pattern"], sig["description"], sig.get("order", 3))
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __getstate__(self):
+        # Compiled matchers are rebuilt lazily — don't ship them to workers
+        state = self.__dict__.copy()
+        state["_compiled"] = None
+        return state
+
+    def run_byte(self, index):
+        """The repeated byte if signature ``index`` is a run, else ``None``."""
+        pattern = self.patterns[index]
+        return pattern[0] if _is_run(pattern) else None
+
+    def run_match(self, byte, start, length):
+        """The ``(offset, length, index)`` match a run of ``byte`` makes, or ``None``.
+
+        Lets runs found in pieces (see :meth:`SignatureStream.take_runs`)
+        be matched once they are joined.
+        """
+        for run_byte, lengths, _, _ in self._compile().runs:
+            if run_byte == byte:
+                index = _run_index(lengths, length)
+                return None if index is None else (start, length, index)
+        return None
+
+    def add(self, pattern, description, order=3):
+        """Add one signature; returns its index."""
+        if not pattern:
+            raise ValueError("Signature pattern must not be empty")
+        self.patterns.append(bytes(pattern))
+        self.descriptions.append(description)
+        self.orders.append(order)
+        self._compiled = None
+        return len(self.patterns) - 1
+
+    @classmethod
+    def from_file(cls, path):
+        """Create a signature set from a JSON file (see :meth:`load`)."""
+        return cls().load(path)
+
+    def load(self, path):
+        """Add the signatures stored in a JSON file; returns ``self``.
+
+        The file holds either a list of objects with ``hex`` (or ``text``),
+        ``description`` and optional ``order``, or an object mapping hex
+        strings to descriptions.
+        """
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if isinstance(data, dict):
+            for hexstr, description in data.items():
+                self.add(bytes.fromhex(hexstr), description)
+            return self
+
+        for entry in data:
+            if "hex" in entry:
+                pattern = bytes.fromhex(entry["hex"])
+            elif "text" in entry:
+                pattern = entry["text"].encode()
+            else:
+                raise ValueError(f"Signature needs 'hex' or 'text': {entry}")
+            self.add(pattern, entry.get("description", pattern.hex()), entry.get("order", 3))
+        return self
+
+    def stream(self):
+        """Return a fresh :class:`SignatureStream` over this set."""
+        return SignatureStream(self)
+
+    def scan(self, buf, offset=0):
+        """Scan one complete buffer; returns ``(offset, length, index)`` tuples."""
+        stream = self.stream()
+        matches = stream.feed(buf, offset)
+        matches.extend(stream.close())
+        return sorted(matches)
+
+    def _compile(self):
+        if self._compiled is None:
+            self._compiled = _CompiledSet(self.patterns)
+        return self._compiled
+
+
+class _CompiledSet:
+    """Search structures derived from a signature set's patterns."""
+
+    def __init__(self, patterns):
+        self.trie = {}
+        literals = {}
+        runs = {}
+        for index, pattern in enumerate(patterns):
+            if _is_run(pattern):
+                runs.setdefault(pattern[0], []).append((len(pattern), index))
+                continue
+            literals.setdefault(pattern, []).append(index)
+            node = self.trie
+            for byte in pattern:
+                node = node.setdefault(byte, {})
+            node.setdefault(None, []).append(index)
+
+        self.max_literal = max(map(len, literals), default=0)
+        self.mode = None
+        if not literals:
+            pass
+        elif len(literals) <= DIRECT_LIMIT:
+            # Few literals: each gets the regex engine's fast literal search,
+            # except those extending a shorter one — checked where it matches
+            self.mode = "direct"
+            self.direct = [
+                (re.compile(re.escape(pattern)), len(pattern), indices, [
+                    (longer, more) for longer, more in literals.items()
+                    if len(longer) > len(pattern) and longer.startswith(pattern)
+                ])
+                for pattern, indices in literals.items()
+                if not any(len(p) < len(pattern) and pattern.startswith(p) for p in literals)
+            ]
+        elif np is not None:
+            self.mode = "qgram"
+            self.q = min(4, min(map(len, literals)))
+            grams = sorted({_gram(pattern, self.q) for pattern in literals})
+            self.grams = np.array(grams, dtype=np.uint32)
+            self.table = np.zeros(1 << QGRAM_BITS, dtype=bool)
+            self.table[_gram_slot(self.grams)] = True
+        elif len({pattern[0] for pattern in literals}) <= TRIE_LIMIT:
+            self.mode = "trie"
+            self.regex = re.compile(_trie_regex(self.trie))
+        else:
+            # Every occurrence spans ``shortest`` bytes, so q-grams sampled
+            # at most ``stride`` bytes apart land inside each of them
+            self.mode = "sampled"
+            shortest = min(map(len, literals))
+            self.q = 4 if shortest >= 4 else 2 if shortest >= 2 else 1
+            stride = shortest - self.q + 1
+            step = max(n for n in (1, 2, 4) if n <= min(self.q, stride))
+            self.offsets = range(0, self.q, step)
+            self.sampled = {}
+            for pattern in literals:
+                for at in range(stride):
+                    gram = int.from_bytes(pattern[at:at + self.q], sys.byteorder)
+                    self.sampled.setdefault(gram, set()).add(at)
+
+        self.runs = []
+        for byte, lengths in sorted(runs.items()):
+            lengths.sort()
+            token = bytes([byte])
+            self.runs.append((
+                byte,
+                lengths,
+                re.compile(re.escape(token) + b"+"),
+                re.compile(re.escape(token * lengths[0][0])),
+            ))
+
+    def literal_matches(self, buf, limit):
+        """Yield ``(pos, length, index)`` for literals starting before ``limit``."""
+        if self.mode == "direct":
+            for regex, length, indices, longer in self.direct:
+                pos = 0
+                while True:
+                    m = regex.search(buf, pos)
+                    if m is None or m.start() >= limit:
+                        break
+                    pos = m.start()
+                    for index in indices:
+                        yield pos, length, index
+                    for pattern, more in longer:
+                        if buf[pos:pos + len(pattern)] == pattern:
+                            for index in more:
+                                yield pos, len(pattern), index
+                    pos += 1
+        elif self.mode == "qgram":
+            for start in self._qgram_candidates(buf, limit):
+                yield from self._walk(buf, start)
+        elif self.mode == "sampled":
+            for start in self._sampled_candidates(buf, limit):
+                yield from self._walk(buf, start)
+        elif self.mode == "trie":
+            pos = 0
+            while True:
+                m = self.regex.search(buf, pos)
+                if m is None or m.start() >= limit:
+                    break
+                yield from self._walk(buf, m.start())
+                pos = m.start() + 1
+
+    def _qgram_candidates(self, buf, limit):
+        """Positions whose first ``q`` bytes begin some literal."""
+        q = self.q
+        data = np.frombuffer(buf, dtype=np.uint8)
+        n = min(limit, len(data) - q + 1)
+        if n <= 0:
+            return []
+        grams = data[:n].astype(np.uint32)
+        for k in range(1, q):
+            grams |= data[k:k + n].astype(np.uint32) << np.uint32(8 * k)
+        candidates = np.flatnonzero(self.table[_gram_slot(grams)])
+        if not len(candidates):
+            return []
+        # Exact check against the sorted gram list drops hash collisions
+        grams = grams[candidates]
+        slots = np.searchsorted(self.grams, grams).clip(max=len(self.grams) - 1)
+        return candidates[self.grams[slots] == grams].tolist()
+
+    def _sampled_candidates(self, buf, limit):
+        """Positions where a sampled q-gram could begin some literal.
+
+        The buffer is read as arrays of q-byte integers, one per offset,
+        and intersected with the sampled grams in C.  A few grams that
+        occur are located with ``find``; if many do, the array is walked.
+        """
+        data = bytes(buf)
+        q, sampled = self.q, self.sampled
+        starts = set()
+        for k in self.offsets:
+            grams = array(SAMPLE_TYPECODES[q])
+            grams.frombytes(data[k:k + (len(data) - k) // q * q])
+            present = sampled.keys() & grams
+            if len(present) <= FIND_LIMIT:
+                hits = []
+                for gram in present:
+                    token = gram.to_bytes(q, sys.byteorder)
+                    pos = data.find(token)
+                    while pos != -1:
+                        hits.append((pos, gram))
+                        pos = data.find(token, pos + 1)
+            else:
+                hits = [(k + i * q, gram) for i, gram in enumerate(grams) if gram in present]
+            for pos, gram in hits:
+                starts.update(pos - at for at in sampled[gram] if 0 <= pos - at < limit)
+        return sorted(starts)
+
+    def _walk(self, buf, start):
+        """Report every literal matching at ``start`` (overlapping prefixes too)."""
+        end = len(buf)
+        node = self.trie
+        i = start
+        while node is not None:
+            for index in node.get(None, ()):
+                yield start, i - start, index
+            if i >= end:
+                break
+            node = node.get(buf[i])
+            i += 1
+
+
+class SignatureStream:
+    """Stateful scanner fed consecutive buffers of one address space.
+
+    ``feed`` returns the matches completed so far as
+    ``(offset, length, index)`` tuples; ``close`` flushes runs still open
+    at the end.  Feeding a buffer that does not continue the previous one
+    closes everything first, so gaps never produce phantom matches.
+
+    A scan of one piece of a larger space can :meth:`hold` the run that
+    continues across its start and :meth:`take_runs` those open at its
+    end; both come back as raw ``(byte, start, length)`` fragments for
+    the caller to join with its neighbours' and match with
+    :meth:`SignatureSet.run_match`.
+    """
+
+    def __init__(self, sigset):
+        self.sigset = sigset
+        self._compiled = sigset._compile()
+        self._carry = b""
+        self._next = None
+        self._pending = {}
+        self._hold = None
+        self.held = []
+
+    @property
+    def lookahead(self):
+        """Bytes past a range's end needed to complete literal matches."""
+        return max(self._compiled.max_literal - 1, 0)
+
+    def pending_before(self, offset):
+        """True if a run that started before ``offset`` is still open."""
+        return any(start < offset for start, _ in self._pending.values())
+
+    def hold(self, byte, offset):
+        """Keep a run of ``byte`` starting at ``offset`` in ``held`` instead of matching it."""
+        self._hold = (byte, offset)
+
+    def take_runs(self):
+        """Remove the runs still open and return them as raw fragments."""
+        runs = [(byte, start, length) for byte, (start, length) in sorted(self._pending.items())]
+        self._pending.clear()
+        return runs
+
+    def feed(self, buf, offset):
+        matches = []
+        if self._next is not None and offset != self._next:
+            matches.extend(self.close())
+        self._next = offset + len(buf)
+        if not len(buf):
+            return matches
+        if self._compiled.mode is not None:
+            self._scan_literals(buf, offset, matches)
+        for spec in self._compiled.runs:
+            self._scan_runs(spec, buf, offset, matches)
+        return matches
+
+    def feed_fill(self, byte, length, offset):
+        """:meth:`feed` ``length`` copies of ``byte`` without building them.
+
+        Only enough of the fill to settle literal matches and the carry
+        is scanned; an open run of ``byte`` is extended arithmetically,
+        so a sparse file's hole costs the same whatever its size.
+        """
+        token = bytes([byte])
+        if token in self.sigset.patterns:
+            # A one-byte literal matches all through the fill — scan it for real
+            matches = []
+            for pos in range(0, length, FILL_CHUNK):
+                matches.extend(self.feed(token * min(FILL_CHUNK, length - pos), offset + pos))
+            return matches
+        head = min(length, max(self._compiled.max_literal, 1))
+        matches = self.feed(token * head, offset)
+        if length > head:
+            pending = self._pending.get(byte)
+            if pending:
+                pending[1] += length - head
+            self._next += length - head
+        return matches
+
+    def close(self):
+        """Flush open runs and forget the boundary carry."""
+        matches = []
+        for byte, lengths, _, _ in self._compiled.runs:
+            pending = self._pending.pop(byte, None)
+            if pending:
+                self._emit_run(byte, lengths, pending[0], pending[1], matches)
+        self._carry = b""
+        self._next = None
+        return matches
+
+    def _scan_literals(self, buf, offset, matches):
+        compiled = self._compiled
+        keep = compiled.max_literal - 1
+        carry = self._carry
+
+        # Signatures that start in the previous buffer and end in this one
+        if carry:
+            joined = carry + bytes(buf[:keep])
+            base = offset - len(carry)
+            for pos, length, index in compiled.literal_matches(joined, len(carry)):
+                if pos + length > len(carry):
+                    matches.append((base + pos, length, index))
+
+        for pos, length, index in compiled.literal_matches(buf, len(buf)):
+            matches.append((offset + pos, length, index))
+
+        if keep:
+            if len(buf) >= keep:
+                self._carry = bytes(buf[len(buf) - keep:])
+            else:
+                self._carry = (carry + bytes(buf))[-keep:]
+
+    def _scan_runs(self, spec, buf, offset, matches):
+        byte, lengths, lead_regex, seed_regex = spec
+        size = len(buf)
+        pending = self._pending.pop(byte, None)
+
+        lead = lead_regex.match(buf)
+        lead = lead.end() if lead else 0
+        if lead == size:
+            # The whole buffer continues (or starts) a run
+            self._pending[byte] = [pending[0], pending[1] + size] if pending else [offset, size]
+            return
+        if pending:
+            self._emit_run(byte, lengths, pending[0], pending[1] + lead, matches)
+        elif lead:
+            self._emit_run(byte, lengths, offset, lead, matches)
+
+        # Find the shortest interesting run as a literal, then extend it
+        pos = lead
+        while True:
+            m = seed_regex.search(buf, pos)
+            if m is None:
+                break
+            start = m.start()
+            end = lead_regex.match(buf, start).end()
+            if end == size:
+                self._pending[byte] = [offset + start, size - start]
+                return
+            self._emit_run(byte, lengths, offset + start, end - start, matches)
+            pos = end
+
+        # A run too short to match yet may continue into the next buffer
+        tail = 0
+        pos = size - 1
+        while tail < lengths[0][0] - 1 and pos >= lead and buf[pos] == byte:
+            tail += 1
+            pos -= 1
+        if tail:
+            self._pending[byte] = [offset + size - tail, tail]
+
+    def _emit_run(self, byte, lengths, start, length, matches):
+        if self._hold == (byte, start):
+            self.held.append((byte, start, length))
+            return
+        index = _run_index(lengths, length)
+        if index is not None:
+            matches.append((start, length, index))
+
+
+def _run_index(lengths, length):
+    """Index of the longest run signature a run of ``length`` bytes satisfies."""
+    best = None
+    for min_length, index in lengths:
+        if min_length > length:
+            break
+        best = index
+    return best
+
+
+def _is_run(pattern):
+    return len(pattern) >= RUN_MIN_LENGTH and pattern.count(pattern[0]) == len(pattern)
+
+
+def _gram(pattern, q):
+    """Little-endian integer of a pattern's first ``q`` bytes."""
+    return int.from_bytes(pattern[:q], "little")
+
+
+def _gram_slot(grams):
+    """Multiplicative hash of q-gram integers into the prefilter table."""
+    return (grams * np.uint32(2654435761)) >> np.uint32(32 - QGRAM_BITS)
+
+
+def _trie_regex(node):
+    """Render a byte trie as a regex; terminal nodes match immediately."""
+    if None in node:
+        return b""
+    alternatives = []
+    for byte in sorted(k for k in node if k is not None):
+        child = node[byte]
+        literal = bytes([byte])
+        # Collapse single-child chains so recursion only happens at forks
+        while None not in child and len(child) == 1:
+            (next_byte, child), = child.items()
+            literal += bytes([next_byte])
+        alternatives.append(re.escape(literal) + _trie_regex(child))
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return b"(?:" + b"|".join(alternatives) + b")"
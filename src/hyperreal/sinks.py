@@ -0,0 +1,60 @@
+"""Hyperreal Sinks — incremental output for streamed findings.
+
+The ``iter_*`` scanners yield findings one at a time; a sink writes
+them out as they arrive so a long scan never holds its whole report in
+memory and results are visible before the scan finishes.
+"""
+
+import json
+
+
+class JsonlSink:
+    """Write findings as JSON Lines — one object per line.
+
+    ``destination`` is a path or an open text file.  The sink flushes
+    every ``flush_every`` findings so readers tailing the file see
+    progress.  Sinks are callable, so one can be passed wherever a
+    finding callback is expected.
+    """
+
+    def __init__(self, destination, flush_every=100):
+        if hasattr(destination, "write"):
+            self._file = destination
+            self._owned = False
+        else:
+            self._file = open(destination, "w")
+            self._owned = True
+        self.flush_every = flush_every
+        self.count = 0
+
+    def write(self, finding):
+        self._file.write(json.dumps(finding, default=str) + "\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    __call__ = write
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def write_jsonl(findings, destination, flush_every=100):
+    """Drain an iterable of findings into a JSONL file; returns the count."""
+    with JsonlSink(destination, flush_every) as sink:
+        for finding in findings:
+            sink.write(finding)
+    return sink.count
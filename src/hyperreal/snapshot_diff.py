@@ -0,0 +1,313 @@
+"""Hyperreal Snapshot Diff — what changed between two captures.
+
+Repeated captures of one host are mostly identical.  A
+:class:`BlockIndex` holds one 64-bit hash per block of a dump and is
+cached (never beside the evidence unless asked), so comparing a new snapshot with an indexed baseline
+is an array comparison.  Only the changed, zeroed and newly-populated
+ranges are handed on to the expensive analyses.
+"""
+
+import os
+import json
+import hashlib
+from array import array
+
+from .dump_source import DumpSource, open_dump
+from .entropy_map import write_npy, read_npy
+from .scan_cache import default_cache_path
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional — indexes are compared in Python
+    np = None
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional — blake2b is the fallback
+    xxhash = None
+
+INDEX_SUFFIX = ".blockidx.npy"
+
+
+def default_index_dir():
+    """``$XDG_CACHE_HOME/hyperreal/blockidx`` (``~/.cache`` by default)."""
+    return os.path.join(os.path.dirname(default_cache_path()), "blockidx")
+
+
+def default_algorithm():
+    """``"xxh3_64"`` when xxhash is installed, else ``"blake2b"`` (8-byte digest)."""
+    return "xxh3_64" if xxhash is not None else "blake2b"
+
+
+class BlockIndex:
+    """One 64-bit hash per block of a dump.
+
+    ``hashes`` is an ``array('Q')`` covering the source's ``spans`` in
+    order, each span split into blocks from its own start, so the last
+    block of a span may be short.  A plain image is the one span
+    ``(0, size)``; containers (LiME, ELF core) index only the ranges
+    they captured, at their real addresses.  ``meta`` records the block
+    size, algorithm and — for indexes of a file — its size and mtime,
+    which :meth:`for_dump` checks before trusting a cached index.
+    """
+
+    def __init__(self, hashes, block_size, algorithm, size, meta=None, spans=None):
+        self.hashes = hashes
+        self.block_size = block_size
+        self.algorithm = algorithm
+        self.size = size
+        self.meta = meta or {}
+        if spans is None:
+            spans = [(0, size)] if size else []
+        self.spans = [tuple(span) for span in spans]
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @property
+    def dense(self):
+        """True when the index covers the whole image from offset 0."""
+        return not self.spans or self.spans == [(0, self.size)]
+
+    @property
+    def data_size(self):
+        """Bytes covered by the index."""
+        return sum(end - start for start, end in self.spans)
+
+    def expected_blocks(self):
+        """Number of hashes a complete (not cancelled) index has."""
+        return sum(-(-(end - start) // self.block_size) for start, end in self.spans)
+
+    @classmethod
+    def build(cls, source, block_size=4096, algorithm=None, progress=None):
+        """Hash every block of a :class:`DumpSource` (or dump path)."""
+        if not isinstance(source, DumpSource):
+            with open_dump(source) as opened:
+                return cls.build(opened, block_size, algorithm, progress)
+
+        algorithm = algorithm or default_algorithm()
+        digest = block_hasher(algorithm)
+        hashes = array("Q")
+        spans = source.spans()
+        total = sum(end - start for start, end in spans)
+        done = 0
+        for start, end in spans:
+            for base, chunk in source.chunks(start, end, block_size * 256):
+                hashes.extend(
+                    digest(chunk[pos:pos + block_size])
+                    for pos in range(0, len(chunk), block_size)
+                )
+                done += len(chunk)
+                if progress is not None and progress(done, total) is False:
+                    return cls(hashes, block_size, algorithm, source.size, spans=spans)
+        return cls(hashes, block_size, algorithm, source.size, spans=spans)
+
+    @classmethod
+    def for_dump(cls, path, index_dir=None, block_size=4096, algorithm=None, progress=None):
+        """Index of the dump at ``path``, reusing a cached one if still valid.
+
+        The index is cached as ``<dump>.blockidx.npy`` (plus ``.json``) in
+        ``index_dir``.  By default it goes to :func:`default_index_dir`,
+        named after the dump's absolute path, so the directory holding
+        the evidence is never written to.  A cache that cannot be written
+        is silently skipped.  The returned index has ``cached`` set when
+        it came from disk.
+        """
+        algorithm = algorithm or default_algorithm()
+        st = os.stat(path)
+        stamp = {
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "block_size": block_size, "algorithm": algorithm,
+        }
+        name = os.path.basename(path)
+        if index_dir is None:
+            index_dir = default_index_dir()
+            # Dumps of the same name from different cases mustn't share an entry
+            where = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+            name = f"{name}-{where}"
+        index_path = os.path.join(index_dir, name + INDEX_SUFFIX)
+        try:
+            index = cls.load(index_path)
+            if {key: index.meta.get(key) for key in stamp} == stamp:
+                index.cached = True
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+
+        index = cls.build(path, block_size, algorithm, progress)
+        index.meta = stamp
+        index.cached = False
+        if len(index.hashes) == index.expected_blocks():  # Not cancelled
+            try:
+                os.makedirs(index_dir, exist_ok=True)
+                index.save(index_path)
+            except OSError:
+                pass
+        return index
+
+    def save(self, path):
+        write_npy(path, self.hashes)
+        with open(path + ".json", "w") as f:
+            # ``size`` stays the file's, as stamped; the image's may differ
+            json.dump(dict(self.meta, block_size=self.block_size, algorithm=self.algorithm,
+                           image_size=self.size, spans=self.spans), f)
+
+    @classmethod
+    def load(cls, path):
+        hashes = read_npy(path, "Q")
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        return cls(hashes, meta["block_size"], meta["algorithm"],
+                   meta.get("image_size", meta.get("size")), meta, meta.get("spans"))
+
+    def zero_hash(self, length=None):
+        """Hash of an all-zero block (of ``length`` bytes; default a full block)."""
+        return block_hasher(self.algorithm)(bytes(length or self.block_size))
+
+
+def diff_indexes(old, new):
+    """Compare two indexes; returns merged ``(start, end, change)`` byte ranges.
+
+    ``change`` is ``"changed"`` (different non-zero content), ``"zeroed"``
+    (wiped since the baseline), ``"populated"`` (zero or absent before,
+    content now) or ``"truncated"`` (present only in the baseline).
+    """
+    if (old.block_size, old.algorithm) != (new.block_size, new.algorithm):
+        raise ValueError("Indexes use different block sizes or hash algorithms")
+    if not (old.dense and new.dense):
+        return _diff_spans(old, new)
+    block = new.block_size
+    common = min(len(old), len(new))
+
+    if np is not None and common:
+        a = np.frombuffer(old.hashes, dtype=np.uint64, count=common)
+        b = np.frombuffer(new.hashes, dtype=np.uint64, count=common)
+        differing = np.flatnonzero(a != b).tolist()
+    else:
+        differing = [i for i in range(common) if old.hashes[i] != new.hashes[i]]
+
+    old_zero, new_zero = _zero_test(old), _zero_test(new)
+    ranges = []
+    for i in differing:
+        if new_zero(i):
+            change = "zeroed"
+        elif old_zero(i):
+            change = "populated"
+        else:
+            change = "changed"
+        start = i * block
+        end = min(start + block, new.size)
+        if ranges and ranges[-1][1] == start and ranges[-1][2] == change:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end, change])
+
+    if len(new) > len(old):
+        ranges.append([common * block, new.size, "populated"])
+    elif len(old) > len(new):
+        ranges.append([new.size, old.size, "truncated"])
+    return [tuple(r) for r in ranges]
+
+
+def _diff_spans(old, new):
+    """:func:`diff_indexes` for indexes of captured ranges, compared by address.
+
+    Ranges only the snapshot captured are ``populated``, ranges only the
+    baseline captured are ``truncated``.  Where both captured a range
+    on the same block grid the blocks are compared; on different grids
+    the whole range counts as ``changed``.
+    """
+    block = new.block_size
+    zero_hashes = {}
+
+    def is_zero(index, at, length):
+        if length not in zero_hashes:
+            zero_hashes[length] = index.zero_hash(length)
+        return index.hashes[at] == zero_hashes[length]
+
+    ranges = []
+
+    def add(start, end, change):
+        if ranges and ranges[-1][1] == start and ranges[-1][2] == change:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end, change])
+
+    old_spans, new_spans = _span_offsets(old), _span_offsets(new)
+    points = sorted({p for start, end, _ in old_spans + new_spans for p in (start, end)})
+    i = j = 0
+    for lo, hi in zip(points, points[1:]):
+        while i < len(old_spans) and old_spans[i][1] <= lo:
+            i += 1
+        while j < len(new_spans) and new_spans[j][1] <= lo:
+            j += 1
+        in_old = i < len(old_spans) and old_spans[i][0] <= lo
+        in_new = j < len(new_spans) and new_spans[j][0] <= lo
+        if not in_old and not in_new:
+            continue
+        if not in_old:
+            add(lo, hi, "populated")
+            continue
+        if not in_new:
+            add(lo, hi, "truncated")
+            continue
+        (os_, oe, oo), (ns, ne, no) = old_spans[i], new_spans[j]
+        if (os_ - ns) % block:
+            add(lo, hi, "changed")  # Block grids don't line up — nothing to compare
+            continue
+        first, last = (lo - ns) // block, -(-(hi - ns) // block)
+        shift = (ns - os_) // block  # New block k is old block k + shift
+        for k in _differing(old.hashes, oo + first + shift, new.hashes, no + first, last - first):
+            k += first
+            at = ns + k * block
+            if is_zero(new, no + k, min(block, ne - at)):
+                change = "zeroed"
+            elif is_zero(old, oo + k + shift, min(block, oe - at)):
+                change = "populated"
+            else:
+                change = "changed"
+            add(max(at, lo), min(at + block, hi), change)
+    return [tuple(r) for r in ranges]
+
+
+def _span_offsets(index):
+    """``(start, end, first_hash)`` for each span of ``index``."""
+    spans, offset = [], 0
+    for start, end in index.spans:
+        spans.append((start, end, offset))
+        offset += -(-(end - start) // index.block_size)
+    return spans
+
+
+def _differing(a, i, b, j, n):
+    """Positions ``k < n`` where ``a[i + k] != b[j + k]``."""
+    if np is not None and n:
+        x = np.frombuffer(a, dtype=np.uint64, count=n, offset=8 * i)
+        y = np.frombuffer(b, dtype=np.uint64, count=n, offset=8 * j)
+        return np.flatnonzero(x != y).tolist()
+    return [k for k in range(n) if a[i + k] != b[j + k]]
+
+
+def _zero_test(index):
+    """``f(i)`` telling whether block ``i`` of ``index`` is all zeros."""
+    full = index.zero_hash()
+    last = len(index) - 1
+    # A short final block hashes differently from a full zero block
+    tail = index.zero_hash(index.size % index.block_size) if index.size % index.block_size else full
+    hashes = index.hashes
+    return lambda i: hashes[i] == (tail if i == last else full)
+
+
+def block_hasher(algorithm):
+    """Return ``f(block) -> int`` producing a 64-bit block hash."""
+    if algorithm.startswith("xxh"):
+        if xxhash is None:
+            raise ValueError(f"{algorithm} requires the xxhash package")
+        fn = getattr(xxhash, f"{algorithm}_intdigest", None)
+        if fn is None:
+            raise ValueError(f"Unknown xxhash algorithm: {algorithm}")
+        return fn
+    if algorithm == "blake2b":
+        blake2b = hashlib.blake2b
+        return lambda block: int.from_bytes(blake2b(block, digest_size=8).digest(), "little")
+    raise ValueError(f"Unknown block hash algorithm: {algorithm}")
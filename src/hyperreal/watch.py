@@ -0,0 +1,376 @@
+"""Hyperreal Watch — keep filesystem findings current as a tree changes.
+
+A :class:`FilesystemWatch` takes one baseline scan, then follows the
+tree — through inotify where the kernel offers it, otherwise by
+polling directory mtimes — and hands only new and changed files to the
+detectors.  Detector state outlives each change, so a file duplicating
+one from the baseline is reported the moment it appears.
+"""
+
+import os
+import stat
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT = struct.Struct("iIII")  # struct inotify_event, before its name
+
+
+class _Inotify:
+    """Just enough of the Linux inotify API, through ctypes."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch  # AttributeError where there is no inotify
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add(self, path, mask):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read(self, timeout):
+        """``(wd, mask, name)`` events arriving within ``timeout`` seconds."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return events
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                events.append((wd, mask, os.fsdecode(data[pos:pos + length].rstrip(b"\0"))))
+                pos += length
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Entry:
+    """Stand-in for the ``os.DirEntry`` of a path the watch has ``lstat``-ed."""
+
+    __slots__ = ("path", "name", "_lstat", "_stat")
+
+    def __init__(self, path, st):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._lstat = st
+        self._stat = None
+
+    def stat(self, follow_symlinks=True):
+        if not follow_symlinks or not stat.S_ISLNK(self._lstat.st_mode):
+            return self._lstat
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def is_symlink(self):
+        return stat.S_ISLNK(self._lstat.st_mode)
+
+    def is_dir(self, follow_symlinks=True):
+        try:
+            return stat.S_ISDIR(self.stat(follow_symlinks).st_mode)
+        except OSError:
+            return False
+
+
+class FilesystemWatch:
+    """Report new findings under ``root_path`` as the tree changes.
+
+    ``scanner`` is the :class:`FilesystemHyperreal` whose detectors run
+    (``detectors`` names them; default all) and ``callback(finding)``
+    receives each finding, tagged with its ``detector`` and an ``event``
+    of ``"created"`` or ``"modified"`` — pass a :class:`JsonlSink` to
+    stream them as JSONL.  A finding is reported once per path: a
+    rewritten dot-file is not hidden anew, but a copy joining another
+    duplicate group is.  Baseline findings are returned by :meth:`start`
+    and, with ``emit_baseline``, also sent as ``"baseline"`` events.
+
+    ``backend`` is ``"inotify"``, ``"poll"`` or ``"auto"`` (inotify when
+    available, and polling from then on if the kernel runs out of
+    watches).  Polling stats each directory every ``interval`` seconds
+    and rereads only those whose mtime moved: files created, removed or
+    renamed are seen, files changed in place only under inotify.
+    """
+
+    WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+                  | IN_DELETE | IN_ONLYDIR | IN_DONT_FOLLOW)
+    SETTLE = 0.05  # Seconds of quiet that end a burst of inotify events
+    MAX_BURST = 65536  # Events gathered before a burst is processed regardless
+
+    def __init__(self, scanner, root_path, callback, max_depth=3, detectors=None,
+                 backend="auto", interval=2.0, emit_baseline=False):
+        if backend not in ("auto", "inotify", "poll"):
+            raise ValueError(f"Unknown watch backend: {backend}")
+        self.scanner = scanner
+        self.root_path = root_path
+        self.callback = callback
+        self.max_depth = max_depth
+        self.interval = interval
+        self.emit_baseline = emit_baseline
+        self.detectors = scanner._instantiate(detectors)
+        self.baseline = None
+        self._files = {}  # path -> (st_ino, st_size, st_mtime_ns, st_ctime_ns)
+        self._dirs = {}  # path -> [depth, st_mtime_ns, entry names]
+        self._wds = {}  # inotify watch descriptor -> directory
+        self._reported = {}  # path -> {(detector, type, hash)} already sent
+        self._inotify = None
+        if backend != "poll":
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                if backend == "inotify":
+                    raise
+        self.stats = {
+            "backend": "inotify" if self._inotify else "poll",
+            "changes": 0, "findings": 0,
+        }
+
+    def start(self):
+        """Take the baseline scan; returns its reports, like :meth:`FilesystemHyperreal.scan`."""
+        findings = {name: [] for name in self.detectors}
+        self._add_tree(self.root_path, "baseline", findings)
+        self._flush()
+        self.baseline = {
+            name: detector.report(self.root_path, findings[name])
+            for name, detector in self.detectors.items()
+        }
+        return self.baseline
+
+    def poll(self, timeout=None):
+        """Handle the changes arriving within ``timeout`` seconds (default ``interval``).
+
+        Polling checks the directories once and returns at once.
+        Returns the number of findings sent.
+        """
+        if self.baseline is None:
+            self.start()
+        sent = self.stats["findings"]
+        if self._inotify is not None:
+            events = self._inotify.read(self.interval if timeout is None else timeout)
+            while events and len(events) < self.MAX_BURST:
+                more = self._inotify.read(self.SETTLE)  # Gather the burst, look at each path once
+                if not more:
+                    break
+                events.extend(more)
+            if events:
+                self._refresh()
+                self._handle_events(events)
+        else:
+            self._refresh()
+            self._rescan_directories()
+        self._flush()
+        return self.stats["findings"] - sent
+
+    def run(self, duration=None, stop=None):
+        """Watch until ``duration`` seconds pass or ``stop`` (a ``threading.Event``) is set."""
+        if self.baseline is None:
+            self.start()
+        deadline = None if duration is None else time.monotonic() + duration
+        while stop is None or not stop.is_set():
+            wait = self.interval
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    break
+            if self._inotify is not None:
+                self.poll(wait)
+                continue
+            self.poll()
+            if stop is not None:
+                stop.wait(wait)
+            else:
+                time.sleep(wait)
+        return self.stats
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _handle_events(self, events):
+        changed = {}  # Ordered set of paths to look at
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped — compare every directory with what we know
+                self._rescan_directories(force=True)
+                return
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+            dirpath = self._wds.get(wd)
+            if dirpath is not None and name:
+                changed[os.path.join(dirpath, name)] = None
+        for path in changed:
+            self._check(path)
+
+    def _rescan_directories(self, force=False):
+        for dirpath, listed in list(self._dirs.items()):
+            if dirpath not in self._dirs:
+                continue  # Removed along with a parent during this pass
+            try:
+                mtime = os.stat(dirpath).st_mtime_ns
+                names = set(os.listdir(dirpath)) if force or mtime != listed[1] else None
+            except OSError:
+                continue  # Its parent's change removes it
+            if names is None:
+                continue
+            listed[1] = mtime
+            for name in sorted(names | listed[2]):
+                self._check(os.path.join(dirpath, name))
+
+    def _check(self, path):
+        """Bring one path of a watched directory up to date."""
+        listed = self._dirs.get(os.path.dirname(path))
+        if listed is None:
+            return
+        try:
+            st = os.lstat(path)
+        except OSError:
+            listed[2].discard(os.path.basename(path))
+            self._remove(path)
+            return
+        listed[2].add(os.path.basename(path))
+        entry = _Entry(path, st)
+        if entry.is_dir():
+            if path in self._dirs or path in self._reported:
+                return
+            self.stats["changes"] += 1
+            self._reported.setdefault(path, set())  # Seen, even without findings
+            self._send(entry, "directory", "created")
+            if listed[0] + 1 < self.max_depth and not entry.is_symlink():
+                self._add_tree(path, "created")
+            return
+        signature = _signature(st)
+        old = self._files.get(path)
+        if old == signature:
+            return
+        self.stats["changes"] += 1
+        if old is not None:
+            for detector in self.detectors.values():
+                detector.forget(path)
+        self._files[path] = signature
+        self._send(entry, "file", "created" if old is None else "modified")
+
+    def _remove(self, path):
+        if path in self._dirs:
+            prefix = path + os.sep
+            gone = [p for p in self._files if p.startswith(prefix)]
+            for p in [p for p in self._dirs if p == path or p.startswith(prefix)]:
+                del self._dirs[p]
+            for p in [p for p in self._reported if p.startswith(prefix)]:
+                del self._reported[p]
+        else:
+            gone = []
+        if path in self._files:
+            gone.append(path)
+        if self._reported.pop(path, None) is not None or gone:
+            self.stats["changes"] += 1
+        for p in gone:
+            del self._files[p]
+            self._reported.pop(p, None)
+            for detector in self.detectors.values():
+                detector.forget(p)
+
+    def _add_tree(self, path, event, findings=None):
+        """Walk a new directory tree, watching its directories and visiting its entries."""
+        depth = 0 if path == self.root_path else self._dirs[os.path.dirname(path)][0] + 1
+        for dirpath, files, dirs in self.scanner._walk(path, self.max_depth - depth):
+            rel = os.path.relpath(dirpath, path)
+            self._watch(dirpath, depth + (0 if rel == "." else rel.count(os.sep) + 1),
+                        {entry.name for entry in files + dirs})
+            for entry in files:
+                try:
+                    self._files[entry.path] = _signature(entry.stat(follow_symlinks=False))
+                except OSError:
+                    continue
+                self._send(entry, "file", event, findings)
+            for entry in dirs:
+                self._reported.setdefault(entry.path, set())
+                self._send(entry, "directory", event, findings)
+            if event != "baseline" and self._inotify is not None:
+                # Entries made between the listing and the watch raised no event
+                try:
+                    late = set(os.listdir(dirpath)) - self._dirs[dirpath][2]
+                except (OSError, KeyError):
+                    continue
+                for name in sorted(late):
+                    self._check(os.path.join(dirpath, name))
+
+    def _watch(self, dirpath, depth, names):
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            return
+        self._dirs[dirpath] = [depth, mtime, names]
+        if self._inotify is None:
+            return
+        try:
+            self._wds[self._inotify.add(dirpath, self.WATCH_MASK)] = dirpath
+        except OSError as e:
+            if e.errno in (errno.ENOENT, errno.ENOTDIR):
+                return  # Gone already; its parent's event removes it
+            # Out of watches — poll from here on
+            self.close()
+            self._wds.clear()
+            self.stats["backend"] = "poll"
+
+    def _send(self, entry, kind, event, findings=None):
+        """Run the detectors over one entry and pass on what they haven't reported."""
+        reported = self._reported.setdefault(entry.path, set())
+        for name, detector in self.detectors.items():
+            visit = detector.visit_file if kind == "file" else detector.visit_directory
+            for finding in visit(entry):
+                key = (name, finding.get("type"), finding.get("hash"))
+                if key in reported:
+                    continue
+                reported.add(key)
+                if findings is not None:
+                    findings[name].append(finding)
+                if event != "baseline" or self.emit_baseline:
+                    self.stats["findings"] += 1
+                    self.callback(dict(finding, detector=name, event=event))
+
+    def _refresh(self):
+        for detector in self.detectors.values():
+            detector.refresh()
+
+    def _flush(self):
+        if self.scanner.cache is not None:
+            self.scanner.cache.flush()
+
+
+def _signature(st):
+    return (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
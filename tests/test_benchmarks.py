@@ -0,0 +1,40 @@
+import unittest,sys,os,io,json,tempfile,contextlib
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","benchmarks"))
+import run
+from generators import make_dump,make_tree
+from hyperreal.filesystem_forensics import FilesystemHyperreal
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+    def tearDown(self):
+        self.tmp.cleanup()
+    def test_generators_plant_what_they_report(self):
+        root=os.path.join(self.tmp.name,"tree")
+        made=make_tree(root,depth=2,fanout=3,files_per_dir=40,duplicate_fraction=0.2,hidden_fraction=0.1,anomaly_fraction=0.1,seed=4)
+        r=FilesystemHyperreal().scan(root)
+        self.assertEqual(made["files"],4*40)
+        self.assertEqual(r["temporal_anomalies"]["anomalies_found"],made["anomalies"])
+        self.assertEqual(r["hidden_spaces"]["hidden_count"],made["hidden"])
+        self.assertEqual(r["duplicate_simulacra"]["total_copies"],made["duplicates"])
+        dump=os.path.join(self.tmp.name,"d.raw")
+        made=make_dump(dump,1<<20,void_fraction=0.3,seed=4)
+        self.assertEqual(sum(v for k,v in made.items() if k.endswith("blocks")),256)
+        self.assertEqual(made,make_dump(dump,1<<20,void_fraction=0.3,seed=4))  # Same seed, same dump
+        r=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(dump)
+        self.assertGreaterEqual(len(r["hidden_structures"]),made["signatures"]//2)
+    def test_quick_run_and_compare(self):
+        out=os.path.join(self.tmp.name,"r.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(run.main(["--quick","--only","iter_memory","--only","fs.detect","--out",out]),0)
+        report=json.load(open(out))
+        self.assertEqual(sorted(report["results"]),["dump.iter_memory_dump","fs.detect_hidden_spaces"])
+        self.assertGreater(report["results"]["dump.iter_memory_dump"]["mb_per_s"],0)
+        self.assertGreater(report["results"]["fs.detect_hidden_spaces"]["files_per_s"],0)
+        report["results"]["fs.detect_hidden_spaces"]["files_per_s"]*=10
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(run.compare(report,json.load(open(out)),0.1),["fs.detect_hidden_spaces"])
+
+if __name__=="__main__": unittest.main()
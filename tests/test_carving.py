@@ -0,0 +1,62 @@
+import unittest,sys,os,random,struct,tempfile
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal.carving import ExecutableCarver
+from hyperreal.dump_source import open_dump
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer
+
+def elf64():
+    h=b"\x7fELF\x02\x01\x01"+bytes(9)+struct.pack("<HHIQQQIHHHHHH",2,62,1,0x401000,64,0x3000,0,64,56,1,64,3,2)
+    return h+struct.pack("<IIQQQQQQ",1,5,0,0x400000,0x400000,0x2000,0x2000,0x1000)
+
+def pe64_dll():
+    dos=b"MZ"+bytes(0x3A)+struct.pack("<I",0x80)+bytes(0x40)
+    coff=b"PE\x00\x00"+struct.pack("<HHIIIHH",0x8664,2,0,0,0,240,0x2022)
+    opt=bytearray(240); struct.pack_into("<H",opt,0,0x20B); struct.pack_into("<II",opt,56,0x5000,0x400)
+    sections=b"".join(bytes(16)+struct.pack("<II",size,ptr)+bytes(16) for size,ptr in ((0x1000,0x400),(0x200,0x1400)))
+    return dos+coff+bytes(opt)+sections
+
+def macho64():
+    seg=struct.pack("<II16sQQQQiiII",0x19,72,b"__TEXT",0x100000000,0x1800,0,0x1800,5,5,0,0)
+    return struct.pack("<IiIIIII",0xFEEDFACF,0x0100000C,0,2,1,len(seg),0)+bytes(4)+seg
+
+class TestCarving(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        rnd=random.Random(11)
+        data=bytearray(rnd.getrandbits(8) for _ in range(64*4096))
+        for at,blob in ((0x4000,elf64()),(0x10000,pe64_dll()),(0x20000,macho64()),
+                        (0x30000,b"MZ"+bytes(100)),(0x31000,b"\x7fELF\x09"+bytes(60)),(len(data)-0x1000,elf64())):
+            data[at:at+len(blob)]=blob
+        self.dump=os.path.join(self.tmp.name,"mem.raw")
+        with open(self.dump,"wb") as f: f.write(data)
+    def tearDown(self):
+        self.tmp.cleanup()
+    def test_carve_validates(self):
+        found=ExecutableCarver().carve(self.dump)
+        got=[(e["offset"],e["format"],e["arch"],e["bits"],e["kind"],e["size"],e["truncated"]) for e in found]
+        self.assertEqual(sorted(got),[
+            ("0x10000","PE","x86_64",64,"DLL",0x1600,False),
+            ("0x20000","Mach-O","aarch64",64,"executable",0x1800,False),
+            ("0x3f000","ELF","x86_64",64,"executable",0x1000,True),
+            ("0x4000","ELF","x86_64",64,"executable",0x30C0,False),
+        ])
+    def test_analyzer_matches_carver(self):
+        for kwargs in ({"backend":"python"},{"workers":2,"shard_size":0x10000+8}):
+            r=NegativeSpaceAnalyzer(**kwargs).analyze_memory_dump(self.dump)
+            self.assertEqual(r["executables"],sorted(ExecutableCarver().carve(self.dump),key=lambda e:int(e["offset"],16)))
+            self.assertEqual(r["summary"]["executables_count"],4)
+        found=list(NegativeSpaceAnalyzer(backend="python").iter_memory_dump(self.dump))
+        self.assertEqual(sum(f["finding"]=="executable" for f in found),4)
+        self.assertEqual(found[-1]["executables_count"],4)
+        self.assertEqual(NegativeSpaceAnalyzer(carve=False).analyze_memory_dump(self.dump)["executables"],[])
+    def test_extract(self):
+        out=os.path.join(self.tmp.name,"out")
+        found=NegativeSpaceAnalyzer().carve_executables(self.dump,extract_dir=out)
+        self.assertEqual(sorted(os.listdir(out)),["0000000000004000.elf","0000000000010000.dll",
+                                                  "0000000000020000.macho","000000000003f000.elf"])
+        with open_dump(self.dump) as src, open(os.path.join(out,"0000000000010000.dll"),"rb") as f:
+            self.assertEqual(f.read(),bytes(src.view(0x10000,0x1600)))
+        self.assertTrue(all(os.path.exists(e["extracted"]) for e in found))
+        self.assertIn("error",NegativeSpaceAnalyzer().carve_executables(self.dump+".missing"))
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,131 @@
+import unittest,sys,os,random,tempfile,gzip,struct,zlib
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal import dump_source
+from hyperreal.dump_source import open_dump,FrameDumpSource,StreamDumpSource,LimeDumpSource,ElfCoreDumpSource
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer
+
+def image():
+    rnd=random.Random(11)
+    data=bytearray(rnd.getrandbits(8) for _ in range(4096*200))
+    data[4096*20:4096*30]=bytes(4096*10)
+    data[4096*50+10:4096*50+110]=b"\x90"*100
+    data[4096*120-2:4096*120+6]=b"\x7fELF\x7fELF"
+    return bytes(data)+bytes(3000)
+
+def bgzf(data,member=65280):
+    out=bytearray()
+    for pos in range(0,len(data)+1,member):
+        piece=data[pos:pos+member]  # The last, empty member is the EOF marker
+        c=zlib.compressobj(6,zlib.DEFLATED,-15); body=c.compress(piece)+c.flush()
+        out+=b"\x1f\x8b\x08\x04"+bytes(6)+b"\x06\x00BC\x02\x00"+struct.pack("<H",len(body)+25)
+        out+=body+struct.pack("<II",zlib.crc32(piece),len(piece))
+    return bytes(out)
+
+def zstd_seekable(data,frame=100000):
+    import zstandard
+    out=bytearray(); table=bytearray(); cctx=zstandard.ZstdCompressor()
+    for pos in range(0,len(data),frame):
+        body=cctx.compress(data[pos:pos+frame]); out+=body
+        table+=struct.pack("<II",len(body),len(data[pos:pos+frame]))
+    n=len(data[::frame]) if data else 0
+    return bytes(out)+struct.pack("<II",0x184D2A5E,len(table)+9)+table+struct.pack("<IBI",n,0,0x8F92EAB1)
+
+def lime(ranges):
+    return b"".join(struct.pack("<IIQQ8x",0x4C694D45,1,start,start+len(piece)-1)+piece for start,piece in ranges)
+
+def strip(r):
+    r=dict(r); r.pop("scan_time"); r.pop("file"); return r
+
+class TestDumpFormats(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        self.data=image()
+        self.raw=self.write("mem.raw",self.data)
+        self.expected=strip(NegativeSpaceAnalyzer().analyze_memory_dump(self.raw))
+    def tearDown(self):
+        self.tmp.cleanup()
+    def write(self,name,data):
+        path=os.path.join(self.tmp.name,name)
+        with open(path,"wb") as f: f.write(data)
+        return path
+    def check(self,path,kind):
+        with open_dump(path) as src:
+            self.assertIsInstance(src,kind)
+            self.assertEqual(src.size,len(self.data))
+            self.assertEqual(bytes(src.view(4096*120-3,10)),self.data[4096*120-3:4096*120+7])
+            self.assertEqual(b"".join(bytes(c) for _,c in src.chunks(5000,300000,65536)),self.data[5000:300000])
+        for kwargs in ({},{"workers":2,"shard_size":4096*64}):
+            self.assertEqual(strip(NegativeSpaceAnalyzer(**kwargs).analyze_memory_dump(path)),self.expected)
+    def test_gzip_stream(self):
+        self.check(self.write("mem.raw.gz",gzip.compress(self.data)),StreamDumpSource)
+    def test_stream_view_ahead(self):
+        data=bytearray(random.Random(5).getrandbits(8*(3<<20)).to_bytes(3<<20,"little"))
+        data[2<<20:]=bytes(1<<20)
+        at=(1<<20)-30; data[at:at+2]=b"MZ"; data[at+0x3C:at+0x40]=struct.pack("<I",0x80)  # PE header past the chunk
+        raw=self.write("edge.raw",bytes(data)); gz=self.write("edge.raw.gz",gzip.compress(bytes(data),1))
+        want=strip(NegativeSpaceAnalyzer().analyze_memory_dump(raw))
+        self.assertEqual(want["negative_spaces"][0]["end"],hex(3<<20))
+        self.assertEqual(strip(NegativeSpaceAnalyzer().analyze_memory_dump(gz)),want)
+    def test_bgzf_frames(self):
+        path=self.write("mem.raw.bgz",bgzf(self.data))
+        self.check(path,FrameDumpSource)
+        with open_dump(path) as src:
+            self.assertEqual(len(src.frames),-(-len(self.data)//65280))
+    @unittest.skipIf(dump_source.zstandard is None,"zstandard not installed")
+    def test_zstd_seekable(self):
+        self.check(self.write("mem.raw.zst",zstd_seekable(self.data)),FrameDumpSource)
+        import zstandard
+        self.check(self.write("plain.zst",zstandard.ZstdCompressor().compress(self.data)),StreamDumpSource)
+    @unittest.skipIf(dump_source.lz4 is None,"lz4 not installed")
+    def test_lz4_stream(self):
+        import lz4.frame
+        self.check(self.write("mem.raw.lz4",lz4.frame.compress(self.data)),StreamDumpSource)
+    def test_lime_addresses(self):
+        base=0x100000
+        data=lime(((base,self.data[:4096*100]),(base+4096*300,self.data[4096*100:4096*200])))
+        path=self.write("mem.lime",data)
+        with open_dump(path) as src:
+            self.assertIsInstance(src,LimeDumpSource)
+            self.assertEqual(src.spans(),[(base,base+4096*100),(base+4096*300,base+4096*400)])
+        r=NegativeSpaceAnalyzer().analyze_memory_dump(path)
+        self.assertEqual(r["negative_spaces"][0]["start"],hex(base+4096*20))
+        elf=[h["offset"] for h in r["hidden_structures"] if h["pattern"].startswith("ELF")]
+        self.assertEqual(elf,[hex(base+4096*320-2),hex(base+4096*320+2)])
+        self.assertEqual(r["summary"]["scanned_bytes"],4096*200)
+        self.assertIn("error",NegativeSpaceAnalyzer().analyze_memory_dump(self.write("bad.lime",data[:32+4096*100]+b"JUNK"+bytes(28))))
+    def test_lime_compare(self):
+        base=0x100000; low=self.data[:4096*100]; high=bytearray(self.data[4096*100:4096*200])
+        old=self.write("old.lime",lime(((base,low),(base+4096*300,bytes(high)))))
+        high[4096*5:4096*6]=bytes(4096); high[4096*40+7]^=1
+        new=self.write("new.lime",lime(((base,low),(base+4096*300,bytes(high)),(base+4096*500,b"\x7fELF"*1024))))
+        r=NegativeSpaceAnalyzer().compare_memory_dumps(old,new,index_dir=self.tmp.name)
+        self.assertEqual([(c["start"],c["size"],c["change"]) for c in r["changes"]],
+            [(hex(base+4096*305),4096,"zeroed"),(hex(base+4096*340),4096,"changed"),(hex(base+4096*500),4096,"populated")])
+        self.assertEqual(r["summary"]["unchanged_bytes"],4096*198)
+        self.assertEqual(len(r["analysis"]["hidden_structures"]),1024)
+        again=NegativeSpaceAnalyzer().compare_memory_dumps(old,new,index_dir=self.tmp.name)
+        self.assertEqual(again["changes"],r["changes"])
+    def test_elf_core_segments(self):
+        segments=[(0x7f0000000000,0x40000000,self.data[:4096*100]),(0x400000,0x1000,self.data[4096*100:4096*200])]
+        header=b"\x7fELF\x02\x01\x01"+bytes(9)+struct.pack("<HHIQQQIHHHHHH",4,62,1,0,64,0,0,64,56,len(segments),0,0,0)
+        phdrs=b""; body=b""; offset=64+56*len(segments)
+        for vaddr,paddr,piece in segments:
+            phdrs+=struct.pack("<IIQQQQQQ",1,4,offset+len(body),vaddr,paddr,len(piece),len(piece)+8192,4096)
+            body+=piece
+        path=self.write("core",header+phdrs+body)
+        with open_dump(path) as src:
+            self.assertIsInstance(src,ElfCoreDumpSource)
+            self.assertEqual(src.spans()[0],(0x400000,0x400000+4096*100))
+        r=NegativeSpaceAnalyzer().analyze_memory_dump(path)
+        self.assertEqual(r["negative_spaces"][0]["start"],hex(0x7f0000000000+4096*20))
+        with ElfCoreDumpSource(path,address="physical") as src:
+            self.assertEqual(src.spans(),[(0x1000,0x1000+4096*100),(0x40000000,0x40000000+4096*100)])
+            self.assertEqual(bytes(src.view(0x1000,4)),self.data[4096*100:4096*100+4])
+    def test_forced_and_unknown_format(self):
+        path=self.write("x.gz",gzip.compress(self.data))
+        with open_dump(path,format="raw") as src:
+            self.assertEqual(src.size,os.path.getsize(path))
+        with self.assertRaises(ValueError):
+            open_dump(path,format="rar")
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,79 @@
+import unittest,sys,os,random,tempfile
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal import entropy_map
+from hyperreal.entropy_map import EntropyMap,quantize,QUANTUM
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer
+
+def synthetic():
+    rng=random.Random(7)
+    text=(b"the quick brown fox "*60000)[:1<<20]
+    return text+bytes(1<<20)+bytes(rng.getrandbits(8) for _ in range(256<<10))+text[:300000]
+
+class TestEntropyMap(unittest.TestCase):
+    def test_quantize_and_segments(self):
+        self.assertEqual(quantize([0.0,1.0,7.99,8.0]),bytes([0,32,255,255]))
+        m=EntropyMap(block_size=16)
+        m.append(0,b"\x01\x02"); m.append(32,b"\x03"); m.append(1000,b"\x04\x05")
+        self.assertEqual(m.segments,[(0,0),(1000,3)])
+        self.assertEqual([m.offset(i) for i in range(5)],[0,16,32,1000,1016])
+        self.assertEqual(m.entropy(1),2/QUANTUM)
+    def test_pyramid_and_zoom(self):
+        rng=random.Random(1)
+        m=EntropyMap()
+        m.append(0,bytes(rng.randrange(256) for _ in range(1000)))
+        levels=m.pyramid()
+        self.assertEqual([len(l[0]) for l in levels],[1000,63,4,1])
+        self.assertEqual(levels[1][0][5],min(m.codes[80:96]))
+        self.assertEqual(levels[2][1][3],max(m.codes[768:]))
+        self.assertEqual(levels[-1][0][0],min(m.codes))
+        rows=m.zoom(buckets=50)
+        self.assertEqual(len(rows),63)
+        self.assertEqual(sum(r[1] for r in rows),1000)
+        if entropy_map.np is not None:
+            np_levels=levels
+            entropy_map.np,saved=None,entropy_map.np
+            try:
+                m._pyramid=None
+                self.assertEqual(m.pyramid(),np_levels)
+            finally:
+                entropy_map.np=saved
+    def test_deserts_and_islands(self):
+        m=EntropyMap()
+        m.append(0,bytes([90]*100+[0]*80+[90]*30+[250]*20+[90]*100))
+        self.assertEqual(m.deserts(window=32),[(100,180,0.0)])
+        self.assertEqual(m.islands(window=8),[(210,230,round(250/QUANTUM,3))])
+        self.assertEqual(m.deserts(window=500),[])
+        m=EntropyMap()
+        m.append(0,bytes([90]*50+[0]*20)); m.append(1<<30,bytes([0]*20+[90]*50))  # Windows never bridge the gap
+        self.assertEqual(m.deserts(window=32),[])
+        self.assertEqual(m.deserts(window=16),[(50,70,0.0),(70,90,0.0)])
+    def test_save_load(self):
+        m=EntropyMap()
+        m.append(0,bytes(range(256)))
+        with tempfile.TemporaryDirectory() as d:
+            path=os.path.join(d,"dump.entropy.npy")
+            m.save(path)
+            self.assertEqual(os.path.getsize(path)%64,(256+128)%64)  # 64-byte aligned header
+            loaded=EntropyMap.load(path)
+            self.assertEqual(loaded.codes,m.codes)
+            self.assertEqual(loaded.segments,m.segments)
+            if entropy_map.np is not None:
+                self.assertEqual(entropy_map.np.load(path).tobytes(),bytes(range(256)))
+    def test_analyzer_fills_map(self):
+        data=synthetic()
+        with tempfile.TemporaryDirectory() as d:
+            path=os.path.join(d,"mem.raw")
+            with open(path,"wb") as f: f.write(data)
+            m=EntropyMap()
+            r=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(path,entropy_map=m)
+            self.assertEqual(len(m),-(-len(data)//4096))
+            self.assertEqual(len(r["entropy_deserts"]),1)
+            self.assertEqual(r["entropy_deserts"][0]["start"],hex(1<<20))
+            self.assertEqual(len(r["entropy_islands"]),1)
+            sharded=EntropyMap()
+            NegativeSpaceAnalyzer(backend="python",workers=2,shard_size=1<<20).analyze_memory_dump(path,entropy_map=sharded)
+            self.assertEqual(sharded.codes,m.codes)
+            kinds=[f["finding"] for f in NegativeSpaceAnalyzer(backend="python").iter_memory_dump(path,entropy_map=EntropyMap())]
+            self.assertEqual(kinds[-3:],["entropy_desert","entropy_island","summary"])
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,225 @@
+import unittest,sys,os,io,json,time,tempfile
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal.filesystem_forensics import FilesystemHyperreal,Detector,DuplicateDetector
+from hyperreal.sinks import JsonlSink,write_jsonl
+from hyperreal.scan_cache import ScanCache
+from hyperreal.watch import FilesystemWatch,_Inotify
+
+def make_tree(root):
+    os.makedirs(os.path.join(root,"a","b"))
+    os.makedirs(os.path.join(root,".cache"))
+    files={"one.txt":b"same","a/two.txt":b"same","a/b/three.txt":b"same","a/.secret":b"k","a/b/tool":b"\x7fELF"}
+    for name,data in files.items():
+        with open(os.path.join(root,name),"wb") as f: f.write(data)
+    os.chmod(os.path.join(root,"a/b/tool"),0o755)
+    os.utime(os.path.join(root,"one.txt"),(time.time(),time.time()+86400*7))
+    os.utime(os.path.join(root,"a/two.txt"),(time.time(),1000))
+
+class TestFilesystem(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        self.root=self.tmp.name
+        make_tree(self.root)
+        self.fs=FilesystemHyperreal()
+    def tearDown(self):
+        self.tmp.cleanup()
+    def test_reports(self):
+        t=self.fs.scan_temporal_anomalies(self.root)
+        self.assertEqual(sorted(a["type"] for a in t["anomalies"]),["ANCIENT_TIMESTAMP","FUTURE_TIMESTAMP"])
+        h=self.fs.detect_hidden_spaces(self.root)
+        self.assertEqual(sorted(i["type"] for i in h["items"]),["HIDDEN_DIRECTORY","HIDDEN_FILE","UNNAMED_EXECUTABLE"])
+        d=self.fs.find_duplicate_simulacra(self.root)
+        self.assertEqual(d["duplicate_groups"],1)
+        self.assertEqual(d["total_copies"],2)
+        self.assertEqual(d["duplicates"][0]["original"]["path"],os.path.join(self.root,"a","two.txt"))
+    def test_iterators_stream(self):
+        copies=list(self.fs.iter_duplicate_simulacra(self.root))
+        self.assertEqual([c["type"] for c in copies],["DUPLICATE","DUPLICATE"])
+        self.assertEqual(copies[0]["first_seen"],copies[1]["first_seen"])
+        self.assertEqual(len(list(self.fs.iter_hidden_spaces(self.root))),3)
+    def test_progress_cancels(self):
+        calls=[]
+        found=list(self.fs.iter_hidden_spaces(self.root,progress=lambda done,total:calls.append(done) or False))
+        self.assertEqual(len(calls),1)
+        self.assertLess(len(found),3)
+    def test_fused_scan(self):
+        r=self.fs.scan(self.root)
+        self.assertEqual(sorted(r),["duplicate_simulacra","hidden_spaces","temporal_anomalies"])
+        self.assertEqual(r["hidden_spaces"]["items"],self.fs.detect_hidden_spaces(self.root)["items"])
+        self.assertEqual(r["duplicate_simulacra"]["total_copies"],2)
+        self.assertEqual(r["temporal_anomalies"]["anomalies_found"],2)
+    def test_register_detector(self):
+        class Large(Detector):
+            name="large_files"
+            def visit_file(self,entry):
+                if entry.stat().st_size>=4: yield {"path":entry.path}
+        self.fs.register_detector(Large)
+        r=self.fs.scan(self.root,detectors=["large_files","hidden_spaces"])
+        self.assertEqual(len(r["large_files"]["findings"]),4)
+        self.assertEqual(r["hidden_spaces"]["hidden_count"],3)
+        with self.assertRaises(ValueError):
+            self.fs.scan(self.root,detectors=["nope"])
+    def test_max_depth(self):
+        self.assertEqual(self.fs.find_duplicate_simulacra(self.root,max_depth=2)["total_copies"],1)
+        self.assertEqual(self.fs.detect_hidden_spaces(self.root,max_depth=1)["hidden_count"],1)
+    def test_parallel_walk_matches_serial(self):
+        for i in range(12):
+            d=os.path.join(self.root,"deep",*["d%d"%j for j in range(i%5)])
+            os.makedirs(d,exist_ok=True)
+            with open(os.path.join(d,"f%d"%i),"wb") as f: f.write(b"same" if i%3==0 else b"x"*i)
+        for depth in (0,1,3,6):
+            serial=list(self.fs.iter_scan(self.root,max_depth=depth))
+            self.assertEqual(list(FilesystemHyperreal(workers=4).iter_scan(self.root,max_depth=depth)),serial)
+        paths=[c["path"] for c in self.fs.iter_duplicate_simulacra(self.root)]
+        self.assertEqual(paths[:2],[os.path.join(self.root,"a","two.txt"),os.path.join(self.root,"a","b","three.txt")])  # Name-sorted walk
+    def test_tiered_duplicates(self):
+        big=os.urandom(64*1024)
+        for name,data in {"u1":b"unique size","big1":big,"big2":big,"big3":big[:-1]+b"!","head":b"h"+big[1:]}.items():
+            with open(os.path.join(self.root,name),"wb") as f: f.write(data)
+        os.link(os.path.join(self.root,"big1"),os.path.join(self.root,"a","big1.link"))
+        fs=FilesystemHyperreal(hash_algorithm="blake2b")
+        r=fs.find_duplicate_simulacra(self.root)
+        self.assertEqual(r["hash_algorithm"],"blake2b")
+        big_group=[d for d in r["duplicates"] if d["original"]["size"]==len(big)][0]
+        self.assertEqual(big_group["count"],3)
+        self.assertEqual(sum(bool(c.get("hardlink")) for c in big_group["copies"]),1)
+        self.assertEqual(r["wasted_space"],len(big)+8)
+        # big1 and big2 are read whole; big3 and head stop at the partial hash
+        self.assertEqual(r["hash_stats"]["full_hashes"],2)
+        self.assertEqual(r["hash_stats"]["bytes_hashed"],2*len(big)+4*2*4096+4*4)  # + four 4-byte files
+        with self.assertRaises(ValueError):
+            FilesystemHyperreal(hash_algorithm="crc-nope")
+    def test_hardlink_then_copy(self):
+        root=os.path.join(self.tmp.name,"links")
+        os.makedirs(os.path.join(root,"sub"))
+        for name in ("a.txt","sub/c.txt"):
+            with open(os.path.join(root,name),"wb") as f: f.write(b"same bytes")
+        os.link(os.path.join(root,"a.txt"),os.path.join(root,"b_link.txt"))
+        os.symlink(os.path.join(root,"a.txt"),os.path.join(root,"b_sym.txt"))
+        with open(os.path.join(root,"solo.bin"),"wb") as f: f.write(b"unique size, linked")
+        os.link(os.path.join(root,"solo.bin"),os.path.join(root,"solo.link"))
+        r=self.fs.find_duplicate_simulacra(root)
+        copies={os.path.relpath(c["path"],root):c.get("hardlink",False) for c in r["duplicates"][0]["copies"]}
+        self.assertEqual(copies,{"b_link.txt":True,"sub/c.txt":False})  # The symlink is no copy
+        self.assertEqual(r["hash_stats"]["bytes_hashed"],2*len(b"same bytes"))  # Nothing of solo.bin is read
+    def test_sparse_duplicates(self):
+        data=os.urandom(8192)
+        with open(os.path.join(self.root,"sparse.img"),"wb") as f:
+            f.write(data); f.seek(4<<20); f.write(data)
+        with open(os.path.join(self.root,"dense.img"),"wb") as f:
+            f.write(data+bytes((4<<20)-8192)+data)
+        r=FilesystemHyperreal(hash_algorithm="blake2b").find_duplicate_simulacra(self.root)
+        self.assertIn((4<<20)+8192,[d["original"]["size"] for d in r["duplicates"]])
+        sparse=os.stat(os.path.join(self.root,"sparse.img")).st_blocks*512<4<<20
+        self.assertEqual(r["hash_stats"]["hole_bytes"]>0,sparse)  # Only where the filesystem keeps holes
+    def test_incremental_cache(self):
+        big=os.urandom(64*1024)
+        for name in ("big1","big2"):
+            with open(os.path.join(self.root,name),"wb") as f: f.write(big)
+        with tempfile.TemporaryDirectory() as d:
+            db=os.path.join(d,"cache.sqlite3")
+            first=FilesystemHyperreal(cache=db).find_duplicate_simulacra(self.root)
+            self.assertEqual(first["cache_stats"]["hits"],0)
+            self.assertEqual(first["cache_stats"]["misses"],6)  # Once per file, though big1/big2 are hashed twice
+            self.assertGreater(first["hash_stats"]["bytes_hashed"],0)
+            fs=FilesystemHyperreal(cache=db)  # A new process reopening the cache
+            second=fs.find_duplicate_simulacra(self.root)
+            self.assertEqual(second["hash_stats"]["bytes_hashed"],0)
+            self.assertEqual(second["cache_stats"]["misses"],0)
+            self.assertEqual(second["cache_stats"]["hits"],6)
+            self.assertEqual(second["duplicates"],first["duplicates"])
+            # A changed file misses; a deleted one is evicted
+            with open(os.path.join(self.root,"big2"),"ab") as f: f.write(b"!")
+            os.remove(os.path.join(self.root,"a","two.txt"))
+            third=fs.find_duplicate_simulacra(self.root)
+            self.assertEqual(third["cache_stats"]["evicted"],1)
+            self.assertEqual(third["total_copies"],1)
+            fs.cache.invalidate(self.root)
+            self.assertGreater(fs.find_duplicate_simulacra(self.root)["cache_stats"]["misses"],0)
+            fs.cache.close()
+        with ScanCache(":memory:") as cache:
+            fs=FilesystemHyperreal(cache=cache)
+            fs.find_duplicate_simulacra(self.root)
+            self.assertGreater(cache.stats["stored"],0)
+    def test_jsonl_sink(self):
+        buf=io.StringIO()
+        n=write_jsonl(self.fs.iter_temporal_anomalies(self.root),buf)
+        lines=[json.loads(l) for l in buf.getvalue().splitlines()]
+        self.assertEqual(n,2)
+        self.assertEqual(len(lines),2)
+        path=os.path.join(self.root,"out.jsonl")
+        with JsonlSink(path,flush_every=1) as sink:
+            for item in self.fs.iter_hidden_spaces(self.root): sink(item)
+        with open(path) as f: self.assertEqual(len(f.readlines()),sink.count)
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        self.root=self.tmp.name
+        make_tree(self.root)
+    def tearDown(self):
+        self.tmp.cleanup()
+    def write(self,name,data,mtime=None):
+        path=os.path.join(self.root,name)
+        with open(path,"wb") as f: f.write(data)
+        if mtime: os.utime(path,(mtime,mtime))
+    def changes(self,watch):
+        before=watch.stats["changes"]
+        for _ in range(20):  # Polling needs a directory mtime tick; inotify a moment to settle
+            watch.poll(0.5)
+            if watch.stats["changes"]>before: break
+            time.sleep(0.05)
+    def check_backend(self,backend):
+        seen=[]
+        with FilesystemWatch(FilesystemHyperreal(),self.root,seen.append,backend=backend) as w:
+            base=w.start()
+            self.assertEqual(base["duplicate_simulacra"]["total_copies"],2)
+            self.assertEqual(seen,[])
+            os.makedirs(os.path.join(self.root,"a","new"))
+            self.write("a/new/.implant",b"x")
+            self.write("a/new/copy",b"same")
+            self.write("a/new/old.txt",b"stomped",mtime=1000)
+            self.write("a/.secret",b"rewritten")  # Already reported as hidden
+            self.changes(w)
+            time.sleep(0.1); w.poll(0.1)
+            got=sorted((f["event"],f["type"],os.path.relpath(f["path"],self.root)) for f in seen)
+            self.assertEqual(got,[
+                ("created","ANCIENT_TIMESTAMP","a/new/old.txt"),("created","DUPLICATE","a/new/copy"),
+                ("created","HIDDEN_FILE","a/new/.implant"),
+            ])
+            dup=[f for f in seen if f["type"]=="DUPLICATE"][0]
+            self.assertEqual(dup["detector"],"duplicate_simulacra")
+            del seen[:]
+            os.remove(os.path.join(self.root,"a","two.txt"))  # The original goes...
+            self.changes(w)
+            self.write("last",b"same")  # ...so a new copy names a surviving one
+            self.changes(w)
+            self.assertEqual([f["type"] for f in seen],["DUPLICATE"])
+            self.assertNotEqual(seen[0]["first_seen"]["path"],os.path.join(self.root,"a","two.txt"))
+            self.assertEqual(w.stats["backend"],backend)
+    def test_poll(self):
+        self.check_backend("poll")
+    def test_inotify(self):
+        try: _Inotify().close()
+        except (OSError,AttributeError): self.skipTest("no inotify")
+        self.check_backend("inotify")
+    def test_forget_hardlink(self):
+        for name in ("x1","x2"): self.write(name,b"linked bytes")
+        os.link(os.path.join(self.root,"x1"),os.path.join(self.root,"x1.link"))
+        det=DuplicateDetector(FilesystemHyperreal())
+        found=[f for e in sorted(os.scandir(self.root),key=lambda e:e.name) if e.is_file() for f in det.visit_file(e)]
+        digest=[f["hash"] for f in found if f["path"].endswith("x1.link")][0]
+        self.assertEqual(det.counts[digest],3)
+        os.remove(os.path.join(self.root,"x1.link")); det.forget(os.path.join(self.root,"x1.link"))
+        self.assertEqual(det.counts[digest],2)
+        det.forget(os.path.join(self.root,"x1"))
+        self.assertEqual((det.counts[digest],det.first_seen[digest]["path"]),(1,os.path.join(self.root,"x2")))
+    def test_jsonl_baseline(self):
+        out=io.StringIO()
+        stats=FilesystemHyperreal().watch(self.root,JsonlSink(out),duration=0.1,interval=0.05,emit_baseline=True)
+        lines=[json.loads(l) for l in out.getvalue().splitlines()]
+        self.assertEqual(len(lines),stats["findings"])
+        self.assertEqual({l["event"] for l in lines},{"baseline"})
+        self.assertIn("DUPLICATE",{l["type"] for l in lines})
+
+if __name__=="__main__": unittest.main()
@@ -1,5 +1,6 @@
-import unittest,sys,os
+import unittest,sys,os,itertools
 sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal import core
 from hyperreal.core import HyperrealEngine
 
 class TestHyperreal(unittest.TestCase):
@@ -11,6 +12,25 @@ class TestHyperreal(unittest.TestCase):
         h=HyperrealEngine()
         r=h.measure_simulation_depth({"mediated":True,"virtual":True,"ai_generated":True,"no_original":True})
         self.assertEqual(r["level"],"HYPERREAL")
+    def test_batch_matches_single(self):
+        names=list(HyperrealEngine.INDICATORS)
+        records=[dict(zip(names,bits)) for bits in itertools.product([False,True],repeat=len(names))]
+        old=core.np
+        try:
+            for np_mod in {old,None}:
+                core.np=np_mod
+                for weights in (None,{"virtual":60,"branded":25,"unlisted":5},{"virtual":19.75,"mediated":0.25,"branded":60.5}):
+                    h=HyperrealEngine(weights); h.BATCH_CHUNK=7
+                    want=[h.measure_simulation_depth(p) for p in records]
+                    for batch in (records,iter(records),{k:[p[k] for p in records] for k in names}):
+                        r=h.measure_simulation_depths(batch)
+                        self.assertEqual(list(r["depth_score"]),[int(w["depth_score"]) for w in want])
+                        self.assertEqual([r["levels"][i] for i in r["level"]],[w["level"] for w in want])
+                self.assertEqual(len(HyperrealEngine().measure_simulation_depths([])["level"]),0)
+                with self.assertRaises(ValueError):
+                    HyperrealEngine().measure_simulation_depths({"virtual":[True],"branded":[True,False]})
+        finally:
+            core.np=old
     def test_precession(self):
         h=HyperrealEngine()
         r=h.precession_of_simulacra()
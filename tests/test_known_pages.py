@@ -0,0 +1,55 @@
+import unittest,sys,os,random,tempfile
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal.known_pages import KnownPageSet
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer
+
+class TestKnownPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        rng=random.Random(5)
+        self.lib=bytearray(rng.getrandbits(8) for _ in range(8*4096+300))
+        self.lib[4096:4096+80]=b"\x90"*80        # A NOP sled inside a stock library
+        self.lib[2*4096:3*4096]=bytes(4096)      # Zero page — never "known"
+        self.lib_path=self.write("libstock.so",self.lib)
+        self.known=KnownPageSet(algorithm="blake2b")
+        self.assertEqual(self.known.add_file(self.lib_path),8)
+    def tearDown(self):
+        self.tmp.cleanup()
+    def write(self,name,data):
+        path=os.path.join(self.tmp.name,name)
+        with open(path,"wb") as f: f.write(data)
+        return path
+    def test_membership_and_save(self):
+        pages=[bytes(self.lib[i:i+4096]) for i in range(0,8*4096,4096)]
+        tail=bytes(self.lib[8*4096:])+bytes(4096-300)
+        flags=self.known.known_blocks(b"".join(pages)+tail+bytes(4096))
+        self.assertEqual(flags,[True,True,False,True,True,True,True,True,True,False])
+        path=os.path.join(self.tmp.name,"known.npy")
+        self.known.save(path)
+        loaded=KnownPageSet.load(path)
+        self.assertEqual((loaded.hashes,loaded.files),(self.known.hashes,1))
+        self.assertEqual(loaded.known_blocks(pages[0]),[True])
+    def test_dump_skips_known_pages(self):
+        rng=random.Random(6)
+        dump=bytearray(self.lib[:8*4096])+bytes(3*4096)+bytearray(rng.getrandbits(8) for _ in range(4*4096))
+        dump[12*4096:12*4096+80]=b"\x90"*80      # Injected, not in any file
+        path=self.write("mem.raw",dump)
+        plain=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(path)
+        results=[]
+        for kwargs in ({"backend":"python"},{},{"workers":3,"shard_size":2*4096}):
+            r=NegativeSpaceAnalyzer(known_pages=self.known,**kwargs).analyze_memory_dump(path)
+            self.assertEqual(r["summary"]["known_bytes_skipped"],7*4096)
+            offsets=[int(h["offset"],16) for h in r["hidden_structures"] if h["pattern"].startswith("NOP")]
+            self.assertEqual(offsets,[12*4096])
+            r.pop("scan_time"); results.append(r)
+        self.assertEqual(plain["summary"]["known_bytes_skipped"],0)
+        self.assertEqual(len([h for h in plain["hidden_structures"] if h["pattern"].startswith("NOP")]),2)
+        self.assertEqual(results[0],results[1]); self.assertEqual(results[0],results[2])
+    def test_load_by_path(self):
+        path=os.path.join(self.tmp.name,"known.npy")
+        self.known.save(path)
+        self.assertEqual(len(NegativeSpaceAnalyzer(known_pages=path).known_pages),8)
+        with self.assertRaises(ValueError):
+            NegativeSpaceAnalyzer(known_pages=KnownPageSet(block_size=512))
+
+if __name__=="__main__": unittest.main()
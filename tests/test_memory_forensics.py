@@ -0,0 +1,196 @@
+import unittest,sys,os,random,tempfile,time,subprocess,mmap
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal import memory_forensics
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer,ProcessMemoryForensics
+from hyperreal.dump_source import MappedDumpSource,FileDumpSource,open_dump
+from hyperreal.known_pages import PageHashCache
+
+def make_dump(path):
+    rnd=random.Random(7)
+    with open(path,"wb") as f:
+        f.write(bytes(rnd.getrandbits(8) for _ in range(4096*300)))
+        f.write(b"\x00"*4096*12)
+        f.write(b"ABCD"*1024*260)
+        f.write(b"\x90"*100+b"\xfe\xed\xfa\xce"+b"\x00"*5000)
+
+def strip(r):
+    r=dict(r); r.pop("scan_time"); return r
+
+class TestNegativeSpace(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        self.dump=os.path.join(self.tmp.name,"mem.raw")
+        make_dump(self.dump)
+    def tearDown(self):
+        self.tmp.cleanup()
+    def test_python_backend(self):
+        r=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(self.dump)
+        self.assertEqual(r["negative_spaces"][0]["start"],hex(4096*300))
+        self.assertEqual(r["negative_spaces"][0]["size"],4096*12)
+        self.assertGreater(r["entropy_map"][0]["entropy"],7.9)
+        self.assertTrue(r["entropy_map"][-1]["classification"].startswith("STRUCTURED"))
+    @unittest.skipIf(memory_forensics.np is None,"numpy not installed")
+    def test_numpy_matches_python(self):
+        a=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(self.dump)
+        b=NegativeSpaceAnalyzer(backend="numpy").analyze_memory_dump(self.dump)
+        self.assertEqual(strip(a),strip(b))
+    def test_sources_agree(self):
+        a=NegativeSpaceAnalyzer(backend="python")
+        with MappedDumpSource(self.dump) as m, FileDumpSource(self.dump) as f:
+            self.assertEqual(strip(a.analyze_memory_dump(m)),strip(a.analyze_memory_dump(f)))
+            self.assertEqual(bytes(m.view(4096*300-2,4)),bytes(f.view(4096*300-2,4)))
+    def test_empty_dump(self):
+        path=os.path.join(self.tmp.name,"empty.raw")
+        open(path,"wb").close()
+        with open_dump(path) as src:
+            self.assertIsInstance(src,FileDumpSource)
+            r=NegativeSpaceAnalyzer().analyze_memory_dump(src)
+        self.assertEqual(r["summary"]["total_blocks"],0)
+    def test_parallel_matches_serial(self):
+        rnd=random.Random(3)
+        with open(self.dump,"ab") as f:
+            # Runs and signatures placed across every 8KB shard edge
+            for shard in range(1,40):
+                f.write(bytes(rnd.getrandbits(8) for _ in range(8192-70)))
+                f.write(rnd.choice([b"\x90"*140,b"\xcc"*40+b"\x90"*30,b"\x00"*67+b"\x7fELF"*2]))
+            f.write(b"\x00"*20000)
+        serial=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(self.dump)
+        par=NegativeSpaceAnalyzer(backend="python",workers=2,shard_size=8192).analyze_memory_dump(self.dump)
+        self.assertEqual(strip(serial),strip(par))
+        self.assertGreater(len(serial["hidden_structures"]),40)
+    def test_runs_across_many_shards(self):
+        path=os.path.join(self.tmp.name,"runs.raw")
+        with open(path,"wb") as f:
+            f.write(os.urandom(8192)+b"\x00"*8192*40+b"\x90"*(8192*3+10)+os.urandom(8192-80))
+            f.write(b"\xcc"*50+b"\x90"*30+os.urandom(8192))  # INT3 sled and a short NOP run split at an edge
+        serial=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(path)
+        par=NegativeSpaceAnalyzer(backend="python",workers=2,shard_size=8192).analyze_memory_dump(path)
+        self.assertEqual(strip(serial),strip(par))
+        class Counting(FileDumpSource):
+            read=0
+            def chunks(self,*args):
+                for base,chunk in super().chunks(*args):
+                    Counting.read+=len(chunk)
+                    yield base,chunk
+        with Counting(path) as src:
+            for start in range(0,src.size,8192):  # Each shard stops at its edge rather than the run's end
+                NegativeSpaceAnalyzer(backend="python")._scan_range(src,start,min(start+8192,src.size))
+            self.assertLess(Counting.read,2*src.size)
+    def test_streaming_matches_report(self):
+        a=NegativeSpaceAnalyzer(backend="python")
+        report=a.analyze_memory_dump(self.dump)
+        found=list(a.iter_memory_dump(self.dump))
+        self.assertEqual(found[-1]["finding"],"summary")
+        self.assertEqual(found[-1]["total_blocks"],report["summary"]["total_blocks"])
+        voids=[{k:v for k,v in f.items() if k!="finding"} for f in found if f["finding"]=="negative_space"]
+        self.assertEqual(voids,report["negative_spaces"])
+        self.assertEqual(sum(f["finding"]=="hidden_structure" for f in found),len(report["hidden_structures"]))
+    def test_progress_cancels(self):
+        seen=[]
+        r=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(self.dump,progress=lambda done,total:seen.append(done) or False)
+        self.assertEqual(seen,[1024*1024])
+        self.assertTrue(r["summary"]["cancelled"])
+        self.assertEqual(r["summary"]["total_blocks"],256)
+    def test_sparse_matches_dense(self):
+        data=open(self.dump,"rb").read()
+        sparse=os.path.join(self.tmp.name,"sparse.raw")
+        with open(sparse,"wb") as f:
+            f.write(data); f.seek(len(data)+(3<<20)+100); f.write(b"\x90"*90+data[:5000])
+        dense=os.path.join(self.tmp.name,"dense.raw")
+        with open(dense,"wb") as f: f.write(open(sparse,"rb").read())
+        for kwargs in ({"backend":"python"},{},{"workers":2,"shard_size":1<<20}):
+            a=strip(NegativeSpaceAnalyzer(**kwargs).analyze_memory_dump(sparse))
+            b=strip(NegativeSpaceAnalyzer(**kwargs).analyze_memory_dump(dense))
+            with open_dump(sparse) as src:
+                holes=sum(e-s for s,e in src.holes())
+            self.assertEqual(a["summary"].pop("hole_bytes")>0,holes>0)  # Only where the filesystem keeps holes
+            self.assertEqual(b["summary"].pop("hole_bytes"),0)
+            a.pop("file"); b.pop("file")
+            self.assertEqual(a,b)
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            NegativeSpaceAnalyzer(backend="gpu")
+
+CHILD="""import mmap,ctypes,sys,time
+m=mmap.mmap(-1,64<<20)
+m[8192:8192+128]=b"\\x90"*128
+print(ctypes.addressof(ctypes.c_char.from_buffer(m)),flush=True)
+time.sleep(60)
+"""
+
+@unittest.skipUnless(os.path.exists("/proc/self/pagemap"),"needs Linux /proc")
+class TestLiveProcess(unittest.TestCase):
+    def setUp(self):
+        self.child=subprocess.Popen([sys.executable,"-c",CHILD],stdout=subprocess.PIPE)
+        self.base=int(self.child.stdout.readline())
+    def tearDown(self):
+        self.child.kill(); self.child.wait(); self.child.stdout.close()
+    def test_live_scan_skips_absent_pages(self):
+        pid=self.child.pid
+        src=memory_forensics.ProcessMemorySource(pid)
+        with src:
+            if not src.pagemap: self.skipTest("pagemap not readable")
+            self.assertGreaterEqual(src.absent_bytes,60<<20)  # Untouched mapping isn't read
+            self.assertEqual(src.view(self.base+8192,4).tobytes(),b"\x90"*4)
+            self.assertEqual(len(src.view(self.base+(32<<20),4)),0)
+        r=NegativeSpaceAnalyzer(backend="python").analyze_process(pid)
+        self.assertIn(hex(self.base+8192),[h["offset"] for h in r["hidden_structures"]])
+        self.assertEqual(r["summary"]["absent_bytes"],src.absent_bytes)
+        self.assertLess(r["summary"]["scanned_bytes"],src.size)
+        found=list(NegativeSpaceAnalyzer(backend="python").iter_process(pid))
+        self.assertEqual(found[-1]["finding"],"summary")
+        self.assertIn("error",NegativeSpaceAnalyzer().analyze_process(2**22+1))
+
+class TestProcessSweep(unittest.TestCase):
+    def test_sweep_self_and_exited(self):
+        r=ProcessMemoryForensics().sweep_host(pids=[os.getpid(),2**22+1])
+        self.assertTrue(r["complete"])
+        self.assertEqual(r["processes_scanned"],1)
+        self.assertEqual(r["processes_exited"],1)
+        orders=[x["order"] for x in r["suspicious_regions"]]
+        self.assertEqual(orders,sorted(orders,reverse=True))
+    def test_time_budget(self):
+        class Slow(ProcessMemoryForensics):
+            def _sweep_pid(self,pid,*args):
+                time.sleep(0.05)
+                return super()._sweep_pid(pid,*args)
+        r=Slow().sweep_host(workers=1,time_budget=0.01,pids=[os.getpid()]*20)
+        self.assertFalse(r["complete"])
+        self.assertGreater(len(r["skipped_pids"]),10)
+        class Stuck(ProcessMemoryForensics):
+            def _sweep_pid(self,pid,*args):
+                if pid!=os.getpid(): time.sleep(1)
+                return super()._sweep_pid(os.getpid(),*args)
+        started=time.monotonic()
+        r=Stuck().sweep_host(workers=6,time_budget=0.2,pids=[os.getpid(),1,2,3,4,5])
+        self.assertLess(time.monotonic()-started,0.8)  # In-flight scans aren't waited for
+        self.assertEqual((r["processes_scanned"],r["skipped_pids"]),(1,[1,2,3,4,5]))
+
+@unittest.skipUnless(os.path.exists("/proc/self/pagemap"),"needs Linux /proc")
+class TestDeepHollowing(unittest.TestCase):
+    def test_patched_mapping(self):
+        with tempfile.TemporaryDirectory() as d:
+            path=os.path.join(d,"lib.so")
+            with open(path,"wb") as f: f.write(os.urandom(5*4096+100))
+            with open(path,"r+b") as f:
+                try:
+                    m=mmap.mmap(f.fileno(),0,flags=mmap.MAP_PRIVATE,prot=mmap.PROT_READ|mmap.PROT_WRITE|mmap.PROT_EXEC)
+                except OSError:
+                    self.skipTest("noexec filesystem")
+            try:
+                m[:]; m[2*4096+5:2*4096+8]=b"\xcc"*3  # Copy-on-write patch of one page
+                pmf=ProcessMemoryForensics(page_cache=PageHashCache())
+                r=pmf.detect_process_hollowing(os.getpid(),deep=True)
+                patched=[i for i in r["indicators"] if i["type"]=="PATCHED_CODE"]
+                self.assertEqual([i["pathname"] for i in patched],[path])
+                self.assertEqual(len(patched[0]["pages"]),1)
+                self.assertEqual(r["deep_check"]["pages_diverged"],1)
+                self.assertTrue(r["assessment"]["hollowed"])
+                hashed=pmf.page_cache.stats["files_hashed"]
+                r=ProcessMemoryForensics(page_cache=pmf.page_cache).sweep_host(pids=[os.getpid()],deep=True)
+                self.assertEqual(pmf.page_cache.stats["files_hashed"],hashed)  # Every file came from the cache
+                self.assertEqual(r["hollowed_processes"],1)
+            finally:
+                m.close()
+
+if __name__=="__main__": unittest.main()
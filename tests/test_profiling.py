@@ -0,0 +1,82 @@
+import unittest,sys,os,tempfile,random
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal.profiling import Profiler,stage
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer,ProcessMemoryForensics
+from hyperreal.filesystem_forensics import FilesystemHyperreal,Detector
+
+class TestProfiler(unittest.TestCase):
+    def test_stages_counters_merge(self):
+        events=[]
+        p=Profiler(lambda e,d: events.append((e,d)))
+        with p.stage("a"): pass
+        self.assertEqual(list(p.timed(range(3),"b")),[0,1,2])
+        p.count("bytes_read",1<<20); p.count("blocks",256)
+        reported=len(events)
+        p.merge(p.summary())
+        self.assertEqual(len(events),reported)
+        s=p.finish()
+        self.assertEqual(s["stages"]["a"]["calls"],2)
+        self.assertEqual(s["stages"]["b"]["calls"],8)  # Three items plus the final StopIteration, twice
+        self.assertEqual(s["counters"],{"blocks":512,"bytes_read":2<<20})
+        self.assertIn("mb_per_s",s["rates"])
+        self.assertEqual(events[0][0],"stage")
+        self.assertEqual(events[-1],("summary",s))
+        self.assertIsNone(Profiler.create(None))
+        self.assertIsNone(Profiler.create(False))
+        self.assertIsNone(Profiler.create(True).hook)
+        with stage(None,"off"): pass
+
+class TestScannerProfiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        rnd=random.Random(3)
+        data=bytearray(rnd.getrandbits(8) for _ in range(32*4096))
+        data[8*4096:12*4096]=bytes(4*4096); data[100:104]=b"\x7fELF"
+        self.dump=os.path.join(self.tmp.name,"mem.raw")
+        with open(self.dump,"wb") as f: f.write(data)
+        self.tree=os.path.join(self.tmp.name,"tree")
+        os.makedirs(os.path.join(self.tree,"sub"))
+        for name in ("a.txt","b.txt","sub/c.txt",".hidden"):
+            with open(os.path.join(self.tree,name),"w") as f: f.write("same content")
+    def tearDown(self):
+        self.tmp.cleanup()
+    def test_dump(self):
+        plain=NegativeSpaceAnalyzer(backend="python").analyze_memory_dump(self.dump)
+        self.assertNotIn("profile",plain)
+        events=[]
+        for kwargs in ({"carve":False},{"carve":False,"workers":2,"shard_size":8*4096}):
+            r=NegativeSpaceAnalyzer(profile=lambda e,d: events.append(e),**kwargs).analyze_memory_dump(self.dump)
+            c=r.pop("profile")["counters"]
+            self.assertEqual((c["bytes_read"],c["blocks"]),(32*4096,32))
+            self.assertEqual(c["matches"],len(r["hidden_structures"]))
+            self.assertEqual(r["negative_spaces"],plain["negative_spaces"])
+        self.assertEqual(events.count("summary"),2)
+        found=list(NegativeSpaceAnalyzer(profile=True).iter_memory_dump(self.dump))
+        self.assertIn("entropy",found[-1]["profile"]["stages"])
+    def test_filesystem(self):
+        events=[]
+        fs=FilesystemHyperreal(profile=lambda e,d: events.append((e,d)))
+        r=fs.scan(self.tree)
+        c=r["profile"]["counters"]
+        self.assertEqual((c["directories"],c["files"],c["stat_calls"],c["bytes_hashed"]),(2,4,4,4*12))
+        self.assertIn("detect.duplicate_simulacra",r["profile"]["stages"])
+        self.assertEqual(fs.find_duplicate_simulacra(self.tree)["profile"]["counters"]["files"],4)
+        events.clear()
+        self.assertEqual(len(list(fs.iter_hidden_spaces(self.tree))),1)
+        self.assertEqual(events[-1][0],"summary")
+        self.assertNotIn("profile",FilesystemHyperreal().scan(self.tree))
+        class Names(Detector):  # Never stats, so profiling must not either
+            name="names"
+            def visit_file(self,entry): return iter(())
+        fs.register_detector(Names)
+        self.assertEqual(fs.scan(self.tree,detectors=["names"])["profile"]["counters"].get("stat_calls",0),0)
+    @unittest.skipUnless(os.path.exists("/proc/self/maps"),"needs Linux /proc")
+    def test_process(self):
+        pmf=ProcessMemoryForensics(profile=True)
+        self.assertGreater(pmf.read_proc_maps(os.getpid())["profile"]["counters"]["regions"],0)
+        r=pmf.sweep_host(pids=[os.getpid(),2**22+1])
+        self.assertEqual(r["profile"]["counters"]["processes"],1)
+        self.assertEqual(r["profile"]["counters"]["errors_skipped"],1)
+        self.assertNotIn("profile",ProcessMemoryForensics().detect_process_hollowing(os.getpid()))
+
+if __name__=="__main__": unittest.main()
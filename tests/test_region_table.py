@@ -0,0 +1,45 @@
+import unittest,sys,os
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal.region_table import RegionTable,PERM_EXEC,PERM_WRITE
+from hyperreal.memory_forensics import ProcessMemoryForensics
+
+MAPS="""55d0c0a00000-55d0c0a21000 r--p 00000000 08:01 1311 /usr/bin/tool
+55d0c0a21000-55d0c0a40000 r-xp 00021000 08:01 1311 /usr/bin/tool
+7f0000000000-7f0000001000 rwxp 00000000 00:00 0
+7f0000002000-7f0000003000 r-xs 00001000 fd:02 77 /tmp/my lib.so (deleted)
+7ffc00000000-7ffc00021000 rw-p 00000000 00:00 0                          [stack]
+"""
+
+class TestRegionTable(unittest.TestCase):
+    def setUp(self):
+        self.t=RegionTable.from_lines(MAPS.splitlines(True))
+    def test_columns(self):
+        t=self.t
+        self.assertEqual(len(t),5)
+        self.assertEqual(t.pathnames[2],"[anonymous]")
+        self.assertEqual(t.pathnames[3],"/tmp/my lib.so (deleted)")
+        self.assertIs(t.pathnames[0],t.pathnames[1])
+        self.assertEqual(t.perms[2],7)
+        self.assertTrue(t.perms[1]&PERM_EXEC and not t.perms[1]&PERM_WRITE)
+        self.assertEqual(t.permissions(3),"r-xs")
+        self.assertEqual(t.inodes[3],77)
+        self.assertEqual(t.region(1),{"start":"0x55d0c0a21000","end":"0x55d0c0a40000","size":0x1f000,"permissions":"r-xp","offset":"00021000","pathname":"/usr/bin/tool"})
+    def test_lookup(self):
+        t=self.t
+        self.assertEqual(t.find(0x55d0c0a21000),1)
+        self.assertEqual(t.find(0x55d0c0a20fff),0)
+        self.assertEqual(t.find(0x7f0000001000),-1)  # Gap between regions
+        self.assertEqual(t.find(0),-1)
+        addrs=[0,0x55d0c0a00000,0x7f0000002fff,0x7f0000003000,0x7ffc00020fff,2**64-1]
+        self.assertEqual(t.find_many(addrs),[-1,0,3,-1,4,-1])
+        self.assertEqual(RegionTable.from_lines(reversed(MAPS.splitlines())).starts,t.starts)
+    def test_live_process(self):
+        pmf=ProcessMemoryForensics()
+        t=pmf.region_table(os.getpid())
+        maps=pmf.read_proc_maps(os.getpid())
+        self.assertEqual(maps["total_regions"],len(t))
+        self.assertEqual(maps["total_mapped"],t.total_mapped)
+        self.assertGreaterEqual(t.find(id(t)),0)  # CPython ids are addresses
+        self.assertIn("error",pmf.region_table(2**22+1))
+
+if __name__=="__main__": unittest.main()
@@ -0,0 +1,56 @@
+import unittest,sys,os,json,tempfile
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal import signatures
+from hyperreal.signatures import SignatureSet
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer
+
+class TestSignatures(unittest.TestCase):
+    def test_all_occurrences(self):
+        s=SignatureSet({b"abab":"x",b"ba":"y"})
+        self.assertEqual(s.scan(b"ababab"),[(0,4,0),(1,2,1),(2,4,0),(3,2,1)])
+    def test_prefix_literals(self):
+        s=SignatureSet({b"\xfe\xed\xfa\xce":"long",b"\xfe\xed\xfa":"short"})
+        data=b"x\xfe\xed\xfa\xce\xfe\xed\xfa\xfe\xed"
+        self.assertEqual(s.scan(data),[(1,3,1),(1,4,0),(5,3,1)])
+        st=s.stream();got=[]
+        for i in range(len(data)): got+=st.feed(data[i:i+1],i)
+        self.assertEqual(sorted(got+st.close()),s.scan(data))
+    def test_runs_coalesce(self):
+        s=SignatureSet({b"\x90"*4:"nop",b"\x90"*8:"long nop"})
+        self.assertEqual(s.scan(b"a"+b"\x90"*5+b"b"+b"\x90"*20,offset=100),[(101,5,0),(107,20,1)])
+    def test_stream_boundaries(self):
+        s=SignatureSet({b"\x7fELF":"elf",b"\xcc"*6:"int3"})
+        data=b"xx\x7fELF"+b"\xcc"*9+b"\x7fEL"
+        st=s.stream();got=[]
+        for i in range(len(data)): got+=st.feed(data[i:i+1],i)
+        got+=st.close()
+        self.assertEqual(sorted(got),s.scan(data))
+        self.assertEqual(s.scan(data),[(2,4,0),(6,9,1)])
+    def test_large_set_modes(self):
+        pats={bytes([i,j,7,9]):"p%d"%i for i in range(40) for j in (1,2)}
+        buf=b"\x00"*10+bytes([3,2,7,9])+bytes([39,1,7,9,39])
+        old=signatures.np
+        try:
+            for np_mod in {old,None}:
+                signatures.np=np_mod
+                s=SignatureSet(pats)
+                self.assertNotEqual(s._compile().mode,"direct")
+                self.assertEqual(s.scan(buf),[(10,4,7),(14,4,78)])
+                many=SignatureSet({bytes([i,i+1,5]):"p%d"%i for i in range(100)}); many.add(b"\xfe\xff","short")
+                self.assertEqual(many._compile().mode,"qgram" if np_mod else "sampled")
+                self.assertEqual(many.scan(b"\x01\xfe\xff\x32\x33\x05\x63\x64\x05\x63\x64"),[(1,2,100),(3,3,50),(6,3,99)])
+        finally:
+            signatures.np=old
+    def test_load_file(self):
+        with tempfile.TemporaryDirectory() as d:
+            path=os.path.join(d,"sigs.json")
+            with open(path,"w") as f: json.dump([{"hex":"4d5a9000","description":"PE header","order":2},{"text":"mimikatz","description":"tool"}],f)
+            s=NegativeSpaceAnalyzer.default_signatures().load(path)
+            self.assertEqual(len(s),7)
+            dump=os.path.join(d,"mem.raw")
+            with open(dump,"wb") as f: f.write(b"\x01"*(4096-3)+b"mimikatz"+b"\x01"*(1<<20)+b"\x7fELF")
+            r=NegativeSpaceAnalyzer(signatures=s).analyze_memory_dump(dump)
+            found=[(h["offset"],h["pattern"]) for h in r["hidden_structures"]]
+            self.assertEqual(found,[(hex(4093),"tool"),(hex(4101+(1<<20)),"ELF header — embedded executable image")])
+
+if __name__=="__main__": unittest.main()
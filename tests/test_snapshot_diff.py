@@ -0,0 +1,77 @@
+import unittest,sys,os,random,tempfile
+sys.path.insert(0,os.path.join(os.path.dirname(__file__),"..","src"))
+from hyperreal import snapshot_diff
+from hyperreal.snapshot_diff import BlockIndex,diff_indexes
+from hyperreal.memory_forensics import NegativeSpaceAnalyzer
+
+class TestSnapshotDiff(unittest.TestCase):
+    def setUp(self):
+        self.tmp=tempfile.TemporaryDirectory()
+        rng=random.Random(3)
+        self.base=bytearray(rng.getrandbits(8) for _ in range(64*4096+100))
+        self.base[8*4096:10*4096]=bytes(2*4096)
+        snap=bytearray(self.base)
+        snap[4*4096:4*4096+80]=b"\x90"*80        # changed
+        snap[20*4096:22*4096]=bytes(2*4096)      # zeroed
+        snap[8*4096+10:8*4096+14]=b"\x7fELF"     # populated
+        snap[-1:]=b"\x00"                        # short final block changed
+        snap+=bytes(5000)                        # grown (zeros still count as populated)
+        self.a=self.write("a.raw",self.base)
+        self.b=self.write("b.raw",snap)
+    def tearDown(self):
+        self.tmp.cleanup()
+    def write(self,name,data):
+        path=os.path.join(self.tmp.name,name)
+        with open(path,"wb") as f: f.write(data)
+        return path
+    def expected(self):
+        n=len(self.base)
+        return [(4*4096,5*4096,"changed"),(8*4096,9*4096,"populated"),(20*4096,22*4096,"zeroed"),(64*4096,65*4096,"changed"),(65*4096,n+5000,"populated")]
+    def test_diff_ranges(self):
+        old=BlockIndex.build(self.a,algorithm="blake2b"); new=BlockIndex.build(self.b,algorithm="blake2b")
+        self.assertEqual(len(old),65)
+        # The baseline's short final block grew to a full one
+        got=diff_indexes(old,new)
+        self.assertEqual(got,self.expected())
+        self.assertEqual(diff_indexes(new,old)[-1][2],"truncated")
+        self.assertEqual(diff_indexes(old,old),[])
+        if snapshot_diff.np is not None:
+            snapshot_diff.np,saved=None,snapshot_diff.np
+            try: self.assertEqual(diff_indexes(old,new),got)
+            finally: snapshot_diff.np=saved
+    def test_index_cache(self):
+        idx=os.path.join(self.tmp.name,"idx"); os.mkdir(idx)
+        first=BlockIndex.for_dump(self.a,idx)
+        self.assertFalse(first.cached)
+        again=BlockIndex.for_dump(self.a,idx)
+        self.assertTrue(again.cached)
+        self.assertEqual(again.hashes,first.hashes)
+        with open(self.a,"r+b") as f: f.write(b"changed!")
+        os.utime(self.a,ns=(0,12345))
+        self.assertFalse(BlockIndex.for_dump(self.a,idx).cached)  # Stale index rebuilt
+    def test_index_cache_default_dir(self):
+        cache=tempfile.TemporaryDirectory()
+        saved=os.environ.get("XDG_CACHE_HOME"); os.environ["XDG_CACHE_HOME"]=cache.name
+        try:
+            before=sorted(os.listdir(self.tmp.name))
+            self.assertFalse(BlockIndex.for_dump(self.a).cached)
+            self.assertTrue(BlockIndex.for_dump(self.a).cached)
+            self.assertEqual(sorted(os.listdir(self.tmp.name)),before)  # Nothing written beside the evidence
+            self.assertEqual(len(os.listdir(snapshot_diff.default_index_dir())),2)
+        finally:
+            if saved is None: del os.environ["XDG_CACHE_HOME"]
+            else: os.environ["XDG_CACHE_HOME"]=saved
+            cache.cleanup()
+    def test_compare_analyses_changes_only(self):
+        r=NegativeSpaceAnalyzer(backend="python").compare_memory_dumps(self.a,self.b,index_dir=self.tmp.name)
+        changed=[(int(c["start"],16),int(c["end"],16)) for c in r["changes"]]
+        self.assertEqual(r["summary"]["zeroed_bytes"],2*4096)
+        self.assertEqual(r["analysis"]["summary"]["scanned_bytes"],sum(e-s for s,e in changed))
+        found={h["pattern"].split()[0] for h in r["analysis"]["hidden_structures"]}
+        self.assertTrue({"NOP","ELF"}<=found)
+        for h in r["analysis"]["hidden_structures"]:
+            self.assertTrue(any(s<=int(h["offset"],16)<e for s,e in changed))
+        self.assertTrue(NegativeSpaceAnalyzer().compare_memory_dumps(self.a,self.b,index_dir=self.tmp.name)["summary"]["index_cached"]["snapshot"])
+        self.assertIn("error",NegativeSpaceAnalyzer().compare_memory_dumps(self.a,"/nonexistent"))
+
+if __name__=="__main__": unittest.main()